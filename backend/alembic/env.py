@@ -21,6 +21,8 @@ from app.models import (
     NoteContent,
     ExploreConversation,
     ExploreQAPair,
+    NoteSearchTerm,
+    NoteRevision,
 )
 
 # 导入配置
@@ -0,0 +1,24 @@
+"""添加笔记游标分页复合索引
+
+Revision ID: add_note_keyset_indexes
+Revises: add_mindmap_data
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_note_keyset_indexes'
+down_revision = 'add_mindmap_data'
+depends_on = None
+
+
+def upgrade() -> None:
+    # (owner_id, 排序字段, id) 复合索引，供 GET /notes 游标分页使用
+    op.create_index('ix_cornell_notes_owner_created', 'cornell_notes', ['owner_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_cornell_notes_owner_updated', 'cornell_notes', ['owner_id', 'updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cornell_notes_owner_updated', table_name='cornell_notes')
+    op.drop_index('ix_cornell_notes_owner_created', table_name='cornell_notes')
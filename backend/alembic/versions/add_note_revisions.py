@@ -0,0 +1,38 @@
+"""添加笔记内容修订历史表
+
+Revision ID: add_note_revisions
+Revises: add_note_search_terms
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_note_revisions'
+down_revision = 'add_note_search_terms'
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'note_revisions',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('note_id', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(10), nullable=False),
+        sa.Column('chain_length', sa.Integer(), nullable=False),
+        sa.Column('payload', sa.LargeBinary(), nullable=False),
+        sa.Column('author_id', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['note_id'], ['cornell_notes.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['author_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('note_id', 'version', name='uq_note_revisions_note_version')
+    )
+    op.create_index(op.f('ix_note_revisions_note_id'), 'note_revisions', ['note_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_note_revisions_note_id'), table_name='note_revisions')
+    op.drop_table('note_revisions')
@@ -0,0 +1,50 @@
+"""添加笔记全文检索索引
+
+SQLite 使用 FTS5 虚拟表，PostgreSQL 使用 tsvector 列 + GIN 索引。
+迁移后需执行 python scripts/rebuild_search_index.py 回填历史笔记。
+
+Revision ID: add_note_search_index
+Revises: add_note_keyset_indexes
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_note_search_index'
+down_revision = 'add_note_keyset_indexes'
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS note_search_fts USING fts5("
+            "note_id UNINDEXED, owner_id UNINDEXED, title, cue, note, summary, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS note_search_index ("
+            "note_id VARCHAR PRIMARY KEY REFERENCES cornell_notes(id) ON DELETE CASCADE, "
+            "owner_id VARCHAR NOT NULL, "
+            "body TEXT NOT NULL, "
+            "document TSVECTOR NOT NULL)"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_note_search_index_document "
+            "ON note_search_index USING GIN (document)"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_note_search_index_owner_id "
+            "ON note_search_index (owner_id)"
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS note_search_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP TABLE IF EXISTS note_search_index")
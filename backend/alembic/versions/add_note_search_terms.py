@@ -0,0 +1,35 @@
+"""添加笔记检索倒排索引表
+
+配置 SEARCH_BACKEND=ngram 时使用。
+迁移后需执行 python scripts/rebuild_search_index.py 回填历史笔记。
+
+Revision ID: add_note_search_terms
+Revises: add_note_search_index
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_note_search_terms'
+down_revision = 'add_note_search_index'
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'note_search_terms',
+        sa.Column('owner_id', sa.String(), nullable=False),
+        sa.Column('term', sa.String(64), nullable=False),
+        sa.Column('note_id', sa.String(), nullable=False),
+        sa.Column('tf', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['note_id'], ['cornell_notes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('owner_id', 'term', 'note_id')
+    )
+    op.create_index(op.f('ix_note_search_terms_note_id'), 'note_search_terms', ['note_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_note_search_terms_note_id'), table_name='note_search_terms')
+    op.drop_table('note_search_terms')
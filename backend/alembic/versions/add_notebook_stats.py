@@ -0,0 +1,39 @@
+"""添加笔记本冗余计数
+
+迁移时按现有数据回填；之后由笔记写入路径增量维护，
+可用 python scripts/reconcile_notebook_stats.py 校正偏差。
+
+Revision ID: add_notebook_stats
+Revises: add_trash_indexes
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_notebook_stats'
+down_revision = 'add_trash_indexes'
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('notebooks', sa.Column('note_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('notebooks', sa.Column('starred_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('notebooks', sa.Column('word_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(
+        "UPDATE notebooks SET "
+        "note_count = (SELECT COUNT(*) FROM cornell_notes n "
+        "WHERE n.notebook_id = notebooks.id AND n.deleted_at IS NULL), "
+        "starred_count = (SELECT COUNT(*) FROM cornell_notes n "
+        "WHERE n.notebook_id = notebooks.id AND n.deleted_at IS NULL AND n.is_starred), "
+        "word_count = (SELECT COALESCE(SUM(n.word_count), 0) FROM cornell_notes n "
+        "WHERE n.notebook_id = notebooks.id AND n.deleted_at IS NULL)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('notebooks', 'word_count')
+    op.drop_column('notebooks', 'starred_count')
+    op.drop_column('notebooks', 'note_count')
@@ -0,0 +1,24 @@
+"""添加回收站索引
+
+Revision ID: add_trash_indexes
+Revises: add_note_revisions
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_trash_indexes'
+down_revision = 'add_note_revisions'
+depends_on = None
+
+
+def upgrade() -> None:
+    # 回收站列表按 (owner_id, deleted_at, id) 游标分页；过期清理按 deleted_at 范围扫描
+    op.create_index('ix_cornell_notes_owner_deleted', 'cornell_notes', ['owner_id', 'deleted_at', 'id'], unique=False)
+    op.create_index('ix_cornell_notes_deleted_at', 'cornell_notes', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cornell_notes_deleted_at', table_name='cornell_notes')
+    op.drop_index('ix_cornell_notes_owner_deleted', table_name='cornell_notes')
@@ -0,0 +1,24 @@
+"""添加用户安全戳
+
+现有用户的安全戳为空字符串，与此前签发的（不含 stamp 的）令牌匹配，迁移后无需重新登录。
+
+Revision ID: add_user_security_stamp
+Revises: add_notebook_stats
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_security_stamp'
+down_revision = 'add_notebook_stats'
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('security_stamp', sa.String(32), server_default='', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'security_stamp')
@@ -0,0 +1,25 @@
+"""添加用户工作区版本号
+
+浏览次数写回和笔记本统计写入时加一，工作区 ETag 不再对全部笔记求和。
+现有用户从 0 开始，迁移后客户端缓存的 ETag 失效一次。
+
+Revision ID: add_user_workspace_version
+Revises: rekey_note_search_fts
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_workspace_version'
+down_revision = 'rekey_note_search_fts'
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('workspace_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'workspace_version')
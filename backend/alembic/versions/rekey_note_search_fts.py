@@ -0,0 +1,68 @@
+"""SQLite 全文检索索引改为按整数 rowid 维护
+
+FTS5 只能按 rowid 或 MATCH 走索引，原表按 UNINDEXED 的 note_id / owner_id 删除和过滤都是全表扫描。
+新增 note_search_fts_ids 保存 rowid 与笔记ID的对应关系，索引行的 rowid 取自该表；
+owner_id 改为可检索列（放在最后一列），所有者过滤写入 MATCH 表达式。
+已有索引行在迁移中原样搬移，无需重建。PostgreSQL 的 note_search_index 以 note_id 为主键，不受影响。
+
+Revision ID: rekey_note_search_fts
+Revises: add_user_sessions
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'rekey_note_search_fts'
+down_revision = 'add_user_sessions'
+depends_on = None
+
+
+def _has_table(name: str) -> bool:
+    return op.get_bind().exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", (name,)
+    ).first() is not None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite' or not _has_table('note_search_fts'):
+        return
+
+    op.execute("ALTER TABLE note_search_fts RENAME TO note_search_fts_old")
+    op.execute(
+        "CREATE TABLE note_search_fts_ids ("
+        "id INTEGER PRIMARY KEY, note_id VARCHAR NOT NULL UNIQUE)"
+    )
+    op.execute(
+        "CREATE VIRTUAL TABLE note_search_fts USING fts5("
+        "note_id UNINDEXED, title, cue, note, summary, owner_id, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    op.execute("INSERT OR IGNORE INTO note_search_fts_ids (note_id) SELECT note_id FROM note_search_fts_old")
+    op.execute(
+        "INSERT INTO note_search_fts (rowid, note_id, title, cue, note, summary, owner_id) "
+        "SELECT i.id, o.note_id, o.title, o.cue, o.note, o.summary, o.owner_id "
+        "FROM note_search_fts_ids i "
+        "JOIN (SELECT MAX(rowid) AS last_rowid, note_id FROM note_search_fts_old GROUP BY note_id) l "
+        "ON l.note_id = i.note_id "
+        "JOIN note_search_fts_old o ON o.rowid = l.last_rowid"
+    )
+    op.execute("DROP TABLE note_search_fts_old")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite' or not _has_table('note_search_fts_ids'):
+        return
+
+    op.execute("ALTER TABLE note_search_fts RENAME TO note_search_fts_new")
+    op.execute(
+        "CREATE VIRTUAL TABLE note_search_fts USING fts5("
+        "note_id UNINDEXED, owner_id UNINDEXED, title, cue, note, summary, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "INSERT INTO note_search_fts (note_id, owner_id, title, cue, note, summary) "
+        "SELECT note_id, owner_id, title, cue, note, summary FROM note_search_fts_new"
+    )
+    op.execute("DROP TABLE note_search_fts_new")
+    op.execute("DROP TABLE note_search_fts_ids")
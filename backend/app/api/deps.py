@@ -1,37 +1,26 @@
 """API 依赖注入"""
-from typing import Generator, Optional
+from typing import Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.security import decode_access_token
-from app.models import User
+from app.models import User, UserType
+from app.services.cache import user_cache, USER_ENTRY_BYTES
 
 # HTTP Bearer 认证方案
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """获取当前用户
-
-    从 JWT 令牌中解析用户信息
-
-    Args:
-        credentials: HTTP 认证凭据
-        db: 数据库会话
-
-    Returns:
-        User: 当前用户
+def _decode_credentials(credentials: HTTPAuthorizationCredentials) -> Tuple[str, str]:
+    """解析访问令牌，返回 (用户ID, 安全戳)
 
     Raises:
-        HTTPException: 认证失败时抛出 401 错误
+        HTTPException: 令牌无效时抛出 401 错误
     """
-    token = credentials.credentials
-    payload = decode_access_token(token)
+    payload = decode_access_token(credentials.credentials)
 
     if payload is None:
         raise HTTPException(
@@ -48,8 +37,16 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # 从数据库获取用户
-    user = db.query(User).filter(User.id == user_id).first()
+    # 安全戳引入前签发的令牌不含 stamp，对应迁移后的空安全戳
+    return user_id, payload.get("stamp", "")
+
+
+def _check_loaded_user(user: Optional[User], stamp: str) -> User:
+    """校验从数据库加载的用户及其安全戳
+
+    Raises:
+        HTTPException: 用户不存在或令牌已失效时抛出 401 错误
+    """
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -57,6 +54,22 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if user.security_stamp != stamp:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="认证令牌已失效，请重新登录",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return user
+
+
+def _check_active(user: User) -> User:
+    """检查用户是否被禁用
+
+    Raises:
+        HTTPException: 用户被禁用时抛出 403 错误
+    """
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -64,3 +77,134 @@ def get_current_user(
         )
 
     return user
+
+
+def _resolve_user(db: Session, user_id: str, stamp: str) -> User:
+    """按 (用户ID, 安全戳) 解析用户，优先使用进程内缓存
+
+    缓存命中时不访问数据库，返回的是已脱离会话的 User 对象（只读）。
+    未命中时查询数据库并校验安全戳：修改密码或禁用用户后安全戳更换，旧令牌返回 401。
+
+    Raises:
+        HTTPException: 用户不存在或令牌已失效时抛出 401 错误，用户被禁用时抛出 403 错误
+    """
+    user = user_cache.get(user_id, stamp)
+    if user is None:
+        user = _check_loaded_user(db.query(User).filter(User.id == user_id).first(), stamp)
+        db.expunge(user)
+        user_cache.set(user_id, user, size=USER_ENTRY_BYTES, stamp=stamp)
+
+    return _check_active(user)
+
+
+async def _resolve_user_async(db: AsyncSession, user_id: str, stamp: str) -> User:
+    """_resolve_user 的异步版本（共用同一个用户缓存）
+
+    未命中时查询后立即结束只读事务，连接归还连接池：
+    AI 调用等长时间等待外部服务的端点不会在整个请求期间占用数据库连接。
+    """
+    user = user_cache.get(user_id, stamp)
+    if user is None:
+        user = _check_loaded_user(await db.get(User, user_id), stamp)
+        db.expunge(user)
+        await db.commit()
+        user_cache.set(user_id, user, size=USER_ENTRY_BYTES, stamp=stamp)
+
+    return _check_active(user)
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """获取当前用户
+
+    从 JWT 令牌中解析用户信息。用户按 (用户ID, 安全戳) 缓存在进程内，
+    缓存对象以 merge(load=False) 关联到本次请求的会话，不产生查询，
+    端点仍可像以前一样修改并提交当前用户。
+
+    Args:
+        credentials: HTTP 认证凭据
+        db: 数据库会话
+
+    Returns:
+        User: 当前用户
+
+    Raises:
+        HTTPException: 认证失败时抛出 401 错误
+    """
+    user_id, stamp = _decode_credentials(credentials)
+    user = _resolve_user(db, user_id, stamp)
+    return db.merge(user, load=False)
+
+
+def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> str:
+    """获取当前用户ID
+
+    只需要用户ID的端点使用：缓存命中时既不查询数据库，也不构造会话中的用户对象。
+
+    Args:
+        credentials: HTTP 认证凭据
+        db: 数据库会话
+
+    Returns:
+        str: 当前用户ID
+
+    Raises:
+        HTTPException: 认证失败时抛出 401 错误
+    """
+    user_id, stamp = _decode_credentials(credentials)
+    return _resolve_user(db, user_id, stamp).id
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """获取当前用户（异步会话）
+
+    与 get_current_user 相同，用户对象关联到本次请求的 AsyncSession，
+    供使用 get_async_db 的端点使用。
+
+    Args:
+        credentials: HTTP 认证凭据
+        db: 异步数据库会话
+
+    Returns:
+        User: 当前用户
+
+    Raises:
+        HTTPException: 认证失败时抛出 401 错误
+    """
+    user_id, stamp = _decode_credentials(credentials)
+    user = await _resolve_user_async(db, user_id, stamp)
+    return await db.merge(user, load=False)
+
+
+async def get_current_admin(current_user: User = Depends(get_current_user_async)) -> User:
+    """获取当前管理员用户
+
+    Args:
+        current_user: 当前用户
+
+    Returns:
+        User: 当前用户（管理员）
+
+    Raises:
+        HTTPException: 当前用户不是管理员时抛出 403 错误
+    """
+    if current_user.user_type != UserType.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="需要管理员权限"
+        )
+
+    return current_user
+
+
+def invalidate_user(user_id: str) -> None:
+    """用户资料、密码或状态修改后使本进程的用户缓存失效"""
+    user_cache.invalidate(user_id)
@@ -1,7 +1,7 @@
 """API v1 路由"""
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, notes, notebooks, ai, conversations
+from app.api.v1.endpoints import auth, notes, notebooks, ai, conversations, export, bootstrap, admin
 
 api_router = APIRouter()
 
@@ -11,3 +11,6 @@ api_router.include_router(notes.router, prefix="/notes", tags=["笔记"])
 api_router.include_router(notebooks.router, prefix="/notebooks", tags=["笔记本"])
 api_router.include_router(ai.router, prefix="/ai", tags=["AI服务"])
 api_router.include_router(conversations.router, prefix="/ai", tags=["深度探索对话"])
+api_router.include_router(export.router, tags=["数据导出"])
+api_router.include_router(bootstrap.router, tags=["工作区"])
+api_router.include_router(admin.router, prefix="/admin", tags=["管理"])
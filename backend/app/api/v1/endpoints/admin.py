@@ -0,0 +1,29 @@
+"""管理 API 端点"""
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_admin
+from app.core.security import password_hasher
+from app.models import User
+from app.services.autosave import autosave_buffer
+from app.services.cache import cache_stats
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_runtime_stats(current_user: User = Depends(get_current_admin)):
+    """获取本进程的运行统计（仅管理员）
+
+    包含进程内缓存命中、自动保存缓冲和密码哈希线程池统计。
+
+    Args:
+        current_user: 当前用户（管理员）
+
+    Returns:
+        dict: 运行统计
+    """
+    return {
+        "caches": cache_stats(),
+        "autosave": autosave_buffer.stats(),
+        "password_hashing": password_hasher.stats(),
+    }
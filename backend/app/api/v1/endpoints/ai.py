@@ -1,18 +1,20 @@
 """AI 服务相关 API 端点"""
-from typing import Optional, AsyncGenerator
+import asyncio
+import json
+import re
+from functools import lru_cache
+from typing import Any, List, Optional, AsyncGenerator
 
 from agno.agent import Agent
 from agno.models.message import Message
 from agno.models.openai import OpenAIChat
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import StreamingResponse
 import logging
 from markdownify import markdownify as md
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user_async
 from app.api.v1.schemas import (
-    ChatRequest,
-    ChatResponse,
     ExploreRequest,
     ExploreResponse,
     ExtractPointRequest,
@@ -23,22 +25,177 @@ from app.api.v1.schemas import (
     CheckSummaryRequest,
     CheckSummaryResponse,
 )
-from app.models import User, CornellNote
+from app.models import User
 from app.core.config import settings
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# 客户端在 AI 调用完成前断开连接（nginx 约定的状态码，响应不会被客户端收到）
+HTTP_499_CLIENT_CLOSED_REQUEST = 499
+
+
+@lru_cache(maxsize=1)
 def get_explore_model() -> Optional[OpenAIChat]:
+    """获取模型（进程内共享）
+
+    模型对象缓存了 OpenAI 异步客户端，共享后所有请求复用同一个 HTTP 连接池。
+    """
     if not settings.explore_api_key or not settings.explore_base_url or not settings.explore_model_name:
         return None
-    return OpenAIChat(id=settings.explore_model_name, api_key=settings.explore_api_key, base_url=settings.explore_base_url, role_map={"user": "user", "assistant": "assistant",  "system": "system"})
+    return OpenAIChat(
+        id=settings.explore_model_name,
+        api_key=settings.explore_api_key,
+        base_url=settings.explore_base_url,
+        role_map={"user": "user", "assistant": "assistant",  "system": "system"},
+        timeout=settings.ai_request_timeout_seconds,
+    )
+
+
+async def _wait_for_disconnect(http_request: Request) -> None:
+    """等待客户端断开连接（请求体已被 FastAPI 读完，之后只会收到 http.disconnect）"""
+    while True:
+        message = await http_request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _run_agent(agent: Agent, messages: List[Message], http_request: Request) -> Any:
+    """异步调用模型，等待期间不阻塞事件循环
+
+    超过 settings.ai_request_timeout_seconds 或客户端断开时取消调用，
+    上游 HTTP 请求随之关闭，不再占用连接和模型配额。
+
+    Args:
+        agent: Agent
+        messages: 消息列表
+        http_request: 当前 HTTP 请求（用于检测客户端断开）
+
+    Returns:
+        Any: Agent 的运行结果
+
+    Raises:
+        HTTPException: 超时返回 504，客户端断开返回 499
+    """
+    call = asyncio.ensure_future(agent.arun(messages, stream=False))
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(http_request))
+    try:
+        done, _ = await asyncio.wait(
+            {call, disconnect},
+            timeout=settings.ai_request_timeout_seconds,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+    finally:
+        # 请求本身被取消时同样取消上游调用
+        call.cancel()
+        disconnect.cancel()
+
+    if call in done:
+        return call.result()
+    if disconnect in done:
+        raise HTTPException(
+            status_code=HTTP_499_CLIENT_CLOSED_REQUEST,
+            detail="客户端已断开连接",
+        )
+    raise HTTPException(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        detail="AI 服务响应超时，请稍后重试",
+    )
+
+
+def _sse_data(text: str) -> str:
+    """按 SSE 格式封装一帧数据：内容中的每一行各占一条 data: 行，客户端用换行拼接还原"""
+    return "".join(f"data: {line}\n" for line in re.split(r"\r\n|\r|\n", text)) + "\n"
+
+
+async def _stream_agent(
+    agent: Agent,
+    messages: List[Message],
+    http_request: Request,
+) -> AsyncGenerator[str, None]:
+    """以 SSE 流式输出模型回答
+
+    后台任务用异步迭代器读取上游增量并追加到缓冲区，本生成器在第一个增量到达后
+    再等待 settings.ai_stream_flush_interval_seconds，把期间的增量合并为一帧发送。
+    客户端读取较慢时发送本身会等待，期间的增量继续在缓冲区中合并，帧不会堆积。
+    超过 settings.ai_stream_heartbeat_seconds 没有发送任何内容时发送一条注释作为心跳。
+    客户端断开或响应被取消时取消上游调用。
+
+    Args:
+        agent: Agent
+        messages: 消息列表
+        http_request: 当前 HTTP 请求（用于检测客户端断开）
+
+    Yields:
+        str: SSE 帧，正常结束时以 data: [DONE] 结尾
+    """
+    loop = asyncio.get_running_loop()
+    flush_interval = settings.ai_stream_flush_interval_seconds
+    heartbeat = settings.ai_stream_heartbeat_seconds
+    pending: List[str] = []
+    has_data = asyncio.Event()
+
+    async def pump() -> None:
+        async for chunk in agent.arun(messages, stream=True):
+            # 提取增量内容（根据 Agno 版本，chunk 通常包含 content 属性）
+            content = getattr(chunk, "content", None)
+            if content:
+                pending.append(content)
+                has_data.set()
+
+    upstream = asyncio.ensure_future(pump())
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(http_request))
+    last_sent = loop.time()
+    try:
+        while True:
+            data_ready = asyncio.ensure_future(has_data.wait())
+            try:
+                await asyncio.wait(
+                    {upstream, disconnect, data_ready},
+                    timeout=max(0.0, last_sent + heartbeat - loop.time()),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                data_ready.cancel()
+            if disconnect.done():
+                return
+
+            if has_data.is_set() and not upstream.done():
+                # 等待一个刷新间隔，合并期间到达的增量
+                await asyncio.wait({upstream, disconnect}, timeout=flush_interval)
+                if disconnect.done():
+                    return
+
+            if pending:
+                text = "".join(pending)
+                pending.clear()
+                has_data.clear()
+                yield _sse_data(text)
+                last_sent = loop.time()
+
+            if upstream.done():
+                try:
+                    upstream.result()
+                except Exception as e:
+                    logger.error(f"深度探索失败: {str(e)}")
+                    yield _sse_data(f"对话异常：{str(e)}")
+                    return
+                yield _sse_data("[DONE]")
+                return
+
+            if loop.time() - last_sent >= heartbeat:
+                yield ": keep-alive\n\n"
+                last_sent = loop.time()
+    finally:
+        upstream.cancel()
+        disconnect.cancel()
 
 
 @router.post("/explore", response_model=ExploreResponse)
 async def explore(
     request: ExploreRequest,
-    current_user: User = Depends(get_current_user),
+    http_request: Request,
+    current_user: User = Depends(get_current_user_async),
 ) -> StreamingResponse:
     """深度探索对话接口
 
@@ -47,10 +204,11 @@ async def explore(
 
     Args:
         request: 探索请求
+        http_request: HTTP 请求（用于检测客户端断开）
         current_user: 当前用户
 
     Returns:
-        ExploreResponse: AI探索回答（Markdown格式）
+        ExploreResponse: AI探索回答（Markdown格式），以 SSE 流式返回
 
     Raises:
         HTTPException: AI服务未配置或调用失败
@@ -95,22 +253,8 @@ async def explore(
 
     # messages.append(Message(role="user", content=request.question))
 
-    async def generate() -> AsyncGenerator[str, None]:
-        """Generate SSE stream."""
-        try:
-            response_stream = agent.run(messages, stream=True)
-
-            for chunk in response_stream:
-                # 提取增量内容（根据 Agno 版本，chunk 通常包含 content 属性）
-                if chunk.content:
-                    # 按照 SSE 标准格式封装数据
-                    yield f"data: {chunk.content}\n\n"
-            yield "data: [DONE]\n\n"
-        except Exception as e:
-            yield f"data: 对话异常：{str(e)}\n\n"
-
     return StreamingResponse(
-        generate(),
+        _stream_agent(agent, messages, http_request),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -123,7 +267,8 @@ async def explore(
 @router.post("/extractPoint", response_model=ExtractPointResponse)
 async def extract_point(
     request: ExtractPointRequest,
-    current_user: User = Depends(get_current_user),
+    http_request: Request,
+    current_user: User = Depends(get_current_user_async),
 ) -> ExtractPointResponse:
     """提炼康奈尔笔记的线索和问题
 
@@ -131,13 +276,14 @@ async def extract_point(
 
     Args:
         request: 提炼请求（包含笔记ID和内容）
+        http_request: HTTP 请求（用于检测客户端断开）
         current_user: 当前用户
 
     Returns:
         ExtractPointResponse: 提炼的线索和问题列表
 
     Raises:
-        HTTPException: AI服务未配置或调用失败
+        HTTPException: AI服务未配置、调用失败或超时
     """
 
     model = get_explore_model()
@@ -192,8 +338,8 @@ async def extract_point(
     ]
 
     try:
-        # 同步调用，不使用流式
-        response = agent.run(messages, stream=False)
+        # 异步调用，不使用流式
+        response = await _run_agent(agent, messages, http_request)
 
         # 提取响应内容
         answer = response.content if hasattr(response, 'content') else str(response)
@@ -210,6 +356,8 @@ async def extract_point(
 
         return ExtractPointResponse(cue_points=cue_points)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"提炼线索失败: {str(e)}")
         raise HTTPException(
@@ -221,7 +369,8 @@ async def extract_point(
 @router.post("/generateMindmap", response_model=GenerateMindmapResponse)
 async def generate_mindmap(
     request: GenerateMindmapRequest,
-    current_user: User = Depends(get_current_user),
+    http_request: Request,
+    current_user: User = Depends(get_current_user_async),
 ) -> GenerateMindmapResponse:
     """生成思维导图
 
@@ -229,13 +378,14 @@ async def generate_mindmap(
 
     Args:
         request: 生成请求（包含笔记ID和内容）
+        http_request: HTTP 请求（用于检测客户端断开）
         current_user: 当前用户
 
     Returns:
         GenerateMindmapResponse: 思维导图数据
 
     Raises:
-        HTTPException: AI服务未配置或调用失败
+        HTTPException: AI服务未配置、调用失败或超时
     """
 
     model = get_explore_model()
@@ -324,16 +474,13 @@ async def generate_mindmap(
     ]
 
     try:
-        # 同步调用
-        response = agent.run(messages, stream=False)
+        # 异步调用
+        response = await _run_agent(agent, messages, http_request)
 
         # 提取响应内容
         answer = response.content if hasattr(response, 'content') else str(response)
 
         # 尝试从响应中提取JSON
-        import json
-        import re
-
         # 提取JSON部分（可能被包裹在markdown代码块中）
         json_match = re.search(r'```json\s*(\{[\s\S]*?\})\s*```', answer)
         if json_match:
@@ -354,6 +501,8 @@ async def generate_mindmap(
 
         return GenerateMindmapResponse(mindmap=mindmap)
 
+    except HTTPException:
+        raise
     except json.JSONDecodeError as e:
         logger.error(f"思维导图JSON解析失败: {str(e)}, 原始内容: {answer[:200]}")
         # 返回默认结构
@@ -381,7 +530,8 @@ async def generate_mindmap(
 @router.post("/checkSummary", response_model=CheckSummaryResponse)
 async def check_summary(
     request: CheckSummaryRequest,
-    current_user: User = Depends(get_current_user),
+    http_request: Request,
+    current_user: User = Depends(get_current_user_async),
 ) -> CheckSummaryResponse:
     """检查用户总结
 
@@ -389,13 +539,14 @@ async def check_summary(
 
     Args:
         request: 检查请求（包含笔记ID、笔记内容和用户总结）
+        http_request: HTTP 请求（用于检测客户端断开）
         current_user: 当前用户
 
     Returns:
         CheckSummaryResponse: AI反馈内容
 
     Raises:
-        HTTPException: AI服务未配置或调用失败
+        HTTPException: AI服务未配置、调用失败或超时
     """
 
     model = get_explore_model()
@@ -481,14 +632,16 @@ async def check_summary(
     ]
 
     try:
-        # 同步调用
-        response = agent.run(messages, stream=False)
+        # 异步调用
+        response = await _run_agent(agent, messages, http_request)
 
         # 提取响应内容
         feedback = response.content if hasattr(response, 'content') else str(response)
 
         return CheckSummaryResponse(feedback=feedback)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"检查总结失败: {str(e)}")
         raise HTTPException(
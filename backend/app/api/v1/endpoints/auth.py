@@ -1,26 +1,49 @@
 """认证相关 API 端点"""
 from datetime import timedelta, datetime
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_async_db, get_current_user_async, invalidate_user
 from app.api.v1.schemas import (
     UserRegister,
     UserLogin,
     LoginResponse,
+    RefreshTokenRequest,
+    RefreshTokenResponse,
     UserResponse,
     ChangePassword,
     UpdateProfile,
 )
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import password_hasher, create_access_token, new_security_stamp
 from app.core.config import settings
-from app.models import User, Notebook
+from app.models import User, Notebook, UserType
+from app.services.sessions import create_session, revoke_session, revoke_user_sessions, rotate_session
 
 router = APIRouter()
 
 
+def _issue_access_token(user: User) -> str:
+    """为用户签发访问令牌（携带当前安全戳）"""
+    return create_access_token(
+        data={
+            "sub": user.id,
+            "username": user.username,
+            "user_type": user.user_type.value,
+            "stamp": user.security_stamp,
+        },
+        expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
+    )
+
+
+def _refresh_expires_in() -> int:
+    """刷新令牌有效期（秒）"""
+    return settings.refresh_token_expire_days * 24 * 60 * 60
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """用户注册
 
     Args:
@@ -41,8 +64,15 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
             detail="邀请码错误，暂不允许注册"
         )
 
+    # 管理员账号不允许自行注册（管理员可查看运行统计）
+    if user_data.user_type == UserType.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="不允许注册管理员账号"
+        )
+
     # 检查用户名是否已存在
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
+    existing_user = (await db.execute(select(User.id).where(User.username == user_data.username))).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -50,24 +80,28 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         )
 
     # 检查邮箱是否已存在
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
+    existing_email = (await db.execute(select(User.id).where(User.email == user_data.email))).first()
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="邮箱已被注册"
         )
 
+    # 结束只读事务，哈希计算期间不占用数据库连接
+    await db.rollback()
+    password_hash = await password_hasher.hash(user_data.password)
+
     # 创建新用户
     new_user = User(
         username=user_data.username,
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=password_hash,
         full_name=user_data.full_name,
         user_type=user_data.user_type,
     )
 
     db.add(new_user)
-    db.flush()  # 获取用户 ID
+    await db.flush()  # 获取用户 ID
 
     # 为新用户创建默认笔记本
     default_notebook = Notebook(
@@ -78,31 +112,46 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     )
 
     db.add(default_notebook)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return new_user
 
 
 @router.post("/login", response_model=LoginResponse)
-async def login(login_data: UserLogin, db: Session = Depends(get_db)):
+async def login(
+    login_data: UserLogin,
+    user_agent: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
     """用户登录
 
+    创建一个登录会话，访问令牌过期后客户端用返回的刷新令牌调用 /auth/refresh，
+    无需再次提交密码。
+
     Args:
         login_data: 登录数据
+        user_agent: 客户端 User-Agent，记录在会话中
         db: 数据库会话
 
     Returns:
-        LoginResponse: 登录令牌和用户信息
+        LoginResponse: 访问令牌、刷新令牌和用户信息
 
     Raises:
         HTTPException: 认证失败时抛出 401 错误
     """
     # 查找用户
-    user = db.query(User).filter(User.username == login_data.username).first()
-
-    # 验证用户名和密码
-    if not user or not verify_password(login_data.password, user.password_hash):
+    user = (await db.execute(select(User).where(User.username == login_data.username))).scalars().first()
+    password_hash = user.password_hash if user else None
+    # 结束只读事务，哈希计算期间不占用数据库连接（提交不会使已加载的属性过期）
+    await db.commit()
+
+    # 验证用户名和密码（成本参数已过时的哈希同时得到升级后的新哈希）
+    verified, new_hash = (
+        await password_hasher.verify_and_update(login_data.password, password_hash)
+        if user else (False, None)
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误",
@@ -116,28 +165,99 @@ async def login(login_data: UserLogin, db: Session = Depends(get_db)):
             detail="用户已被禁用"
         )
 
-    # 更新最后登录时间
+    # 更新最后登录时间，并写入升级后的密码哈希
     user.last_login = datetime.utcnow()
-    db.commit()
+    if new_hash:
+        user.password_hash = new_hash
 
-    # 创建访问令牌
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": user.id, "username": user.username, "user_type": user.user_type.value},
-        expires_delta=access_token_expires
+    # 在提交前构建响应，提交后无需回读用户
+    user_id = user.id
+    response = LoginResponse(
+        access_token=_issue_access_token(user),
+        token_type="bearer",
+        expires_in=settings.access_token_expire_minutes * 60,
+        refresh_token=await db.run_sync(create_session, user_id, user_agent),
+        refresh_expires_in=_refresh_expires_in(),
+        user=UserResponse.model_validate(user)
     )
+    await db.commit()
+    invalidate_user(user_id)
+
+    return response
+
+
+@router.post("/refresh", response_model=RefreshTokenResponse)
+async def refresh_access_token(token_data: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
+    """刷新访问令牌
+
+    用刷新令牌换取新的访问令牌，不校验密码、不做 bcrypt 计算。
+    刷新令牌每次使用后轮换，响应中返回新的刷新令牌，旧令牌立即失效。
+
+    Args:
+        token_data: 刷新令牌
+        db: 数据库会话
+
+    Returns:
+        RefreshTokenResponse: 新的访问令牌和刷新令牌
+
+    Raises:
+        HTTPException: 刷新令牌无效、已使用、已撤销或已过期时抛出 401 错误
+        HTTPException: 用户被禁用时抛出 403 错误
+    """
+    rotated = await db.run_sync(rotate_session, token_data.refresh_token)
+    user = await db.get(User, rotated[0]) if rotated else None
+    is_active = user.is_active if user else False
+    if not is_active:
+        # 立即结束写事务（撤销轮换），不把写锁保留到会话关闭
+        await db.rollback()
+
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="登录已过期，请重新登录",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if not is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="用户已被禁用"
+        )
 
-    return LoginResponse(
-        access_token=access_token,
+    response = RefreshTokenResponse(
+        access_token=_issue_access_token(user),
         token_type="bearer",
         expires_in=settings.access_token_expire_minutes * 60,
-        user=UserResponse.model_validate(user)
+        refresh_token=rotated[1],
+        refresh_expires_in=_refresh_expires_in(),
     )
+    await db.commit()
+
+    return response
+
+
+@router.post("/logout", response_model=dict)
+async def logout(token_data: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
+    """退出登录
+
+    撤销刷新令牌对应的会话。已签发的访问令牌在过期前仍然有效，客户端应自行丢弃。
+
+    Args:
+        token_data: 刷新令牌
+        db: 数据库会话
+
+    Returns:
+        dict: 成功消息
+    """
+    await db.run_sync(revoke_session, token_data.refresh_token)
+    await db.commit()
+
+    return {"message": "已退出登录"}
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_async)
 ):
     """获取当前登录用户信息
 
@@ -156,41 +276,62 @@ async def get_current_user_info(
 @router.put("/change-password", response_model=dict)
 async def change_password(
     password_data: ChangePassword,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_agent: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """修改密码
 
+    更换安全戳并撤销全部登录会话：此前签发的所有访问令牌和刷新令牌立即失效
+    （其他设备需重新登录），响应中返回为当前设备签发的新令牌。
+
     Args:
         password_data: 密码修改数据
+        user_agent: 客户端 User-Agent
         current_user: 当前登录用户
         db: 数据库会话
 
     Returns:
-        dict: 成功消息
+        dict: 成功消息、新的访问令牌和刷新令牌
 
     Raises:
         HTTPException: 当前密码错误时抛出 400 错误
     """
+    # 结束只读事务，哈希计算期间不占用数据库连接
+    password_hash = current_user.password_hash
+    await db.commit()
+
     # 验证当前密码
-    if not verify_password(password_data.old_password, current_user.password_hash):
+    if not await password_hasher.verify(password_data.old_password, password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="当前密码错误"
         )
 
     # 更新密码
-    current_user.password_hash = get_password_hash(password_data.new_password)
-    db.commit()
-
-    return {"message": "密码修改成功"}
+    current_user.password_hash = await password_hasher.hash(password_data.new_password)
+    current_user.security_stamp = new_security_stamp()
+    user_id, access_token = current_user.id, _issue_access_token(current_user)
+    await db.run_sync(revoke_user_sessions, user_id)
+    refresh_token = await db.run_sync(create_session, user_id, user_agent)
+    await db.commit()
+    invalidate_user(user_id)
+
+    return {
+        "message": "密码修改成功",
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": settings.access_token_expire_minutes * 60,
+        "refresh_token": refresh_token,
+        "refresh_expires_in": _refresh_expires_in(),
+    }
 
 
 @router.put("/update-profile", response_model=UserResponse)
 async def update_profile(
     profile_data: UpdateProfile,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """更新用户信息
 
@@ -207,10 +348,12 @@ async def update_profile(
     """
     # 如果修改邮箱，检查是否已被其他用户使用
     if profile_data.email and profile_data.email != current_user.email:
-        existing_user = db.query(User).filter(
-            User.email == profile_data.email,
-            User.id != current_user.id
-        ).first()
+        existing_user = (await db.execute(
+            select(User.id).where(
+                User.email == profile_data.email,
+                User.id != current_user.id
+            )
+        )).first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -228,7 +371,8 @@ async def update_profile(
     if profile_data.location is not None:
         current_user.location = profile_data.location
 
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    invalidate_user(current_user.id)
+    await db.refresh(current_user)
 
     return current_user
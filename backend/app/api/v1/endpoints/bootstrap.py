@@ -0,0 +1,121 @@
+"""工作区启动数据 API 端点"""
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_async_db, get_current_user_async
+from app.api.v1.endpoints.notebooks import build_notebook_response
+from app.api.v1.schemas import BootstrapResponse, NoteListItem, UserResponse
+from app.models import CornellNote, Notebook, User
+from app.services.cache import bootstrap_cache
+from app.utils.etag import etag_matches, version_etag
+
+router = APIRouter()
+
+# 工作区数据允许客户端缓存，但每次使用前必须用 ETag 重新验证
+BOOTSTRAP_CACHE_CONTROL = "private, no-cache"
+
+
+async def _workspace_etag(db: AsyncSession, user: User, starred_limit: int, recent_limit: int) -> str:
+    """生成工作区版本 ETag（一次查询）
+
+    笔记和笔记本的任何写入（包括软删除和恢复）都会更新其 updated_at，
+    两者各自的最大 updated_at（按 owner_id 索引查找）加上用户资料即可代表大部分工作区版本。
+    浏览次数和笔记本统计刻意不更新 updated_at，它们的写入会把 users.workspace_version 加一
+    （见 app.services.workspace），一并纳入版本。查询代价与笔记数量无关，304 重新验证同样廉价。
+
+    用户对象可能来自进程内缓存，workspace_version 每次从数据库读取。
+    """
+    notes_version = (
+        select(func.max(CornellNote.updated_at))
+        .where(CornellNote.owner_id == user.id)
+        .scalar_subquery()
+    )
+    notebooks_version = (
+        select(func.max(Notebook.updated_at))
+        .where(Notebook.owner_id == user.id)
+        .scalar_subquery()
+    )
+    workspace_version = (
+        select(User.workspace_version)
+        .where(User.id == user.id)
+        .scalar_subquery()
+    )
+    row = (await db.execute(select(notes_version, notebooks_version, workspace_version))).one()
+
+    return version_etag(
+        UserResponse.model_validate(user).model_dump_json(),
+        *row,
+        starred_limit,
+        recent_limit,
+    )
+
+
+@router.get("/bootstrap", response_model=BootstrapResponse)
+async def get_bootstrap(
+    starred_limit: int = Query(50, ge=0, le=200, description="星标笔记数量上限"),
+    recent_limit: int = Query(20, ge=0, le=100, description="最近编辑笔记数量上限"),
+    if_none_match: Optional[str] = Header(None, description="条件请求：上次获取的 ETag"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取工作区启动数据
+
+    一次返回用户资料、笔记本（附带统计）、星标笔记和最近编辑的笔记，
+    替代应用启动时对 /auth/me、/notebooks 和多个 /notes 的分别请求。
+
+    查询数量固定：一次版本查询；未命中缓存时再加笔记本、星标笔记、最近笔记各一次。
+    - If-None-Match 与工作区 ETag 一致时直接返回 304
+    - 否则优先使用按 ETag 校验的进程内缓存
+
+    Args:
+        starred_limit: 星标笔记数量上限
+        recent_limit: 最近编辑笔记数量上限
+        if_none_match: If-None-Match 请求头
+        current_user: 当前用户
+        db: 数据库会话
+
+    Returns:
+        BootstrapResponse: 工作区启动数据（ETag 匹配时返回 304 空响应）
+    """
+    etag = await _workspace_etag(db, current_user, starred_limit, recent_limit)
+    headers = {"ETag": etag, "Cache-Control": BOOTSTRAP_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    cache_key = (current_user.id, starred_limit, recent_limit)
+    payload = bootstrap_cache.get(cache_key, etag)
+    if payload is None:
+        notebooks = (await db.execute(
+            select(Notebook).where(
+                Notebook.owner_id == current_user.id,
+                Notebook.deleted_at.is_(None)
+            ).order_by(Notebook.created_at.asc())
+        )).scalars().all()
+
+        live_notes = select(CornellNote).where(
+            CornellNote.owner_id == current_user.id,
+            CornellNote.deleted_at.is_(None)
+        ).order_by(desc(CornellNote.updated_at), desc(CornellNote.id))
+        starred_notes = (await db.execute(
+            live_notes.where(CornellNote.is_starred == True).limit(starred_limit)
+        )).scalars().all() if starred_limit else []
+        recent_notes = (await db.execute(
+            live_notes.limit(recent_limit)
+        )).scalars().all() if recent_limit else []
+
+        serialized = BootstrapResponse(
+            user=UserResponse.model_validate(current_user),
+            notebooks=[build_notebook_response(notebook) for notebook in notebooks],
+            starred_notes=[NoteListItem.model_validate(note) for note in starred_notes],
+            recent_notes=[NoteListItem.model_validate(note) for note in recent_notes],
+            version=etag,
+        ).model_dump_json()
+        payload = json.loads(serialized)
+        bootstrap_cache.set(cache_key, payload, size=len(serialized.encode("utf-8")), stamp=etag)
+
+    return JSONResponse(content=payload, headers=headers)
@@ -1,26 +1,37 @@
 """深度探索对话管理 API 端点"""
-from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 import uuid
 from datetime import datetime, timezone
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user_async, get_async_db
 from app.api.v1.schemas import (
     ConversationSaveRequest,
     ConversationResponse,
-    ConversationListResponse,
 )
 from app.models import User, ExploreConversation, ExploreQAPair, CornellNote
 
 router = APIRouter()
 
 
+async def _load_conversation(db: AsyncSession, conversation_id: str) -> ExploreConversation:
+    """重新加载对话记录及其问答对（异步会话中关系不能延迟加载）"""
+    return (await db.execute(
+        select(ExploreConversation).options(
+            selectinload(ExploreConversation.qa_pairs)
+        ).where(
+            ExploreConversation.id == conversation_id
+        ).execution_options(populate_existing=True)
+    )).scalars().one()
+
+
 @router.post("/conversations", response_model=ConversationResponse, status_code=status.HTTP_201_CREATED)
 async def save_conversation(
     request: ConversationSaveRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """保存深度探索对话记录
 
@@ -36,10 +47,12 @@ async def save_conversation(
         HTTPException: 笔记不存在或无权限
     """
     # 验证笔记是否存在且属于当前用户
-    note = db.query(CornellNote).filter(
-        CornellNote.id == request.note_id,
-        CornellNote.owner_id == current_user.id
-    ).first()
+    note = (await db.execute(
+        select(CornellNote.id).where(
+            CornellNote.id == request.note_id,
+            CornellNote.owner_id == current_user.id
+        )
+    )).first()
 
     if not note:
         raise HTTPException(
@@ -48,16 +61,20 @@ async def save_conversation(
         )
 
     # 检查是否已存在该笔记的对话记录
-    existing_conversation = db.query(ExploreConversation).filter(
-        ExploreConversation.note_id == request.note_id,
-        ExploreConversation.user_id == current_user.id
-    ).first()
+    existing_conversation = (await db.execute(
+        select(ExploreConversation).where(
+            ExploreConversation.note_id == request.note_id,
+            ExploreConversation.user_id == current_user.id
+        )
+    )).scalars().first()
 
     if existing_conversation:
         # 删除旧的问答对
-        db.query(ExploreQAPair).filter(
-            ExploreQAPair.conversation_id == existing_conversation.id
-        ).delete()
+        await db.execute(
+            delete(ExploreQAPair)
+            .where(ExploreQAPair.conversation_id == existing_conversation.id)
+            .execution_options(synchronize_session=False)
+        )
 
         # 添加新的问答对
         for i, qa in enumerate(request.qa_pairs):
@@ -76,9 +93,8 @@ async def save_conversation(
         existing_conversation.qa_count = len(request.qa_pairs)
         existing_conversation.updated_at = datetime.now(timezone.utc)
 
-        db.commit()
-        db.refresh(existing_conversation)
-        return existing_conversation
+        await db.commit()
+        return await _load_conversation(db, existing_conversation.id)
     else:
         # 创建新对话
         conversation = ExploreConversation(
@@ -88,7 +104,7 @@ async def save_conversation(
             qa_count=len(request.qa_pairs)
         )
         db.add(conversation)
-        db.flush()  # 获取 conversation.id
+        await db.flush()  # 获取 conversation.id
 
         # 添加问答对
         for i, qa in enumerate(request.qa_pairs):
@@ -103,16 +119,15 @@ async def save_conversation(
             )
             db.add(qa_pair)
 
-        db.commit()
-        db.refresh(conversation)
-        return conversation
+        await db.commit()
+        return await _load_conversation(db, conversation.id)
 
 
 @router.get("/conversations/{note_id}", response_model=ConversationResponse | None)
 async def get_conversation(
     note_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取笔记的深度探索对话记录
 
@@ -127,10 +142,12 @@ async def get_conversation(
         ConversationResponse | None: 对话记录，如果不存在则返回 null
     """
     # 先验证笔记是否存在且属于当前用户
-    note = db.query(CornellNote).filter(
-        CornellNote.id == note_id,
-        CornellNote.owner_id == current_user.id
-    ).first()
+    note = (await db.execute(
+        select(CornellNote.id).where(
+            CornellNote.id == note_id,
+            CornellNote.owner_id == current_user.id
+        )
+    )).first()
 
     if not note:
         raise HTTPException(
@@ -138,11 +155,15 @@ async def get_conversation(
             detail=f"笔记不存在或无权限访问 (note_id: {note_id})"
         )
 
-    # 查询对话记录（可能不存在）
-    conversation = db.query(ExploreConversation).filter(
-        ExploreConversation.note_id == note_id,
-        ExploreConversation.user_id == current_user.id
-    ).first()
+    # 查询对话记录（可能不存在），问答对一并加载
+    conversation = (await db.execute(
+        select(ExploreConversation).options(
+            selectinload(ExploreConversation.qa_pairs)
+        ).where(
+            ExploreConversation.note_id == note_id,
+            ExploreConversation.user_id == current_user.id
+        )
+    )).scalars().first()
 
     return conversation  # 如果没有，FastAPI 会返回 null
 
@@ -150,8 +171,8 @@ async def get_conversation(
 @router.delete("/conversations/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_conversation(
     note_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """删除笔记的深度探索对话记录
 
@@ -163,10 +184,12 @@ async def delete_conversation(
     Raises:
         HTTPException: 对话记录不存在
     """
-    conversation = db.query(ExploreConversation).filter(
-        ExploreConversation.note_id == note_id,
-        ExploreConversation.user_id == current_user.id
-    ).first()
+    conversation = (await db.execute(
+        select(ExploreConversation).where(
+            ExploreConversation.note_id == note_id,
+            ExploreConversation.user_id == current_user.id
+        )
+    )).scalars().first()
 
     if not conversation:
         raise HTTPException(
@@ -174,5 +197,5 @@ async def delete_conversation(
             detail="对话记录不存在"
         )
 
-    db.delete(conversation)
-    db.commit()
+    await db.delete(conversation)
+    await db.commit()
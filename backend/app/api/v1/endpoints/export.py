@@ -0,0 +1,66 @@
+"""数据导出 API 端点"""
+from datetime import datetime
+from typing import Literal, Optional
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_current_user_id
+from app.core.database import SessionLocal
+from app.services import note_export
+from app.services.autosave import autosave_buffer
+
+router = APIRouter()
+
+
+def build_export_response(
+    owner_id: str,
+    export_format: str,
+    include_conversations: bool,
+    filename: str,
+    notebook_id: Optional[str] = None,
+) -> StreamingResponse:
+    """构建流式导出响应
+
+    响应流在请求处理函数返回后才开始读取数据库，因此使用独立的会话，在流结束时关闭。
+    读取前先写回该用户尚未落库的自动保存内容，导出包含所有已确认的编辑。
+
+    Args:
+        owner_id: 导出的用户ID
+        export_format: ndjson 或 zip
+        include_conversations: 是否包含深度探索对话
+        filename: 下载文件名（不含扩展名）
+        notebook_id: 只导出该笔记本（可选）
+
+    Returns:
+        StreamingResponse: 流式响应
+    """
+    exporter = note_export.export_zip if export_format == "zip" else note_export.export_ndjson
+    media_type = "application/zip" if export_format == "zip" else "application/x-ndjson"
+
+    def stream():
+        autosave_buffer.flush(SessionLocal, autosave_buffer.pending_note_ids(owner_id=owner_id), force=True)
+        db = SessionLocal()
+        try:
+            yield from exporter(db, owner_id, notebook_id, include_conversations)
+        finally:
+            db.close()
+
+    full_name = f"{filename}.{export_format}"
+    headers = {
+        # filename 为 ASCII 兜底，filename* 携带 UTF-8 文件名（RFC 6266）
+        "Content-Disposition": f"attachment; filename=\"export.{export_format}\"; filename*=UTF-8''{quote(full_name)}"
+    }
+    return StreamingResponse(stream(), media_type=media_type, headers=headers)
+
+
+@router.get("/export")
+def export_account(
+    format: Literal["ndjson", "zip"] = Query("zip", description="导出格式"),
+    include_conversations: bool = Query(True, description="是否包含深度探索对话"),
+    current_user_id: str = Depends(get_current_user_id),
+):
+    """导出当前用户的全部笔记本、笔记和深度探索对话（流式下载）"""
+    filename = f"cornell-notes-{datetime.utcnow():%Y%m%d}"
+    return build_export_response(current_user_id, format, include_conversations, filename)
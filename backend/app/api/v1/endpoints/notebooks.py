@@ -1,7 +1,9 @@
 """笔记本相关的 API 端点"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import select
 
 from app.api.deps import get_db, get_current_user
 from app.api.v1.schemas.notebook import (
@@ -13,10 +15,32 @@ from app.api.v1.schemas.notebook import (
 from app.models.user import User
 from app.models.notebook import Notebook
 from app.models.cornell_note import CornellNote
+from app.api.v1.endpoints.export import build_export_response
+from app.services.note_copy import copy_notes
+from app.services.note_export import safe_filename
 
 router = APIRouter()
 
 
+def build_notebook_response(notebook: Notebook) -> NotebookResponse:
+    """由笔记本（含冗余计数）构建响应"""
+    return NotebookResponse(
+        id=notebook.id,
+        title=notebook.title,
+        description=notebook.description,
+        color=notebook.color,
+        icon=notebook.icon or "📚",  # 确保有默认值
+        owner_id=notebook.owner_id,
+        is_archived=notebook.is_archived,
+        is_public=notebook.is_public,
+        note_count=notebook.note_count,
+        starred_count=notebook.starred_count,
+        word_count=notebook.word_count,
+        created_at=notebook.created_at,
+        updated_at=notebook.updated_at,
+    )
+
+
 @router.get("", response_model=NotebookListResponse)
 def list_notebooks(
     page: int = 1,
@@ -44,35 +68,8 @@ def list_notebooks(
     offset = (page - 1) * page_size
     notebooks = query.offset(offset).limit(page_size).all()
 
-    # 统计每个笔记本的笔记数量
-    notebook_ids = [nb.id for nb in notebooks]
-    note_counts = dict(
-        db.query(CornellNote.notebook_id, func.count(CornellNote.id))
-        .filter(
-            CornellNote.notebook_id.in_(notebook_ids),
-            CornellNote.deleted_at.is_(None),
-        )
-        .group_by(CornellNote.notebook_id)
-        .all()
-    ) if notebook_ids else {}
-
-    # 构建响应
-    items = []
-    for nb in notebooks:
-        nb_dict = {
-            "id": nb.id,
-            "title": nb.title,
-            "description": nb.description,
-            "color": nb.color,
-            "icon": nb.icon or "📚",  # 如果为 None，使用默认图标
-            "owner_id": nb.owner_id,
-            "is_archived": nb.is_archived,
-            "is_public": nb.is_public,
-            "note_count": note_counts.get(nb.id, 0),
-            "created_at": nb.created_at,
-            "updated_at": nb.updated_at,
-        }
-        items.append(NotebookResponse(**nb_dict))
+    # 笔记数量等统计直接读取笔记本上的冗余计数
+    items = [build_notebook_response(nb) for nb in notebooks]
 
     return NotebookListResponse(
         items=items,
@@ -101,19 +98,7 @@ def create_notebook(
     db.commit()
     db.refresh(new_notebook)
 
-    return NotebookResponse(
-        id=new_notebook.id,
-        title=new_notebook.title,
-        description=new_notebook.description,
-        color=new_notebook.color,
-        icon=new_notebook.icon or "📚",  # 确保有默认值
-        owner_id=new_notebook.owner_id,
-        is_archived=new_notebook.is_archived,
-        is_public=new_notebook.is_public,
-        note_count=0,
-        created_at=new_notebook.created_at,
-        updated_at=new_notebook.updated_at,
-    )
+    return build_notebook_response(new_notebook)
 
 
 @router.get("/{notebook_id}", response_model=NotebookResponse)
@@ -139,29 +124,7 @@ def get_notebook(
             detail="笔记本不存在",
         )
 
-    # 统计笔记数量
-    note_count = (
-        db.query(func.count(CornellNote.id))
-        .filter(
-            CornellNote.notebook_id == notebook_id,
-            CornellNote.deleted_at.is_(None),
-        )
-        .scalar()
-    )
-
-    return NotebookResponse(
-        id=notebook.id,
-        title=notebook.title,
-        description=notebook.description,
-        color=notebook.color,
-        icon=notebook.icon or "📚",  # 确保有默认值
-        owner_id=notebook.owner_id,
-        is_archived=notebook.is_archived,
-        is_public=notebook.is_public,
-        note_count=note_count or 0,
-        created_at=notebook.created_at,
-        updated_at=notebook.updated_at,
-    )
+    return build_notebook_response(notebook)
 
 
 @router.put("/{notebook_id}", response_model=NotebookResponse)
@@ -196,29 +159,7 @@ def update_notebook(
     db.commit()
     db.refresh(notebook)
 
-    # 统计笔记数量
-    note_count = (
-        db.query(func.count(CornellNote.id))
-        .filter(
-            CornellNote.notebook_id == notebook_id,
-            CornellNote.deleted_at.is_(None),
-        )
-        .scalar()
-    )
-
-    return NotebookResponse(
-        id=notebook.id,
-        title=notebook.title,
-        description=notebook.description,
-        color=notebook.color,
-        icon=notebook.icon or "📚",  # 确保有默认值
-        owner_id=notebook.owner_id,
-        is_archived=notebook.is_archived,
-        is_public=notebook.is_public,
-        note_count=note_count or 0,
-        created_at=notebook.created_at,
-        updated_at=notebook.updated_at,
-    )
+    return build_notebook_response(notebook)
 
 
 @router.delete("/{notebook_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -245,19 +186,10 @@ def delete_notebook(
         )
 
     # 检查是否有笔记
-    note_count = (
-        db.query(func.count(CornellNote.id))
-        .filter(
-            CornellNote.notebook_id == notebook_id,
-            CornellNote.deleted_at.is_(None),
-        )
-        .scalar()
-    )
-
-    if note_count > 0:
+    if notebook.note_count > 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"笔记本中还有 {note_count} 条笔记，请先删除或移动笔记",
+            detail=f"笔记本中还有 {notebook.note_count} 条笔记，请先删除或移动笔记",
         )
 
     # 软删除
@@ -266,3 +198,90 @@ def delete_notebook(
     db.commit()
 
     return None
+
+
+@router.get("/{notebook_id}/export")
+def export_notebook(
+    notebook_id: str,
+    format: Literal["ndjson", "zip"] = Query("zip", description="导出格式"),
+    include_conversations: bool = Query(True, description="是否包含深度探索对话"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """导出笔记本（流式下载）"""
+    notebook = (
+        db.query(Notebook.id, Notebook.title)
+        .filter(
+            Notebook.id == notebook_id,
+            Notebook.owner_id == current_user.id,
+            Notebook.deleted_at.is_(None),
+        )
+        .first()
+    )
+
+    if not notebook:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="笔记本不存在",
+        )
+
+    return build_export_response(
+        current_user.id,
+        format,
+        include_conversations,
+        safe_filename(notebook.title),
+        notebook_id=notebook_id,
+    )
+
+
+@router.post("/{notebook_id}/duplicate", response_model=NotebookResponse, status_code=status.HTTP_201_CREATED)
+def duplicate_notebook(
+    notebook_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """复制笔记本及其全部笔记
+
+    笔记、内容和检索索引在数据库内以 INSERT ... SELECT 复制，
+    与笔记数量无关，整个复制在一个事务内完成。
+    """
+    notebook = (
+        db.query(Notebook)
+        .filter(
+            Notebook.id == notebook_id,
+            Notebook.owner_id == current_user.id,
+            Notebook.deleted_at.is_(None),
+        )
+        .first()
+    )
+
+    if not notebook:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="笔记本不存在",
+        )
+
+    new_notebook = Notebook(
+        title=f"{notebook.title} - 副本"[:200],
+        description=notebook.description,
+        color=notebook.color,
+        icon=notebook.icon,
+        owner_id=current_user.id,
+    )
+    db.add(new_notebook)
+    db.flush()
+
+    copy_notes(
+        db,
+        select(CornellNote.id).where(
+            CornellNote.notebook_id == notebook_id,
+            CornellNote.deleted_at.is_(None),
+        ),
+        new_notebook.id,
+        current_user.id,
+    )
+
+    db.commit()
+    db.refresh(new_notebook)
+
+    return build_notebook_response(new_notebook)
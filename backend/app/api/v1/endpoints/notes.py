@@ -1,11 +1,18 @@
 """笔记相关 API 端点"""
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, desc
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response, UploadFile, File
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import or_, desc, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+import asyncio
+import json
 import math
+import shutil
+import tempfile
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_async_db, get_current_user_async
+from app.core.database import SessionLocal
 from app.api.v1.schemas import (
     NoteCreate,
     NoteUpdate,
@@ -13,11 +20,51 @@ from app.api.v1.schemas import (
     NoteListResponse,
     NoteListItem,
     PaginationMeta,
+    CursorMeta,
+    NoteSearchHit,
+    NoteSearchResponse,
+    NoteContentPatch,
+    NoteContentPatchResponse,
+    NoteAutosave,
+    NoteAutosaveConflict,
+    NoteAutosaveResponse,
+    NoteBulkRequest,
+    NoteBulkResult,
+    NoteBulkResponse,
+    NoteBatchGetRequest,
+    NoteBatchGetError,
+    NoteBatchGetResponse,
+    NoteRevisionItem,
+    NoteRevisionListResponse,
+    NoteRevisionResponse,
+    NoteTrashItem,
+    NoteTrashResponse,
 )
-from app.models import User, CornellNote, NoteContent, Notebook
+from app.models import User, CornellNote, NoteContent, Notebook, AccessLevel
+from app.services import search as search_service
+from app.services import revisions as revision_service
+from app.services import note_import
+from app.services import note_copy
+from app.services import notebook_stats
+from app.services import trash as trash_service
+from app.services.note_content import update_content_if_version
+from app.services.text_stats import update_note_stats
+from app.services.autosave import autosave_buffer, AutosaveConflict
+from app.services.cache import note_response_cache
+from app.services.view_counter import view_counter
+from app.utils.etag import note_etag, etag_matches
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_filter
+from app.utils.text_patch import apply_text_edits
 
 router = APIRouter()
 
+# 游标分页允许的排序字段：必须是非空列，且有 (owner_id, 字段, id) 复合索引（见 CornellNote.__table_args__），
+# 其他字段每页都需要排序全部笔记。view_count 由后台批量写回，翻页期间会变化，也不适合作为游标
+KEYSET_SORT_FIELDS = {"created_at", "updated_at"}
+
+# 笔记详情允许客户端缓存，但每次使用前必须用 ETag 重新验证
+NOTE_CACHE_CONTROL = "private, no-cache"
+
 
 @router.get("", response_model=NoteListResponse)
 async def get_notes(
@@ -27,57 +74,78 @@ async def get_notes(
     is_starred: Optional[bool] = Query(None, description="是否星标"),
     search: Optional[str] = Query(None, description="搜索关键词"),
     sort: str = Query("created_at", description="排序字段"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="分页游标，传空字符串获取第一页（启用游标分页）"),
+    with_total: bool = Query(False, description="游标分页时是否返回总数"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取笔记列表
 
+    支持两种分页模式：
+    - 偏移分页（默认）：使用 page/page_size，返回 pagination
+    - 游标分页：传入 cursor（首页传空字符串），返回 cursor.next_cursor，
+      每页代价与页深无关，默认不统计总数
+
     Args:
-        page: 页码
+        page: 页码（偏移分页）
         page_size: 每页数量
         notebook_id: 笔记本ID（可选）
         is_starred: 是否仅返回星标笔记（可选）
         search: 搜索关键词（可选）
         sort: 排序字段
+        cursor: 分页游标（可选）
+        with_total: 游标分页时是否统计总数
         current_user: 当前用户
         db: 数据库会话
 
     Returns:
         NoteListResponse: 笔记列表
+
+    Raises:
+        HTTPException: 排序字段或游标无效时抛出 400 错误
     """
     # 构建查询
-    query = db.query(CornellNote).filter(
+    query = select(CornellNote).where(
         CornellNote.owner_id == current_user.id,
         CornellNote.deleted_at.is_(None)
     )
 
     # 过滤条件
     if notebook_id:
-        query = query.filter(CornellNote.notebook_id == notebook_id)
+        query = query.where(CornellNote.notebook_id == notebook_id)
 
     if is_starred is not None:
-        query = query.filter(CornellNote.is_starred == is_starred)
+        query = query.where(CornellNote.is_starred == is_starred)
 
     if search:
-        query = query.filter(
-            or_(
-                CornellNote.title.contains(search),
+        matched_ids = await db.run_sync(search_service.match_subquery, current_user.id, search)
+        if matched_ids is not None:
+            query = query.where(CornellNote.id.in_(matched_ids))
+        else:
+            query = query.where(
+                or_(
+                    CornellNote.title.contains(search),
+                )
             )
-        )
 
-    # 排序
     sort_field = sort.lstrip("-")
-    if sort.startswith("-"):
+    descending = sort.startswith("-")
+
+    if cursor is not None:
+        return await _get_notes_by_cursor(db, query, sort, sort_field, descending, cursor, page_size, with_total)
+
+    # 排序
+    if descending:
         query = query.order_by(desc(getattr(CornellNote, sort_field)))
     else:
         query = query.order_by(getattr(CornellNote, sort_field))
 
     # 分页
-    total = query.count()
+    total = await _count(db, query)
     total_pages = math.ceil(total / page_size)
     offset = (page - 1) * page_size
 
-    notes = query.offset(offset).limit(page_size).all()
+    notes = (await db.execute(query.offset(offset).limit(page_size))).scalars().all()
 
     return NoteListResponse(
         items=[NoteListItem.model_validate(note) for note in notes],
@@ -90,11 +158,452 @@ async def get_notes(
     )
 
 
+async def _count(db: AsyncSession, query) -> int:
+    """统计查询结果数量（SELECT count(*) FROM (...)）"""
+    return await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+
+
+async def _get_notes_by_cursor(
+    db: AsyncSession,
+    query,
+    sort: str,
+    sort_field: str,
+    descending: bool,
+    cursor: str,
+    page_size: int,
+    with_total: bool,
+) -> NoteListResponse:
+    """按游标（keyset）获取一页笔记
+
+    以 (sort_field, id) 作为排序键，多取一条用于判断是否还有下一页。
+    """
+    if sort_field not in KEYSET_SORT_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"游标分页不支持按 {sort_field} 排序"
+        )
+
+    sort_column = getattr(CornellNote, sort_field)
+    total = await _count(db, query) if with_total else None
+
+    if cursor:
+        try:
+            last_value, last_id = decode_cursor(cursor, sort)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        query = query.where(keyset_filter(sort_column, CornellNote.id, last_value, last_id, descending))
+
+    if descending:
+        query = query.order_by(desc(sort_column), desc(CornellNote.id))
+    else:
+        query = query.order_by(sort_column, CornellNote.id)
+
+    notes = (await db.execute(query.limit(page_size + 1))).scalars().all()
+    has_more = len(notes) > page_size
+    notes = notes[:page_size]
+
+    next_cursor = None
+    if has_more:
+        last = notes[-1]
+        next_cursor = encode_cursor(sort, getattr(last, sort_field), last.id)
+
+    return NoteListResponse(
+        items=[NoteListItem.model_validate(note) for note in notes],
+        cursor=CursorMeta(
+            next_cursor=next_cursor,
+            page_size=page_size,
+            has_more=has_more,
+            total=total
+        )
+    )
+
+
+@router.get("/search", response_model=NoteSearchResponse)
+async def search_notes(
+    q: str = Query(..., min_length=1, max_length=200, description="搜索关键词"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    notebook_id: Optional[str] = Query(None, description="笔记本ID"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """全文检索笔记
+
+    检索范围为标题和康奈尔三栏内容，结果按相关度排序并附带高亮摘要。
+
+    Args:
+        q: 搜索关键词
+        page: 页码
+        page_size: 每页数量
+        notebook_id: 笔记本ID（可选）
+        current_user: 当前用户
+        db: 数据库会话
+
+    Returns:
+        NoteSearchResponse: 检索结果
+    """
+    hits = await db.run_sync(
+        search_service.search_notes,
+        owner_id=current_user.id,
+        query=q,
+        limit=page_size + 1,
+        offset=(page - 1) * page_size,
+        notebook_id=notebook_id,
+    )
+    has_more = len(hits) > page_size
+    hits = hits[:page_size]
+
+    notes = {
+        note.id: note
+        for note in (await db.execute(
+            select(CornellNote).where(CornellNote.id.in_([hit.note_id for hit in hits]))
+        )).scalars()
+    } if hits else {}
+
+    items = [
+        NoteSearchHit.model_validate({
+            **NoteListItem.model_validate(notes[hit.note_id]).model_dump(),
+            "rank": hit.rank,
+            "snippet": hit.snippet,
+        })
+        for hit in hits
+        if hit.note_id in notes
+    ]
+
+    return NoteSearchResponse(items=items, page=page, page_size=page_size, has_more=has_more)
+
+
+@router.get("/trash", response_model=NoteTrashResponse)
+async def list_trash(
+    cursor: Optional[str] = Query(None, description="分页游标"),
+    page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取回收站中的笔记
+
+    按删除时间倒序，以 (deleted_at, id) 游标分页。
+
+    Args:
+        cursor: 分页游标（可选）
+        page_size: 每页数量
+        current_user: 当前用户
+        db: 数据库会话
+
+    Returns:
+        NoteTrashResponse: 已删除的笔记列表
+
+    Raises:
+        HTTPException: 游标无效时抛出 400 错误
+    """
+    sort = "-deleted_at"
+    query = select(CornellNote).where(
+        CornellNote.owner_id == current_user.id,
+        CornellNote.deleted_at.isnot(None)
+    )
+
+    if cursor:
+        try:
+            last_value, last_id = decode_cursor(cursor, sort)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        query = query.where(keyset_filter(CornellNote.deleted_at, CornellNote.id, last_value, last_id, True))
+
+    notes = (await db.execute(
+        query.order_by(desc(CornellNote.deleted_at), desc(CornellNote.id)).limit(page_size + 1)
+    )).scalars().all()
+    has_more = len(notes) > page_size
+    notes = notes[:page_size]
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(sort, notes[-1].deleted_at, notes[-1].id)
+
+    return NoteTrashResponse(
+        items=[
+            NoteTrashItem.model_validate({
+                **NoteListItem.model_validate(note).model_dump(),
+                "deleted_at": note.deleted_at,
+                "purge_at": trash_service.purge_at(note.deleted_at),
+            })
+            for note in notes
+        ],
+        cursor=CursorMeta(next_cursor=next_cursor, page_size=page_size, has_more=has_more)
+    )
+
+
+@router.post("/bulk", response_model=NoteBulkResponse)
+async def bulk_update_notes(
+    request: NoteBulkRequest,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """批量操作笔记（移动、星标、归档、删除）
+
+    一次查询完成存在性和权限检查，再用一条
+    UPDATE ... WHERE id IN (...) AND owner_id = :me 完成修改，整个操作在一个事务内。
+    不存在或无权操作的笔记不影响其他笔记，在结果中逐条返回。
+
+    Args:
+        request: 批量操作请求
+        current_user: 当前用户
+        db: 数据库会话
+
+    Returns:
+        NoteBulkResponse: 每条笔记的操作结果
+
+    Raises:
+        HTTPException: move 缺少目标笔记本或目标笔记本不存在时抛出错误
+    """
+    from datetime import datetime
+
+    ids = list(dict.fromkeys(request.ids))
+
+    if request.operation == "move":
+        if not request.notebook_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="移动笔记需要指定目标笔记本"
+            )
+        target_notebook = (await db.execute(
+            select(Notebook.id).where(
+                Notebook.id == request.notebook_id,
+                Notebook.owner_id == current_user.id,
+                Notebook.deleted_at.is_(None)
+            )
+        )).first()
+        if not target_notebook:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="目标笔记本不存在"
+            )
+
+    # 一次查询完成存在性和权限检查，同时取出计算笔记本计数变化所需的字段
+    rows = {
+        row.id: row
+        for row in await db.execute(
+            select(
+                CornellNote.id,
+                CornellNote.owner_id,
+                CornellNote.notebook_id,
+                CornellNote.is_starred,
+                CornellNote.word_count,
+            ).where(
+                CornellNote.id.in_(ids),
+                CornellNote.deleted_at.is_(None)
+            )
+        )
+    }
+    results = []
+    allowed = []
+    for note_id in ids:
+        if note_id not in rows:
+            results.append(NoteBulkResult(id=note_id, status="not_found"))
+        elif rows[note_id].owner_id != current_user.id:
+            results.append(NoteBulkResult(id=note_id, status="forbidden"))
+        else:
+            results.append(NoteBulkResult(id=note_id, status="ok"))
+            allowed.append(note_id)
+
+    if allowed:
+        values = {
+            "move": {"notebook_id": request.notebook_id},
+            "star": {"is_starred": True},
+            "unstar": {"is_starred": False},
+            "archive": {"is_archived": True},
+            "unarchive": {"is_archived": False},
+            "delete": {"deleted_at": datetime.utcnow()},
+        }[request.operation]
+
+        await db.execute(
+            update(CornellNote)
+            .where(
+                CornellNote.id.in_(allowed),
+                CornellNote.owner_id == current_user.id,
+                CornellNote.deleted_at.is_(None)
+            )
+            .values(last_edited_by=current_user.id, **values)
+            .execution_options(synchronize_session=False)
+        )
+        if request.operation == "delete":
+            await db.run_sync(search_service.remove_notes, allowed)
+
+        # 笔记本计数：先减去原贡献，再加上操作后的贡献
+        before = [
+            notebook_stats.NoteStats(
+                rows[note_id].notebook_id, bool(rows[note_id].is_starred), rows[note_id].word_count or 0
+            )
+            for note_id in allowed
+        ]
+        deltas = notebook_stats.collect(before, -1)
+        if request.operation != "delete":
+            for stats in before:
+                after = notebook_stats.NoteStats(
+                    values.get("notebook_id", stats.notebook_id),
+                    values.get("is_starred", stats.starred),
+                    stats.word_count,
+                )
+                deltas.setdefault(after.notebook_id, notebook_stats.NotebookDelta()).add(after)
+        await db.run_sync(notebook_stats.apply_deltas, deltas)
+
+        await db.commit()
+
+        for note_id in allowed:
+            note_response_cache.invalidate(note_id)
+            if request.operation == "delete":
+                autosave_buffer.discard(note_id)
+
+    return NoteBulkResponse(operation=request.operation, succeeded=len(allowed), results=results)
+
+
+@router.post("/batch-get", response_model=NoteBatchGetResponse)
+async def batch_get_notes(
+    request: NoteBatchGetRequest,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """批量获取笔记详情
+
+    一条 SELECT ... WHERE id IN (...) 加载笔记，内容以一次 selectinload 加载，
+    访问权限在内存中逐条检查。浏览次数写入缓冲（与单条获取相同），不单独提交。
+    不存在或无权访问的笔记不影响其他笔记，在 errors 中逐条返回。
+
+    Args:
+        request: 批量获取请求（最多 100 个ID）
+        current_user: 当前用户
+        db: 数据库会话
+
+    Returns:
+        NoteBatchGetResponse: 笔记详情映射和失败原因映射
+    """
+    ids = list(dict.fromkeys(request.ids))
+    await _flush_autosave(db, ids)
+    found = {
+        note.id: note
+        for note in (await db.execute(
+            select(CornellNote).options(
+                selectinload(CornellNote.content)
+            ).where(
+                CornellNote.id.in_(ids),
+                CornellNote.deleted_at.is_(None)
+            )
+        )).scalars()
+    }
+
+    notes = {}
+    errors = {}
+    for note_id in ids:
+        note = found.get(note_id)
+        if note is None:
+            errors[note_id] = NoteBatchGetError(status="not_found", detail="笔记不存在")
+            continue
+        try:
+            _check_note_readable(note.owner_id, note.access_level, current_user)
+        except HTTPException as e:
+            errors[note_id] = NoteBatchGetError(status="forbidden", detail=e.detail)
+            continue
+
+        view_counter.record(note_id)
+        result = NoteResponse.model_validate(note)
+        result.view_count += view_counter.pending(note_id)
+        notes[note_id] = result
+
+    return NoteBatchGetResponse(notes=notes, errors=errors)
+
+
+@router.post("/import")
+async def import_notes(
+    file: UploadFile = File(..., description="zip（Markdown/HTML 文件）或 NDJSON 文件"),
+    notebook_id: Optional[str] = Query(None, description="未指定笔记本的笔记导入到此笔记本"),
+    batch_size: int = Query(200, ge=1, le=1000, description="每批写入的笔记数量"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """批量导入笔记
+
+    上传文件先流式写入临时文件，再逐条解析、分批写库（每批一个事务），
+    内存占用与文件大小无关。zip 中的顶层目录名作为笔记本名称，不存在时自动创建；
+    “线索/笔记/总结”（Cues/Notes/Summary）标题下的内容分别写入康奈尔三栏。
+
+    响应为 NDJSON 流：每批提交后输出一行 {"event": "progress", ...}，
+    最后输出 {"event": "done", ..., "errors": [...]}。
+
+    Args:
+        file: 上传的文件
+        notebook_id: 默认笔记本ID（可选）
+        batch_size: 每批笔记数量
+        current_user: 当前用户
+        db: 数据库会话
+
+    Returns:
+        StreamingResponse: 导入进度流
+
+    Raises:
+        HTTPException: 默认笔记本不存在或文件格式不支持时抛出错误
+    """
+    if notebook_id:
+        notebook = (await db.execute(
+            select(Notebook.id).where(
+                Notebook.id == notebook_id,
+                Notebook.owner_id == current_user.id,
+                Notebook.deleted_at.is_(None)
+            )
+        )).first()
+        if not notebook:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="笔记本不存在"
+            )
+
+    # 上传文件在请求结束后会被关闭，先流式复制到临时文件供响应流读取
+    spool = tempfile.TemporaryFile()
+    await asyncio.to_thread(shutil.copyfileobj, file.file, spool)
+    spool.seek(0)
+
+    progress = note_import.ImportProgress()
+    try:
+        items = note_import.iter_import_file(spool, file.filename, progress)
+    except note_import.ImportFormatError as e:
+        spool.close()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    owner_id = current_user.id
+    # 导入在线程池中使用同步会话分批写库，结束本请求的只读事务
+    await db.commit()
+
+    def event_stream():
+        import_db = SessionLocal()
+        try:
+            importer = note_import.NoteImporter(
+                import_db, owner_id, default_notebook_id=notebook_id,
+                batch_size=batch_size, progress=progress
+            )
+            for current in importer.iter_batches(items):
+                yield json.dumps({"event": "progress", **current.as_dict()}, ensure_ascii=False) + "\n"
+            yield json.dumps(
+                {"event": "done", **progress.as_dict(), "errors": progress.errors}, ensure_ascii=False
+            ) + "\n"
+        finally:
+            import_db.close()
+            spool.close()
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+
 @router.post("", response_model=NoteResponse, status_code=status.HTTP_201_CREATED)
 async def create_note(
     note_data: NoteCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """创建笔记
 
@@ -114,24 +623,28 @@ async def create_note(
 
     # 如果未指定笔记本，使用用户的第一个笔记本（默认笔记本）
     if not notebook_id:
-        default_notebook = db.query(Notebook).filter(
-            Notebook.owner_id == current_user.id,
-            Notebook.deleted_at.is_(None)
-        ).first()
-
-        if not default_notebook:
+        default_notebook_id = (await db.execute(
+            select(Notebook.id).where(
+                Notebook.owner_id == current_user.id,
+                Notebook.deleted_at.is_(None)
+            ).limit(1)
+        )).scalar()
+
+        if not default_notebook_id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="用户没有笔记本，请先创建笔记本"
             )
 
-        notebook_id = default_notebook.id
+        notebook_id = default_notebook_id
     else:
         # 如果指定了笔记本，验证笔记本是否存在且属于当前用户
-        notebook = db.query(Notebook).filter(
-            Notebook.id == notebook_id,
-            Notebook.owner_id == current_user.id
-        ).first()
+        notebook = (await db.execute(
+            select(Notebook.id).where(
+                Notebook.id == notebook_id,
+                Notebook.owner_id == current_user.id
+            )
+        )).first()
         if not notebook:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -148,7 +661,7 @@ async def create_note(
     )
 
     db.add(new_note)
-    db.flush()  # 获取笔记 ID
+    await db.flush()  # 获取笔记 ID
 
     # 创建笔记内容
     cue_text = note_data.content.cue_column if note_data.content else ""
@@ -162,16 +675,16 @@ async def create_note(
         summary_row=summary_text,
     )
 
-    # 计算字数（中文字符 + 英文单词）
-    total_text = cue_text + note_text + summary_text
-    new_note.word_count = len(total_text.strip())
+    # 计算字数（中文字符 + 英文单词）和预计复习时长
+    update_note_stats(new_note, note_content)
+    await db.run_sync(notebook_stats.apply_change, None, notebook_stats.snapshot(new_note))
 
     db.add(note_content)
-    db.commit()
-    db.refresh(new_note)
+    await db.run_sync(search_service.index_note, new_note, note_content)
+    await db.commit()
 
-    # 显式访问content以确保加载
-    _ = new_note.content
+    # 异步会话不能延迟加载关系，显式加载content
+    await db.refresh(new_note, ["content"])
 
     return NoteResponse.model_validate(new_note)
 
@@ -179,67 +692,119 @@ async def create_note(
 @router.get("/{note_id}", response_model=NoteResponse)
 async def get_note(
     note_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None, description="条件请求：上次获取的 ETag"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取笔记详情
 
+    先写回该笔记尚未落库的自动保存内容，
+    再做一次只查元数据的轻量查询（不含内容大字段）完成权限检查并生成 ETag
+    （由笔记ID、内容版本号和更新时间生成）：
+    - If-None-Match 与 ETag 一致时直接返回 304
+    - 否则优先使用按 (内容版本号, 更新时间) 校验的序列化缓存，未命中才加载完整笔记
+
     Args:
         note_id: 笔记ID
+        if_none_match: If-None-Match 请求头
         current_user: 当前用户
         db: 数据库会话
 
     Returns:
-        NoteResponse: 笔记详情
+        NoteResponse: 笔记详情（ETag 匹配时返回 304 空响应）
 
     Raises:
         HTTPException: 笔记不存在或无权访问时抛出错误
     """
-    from sqlalchemy.orm import joinedload
-
-    note = db.query(CornellNote).options(
-        joinedload(CornellNote.content)
-    ).filter(
-        CornellNote.id == note_id,
-        CornellNote.deleted_at.is_(None)
-    ).first()
+    await _flush_autosave(db, [note_id])
+    meta = (await db.execute(
+        select(
+            CornellNote.id,
+            CornellNote.owner_id,
+            CornellNote.access_level,
+            CornellNote.view_count,
+            CornellNote.updated_at,
+            NoteContent.version,
+        ).outerjoin(
+            NoteContent, NoteContent.note_id == CornellNote.id
+        ).where(
+            CornellNote.id == note_id,
+            CornellNote.deleted_at.is_(None)
+        )
+    )).first()
 
-    if not note:
+    if not meta:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="笔记不存在"
         )
 
     # 权限检查
-    if note.owner_id != current_user.id and note.access_level.value == "private":
+    _check_note_readable(meta.owner_id, meta.access_level, current_user)
+
+    # 增加浏览次数（写回缓冲，定期批量落库）
+    view_counter.record(meta.id)
+
+    headers = {
+        "ETag": note_etag(meta.id, meta.version, meta.updated_at),
+        "Cache-Control": NOTE_CACHE_CONTROL,
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    stamp = (meta.version, meta.updated_at)
+    payload = note_response_cache.get(meta.id, stamp)
+    if payload is None:
+        note = (await db.execute(
+            select(CornellNote).options(
+                joinedload(CornellNote.content)
+            ).where(
+                CornellNote.id == note_id
+            )
+        )).scalars().first()
+
+        serialized = NoteResponse.model_validate(note).model_dump_json()
+        payload = json.loads(serialized)
+        note_response_cache.set(meta.id, payload, size=len(serialized.encode("utf-8")), stamp=stamp)
+
+    # 浏览次数不参与缓存版本，按最新值覆盖
+    return JSONResponse(
+        content={**payload, "view_count": meta.view_count + view_counter.pending(meta.id)},
+        headers=headers
+    )
+
+
+def _check_note_readable(owner_id: str, access_level: AccessLevel, current_user: User) -> None:
+    """检查当前用户是否有权查看笔记，无权时抛出 403 错误"""
+    if owner_id != current_user.id and access_level.value == "private":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="无权访问该笔记"
         )
 
-    # 增加浏览次数
-    note.view_count += 1
-    db.commit()
-    db.refresh(note)
-
-    # 显式访问content以确保加载
-    _ = note.content
-
-    return NoteResponse.model_validate(note)
-
 
 @router.put("/{note_id}", response_model=NoteResponse)
 async def update_note(
     note_id: str,
     note_data: NoteUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    if_match: Optional[str] = Header(None, description="条件请求：期望的 ETag"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """更新笔记
 
+    内容更新使用乐观锁：以 UPDATE ... WHERE version = :v 条件写入，
+    期望版本取自请求体 version、If-Match 请求头，都未提供时取本次读到的版本，
+    版本不一致（其他设备已保存）时返回 409，避免相互覆盖。
+    写入前先写回该笔记的自动保存缓冲，已确认的自动保存同样参与版本比较，不会被静默覆盖。
+    响应由内存中的最新状态构建，不再回读数据库。
+
     Args:
         note_id: 笔记ID
         note_data: 更新数据
+        response: 响应对象（用于设置 ETag）
+        if_match: If-Match 请求头
         current_user: 当前用户
         db: 数据库会话
 
@@ -247,16 +812,11 @@ async def update_note(
         NoteResponse: 更新后的笔记
 
     Raises:
-        HTTPException: 笔记不存在或无权访问时抛出错误
+        HTTPException: 笔记不存在、无权访问或版本冲突时抛出错误
     """
-    from sqlalchemy.orm import joinedload
-
-    note = db.query(CornellNote).options(
-        joinedload(CornellNote.content)
-    ).filter(
-        CornellNote.id == note_id,
-        CornellNote.deleted_at.is_(None)
-    ).first()
+    await _flush_autosave(db, [note_id])
+    autosave_buffer.release(note_id)
+    note = await _get_note_with_content(db, note_id)
 
     if not note:
         raise HTTPException(
@@ -271,14 +831,33 @@ async def update_note(
             detail="无权编辑该笔记"
         )
 
+    # 乐观锁前置检查
+    current_version = note.content.version if note.content else None
+    if if_match and not etag_matches(
+        if_match, note_etag(note.id, current_version, note.updated_at), weak=False
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="笔记已被修改（ETag 不匹配），请刷新后重试"
+        )
+    if note_data.version is not None and note_data.version != current_version:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"内容版本冲突：当前版本为 {current_version}，请基于最新内容重新提交"
+        )
+
+    stats_before = notebook_stats.snapshot(note)
+
     # 更新笔记本ID（移动笔记）
     if note_data.notebook_id is not None:
         # 验证目标笔记本是否存在且属于当前用户
-        target_notebook = db.query(Notebook).filter(
-            Notebook.id == note_data.notebook_id,
-            Notebook.owner_id == current_user.id,
-            Notebook.deleted_at.is_(None)
-        ).first()
+        target_notebook = (await db.execute(
+            select(Notebook.id).where(
+                Notebook.id == note_data.notebook_id,
+                Notebook.owner_id == current_user.id,
+                Notebook.deleted_at.is_(None)
+            )
+        )).first()
 
         if not target_notebook:
             raise HTTPException(
@@ -297,6 +876,8 @@ async def update_note(
         note.access_level = note_data.access_level
 
     note.last_edited_by = current_user.id
+    # 移动和星标的计数变化；内容写入引起的字数变化按新的笔记本单独记账
+    await db.run_sync(notebook_stats.apply_change, stats_before, notebook_stats.snapshot(note))
 
     # 更新笔记内容
     if note_data.content:
@@ -307,42 +888,413 @@ async def update_note(
                 cue_column=note_data.content.cue_column or "",
                 note_column=note_data.content.note_column or "",
                 summary_row=note_data.content.summary_row or "",
+                mindmap_data=note_data.content.mindmap_data,
+                version=1,
             )
-            db.add(note_content)
+            note.content = note_content
+            previous_words = note.word_count
+            update_note_stats(note, note_content)
+            await db.run_sync(notebook_stats.adjust, note.notebook_id, words=note.word_count - previous_words)
         else:
-            # 更新现有内容
-            if note_data.content.cue_column is not None:
-                note.content.cue_column = note_data.content.cue_column
-            if note_data.content.note_column is not None:
-                note.content.note_column = note_data.content.note_column
-            if note_data.content.summary_row is not None:
-                note.content.summary_row = note_data.content.summary_row
-            if note_data.content.mindmap_data is not None:
-                note.content.mindmap_data = note_data.content.mindmap_data
+            # 条件更新现有内容，版本号加一（同时增量更新字数）
+            values = {
+                field: getattr(note_data.content, field)
+                for field in ("cue_column", "note_column", "summary_row", "mindmap_data")
+                if getattr(note_data.content, field) is not None
+            }
+            await _update_content_if_version(db, note, current_version, values, current_user.id)
+
+    if note_data.title is not None or note_data.content:
+        await db.run_sync(search_service.index_note, note)
+
+    await db.flush()
+    result = NoteResponse.model_validate(note)
+    response.headers["ETag"] = note_etag(
+        note.id, result.content.version if result.content else None, result.updated_at
+    )
+
+    await db.commit()
+    note_response_cache.invalidate(note_id)
+
+    return result
+
+
+async def _flush_autosave(db: AsyncSession, note_ids: List[str]) -> None:
+    """读取或直接写入笔记前，先写回这些笔记尚未落库的自动保存内容
+
+    写回后数据库版本号（及 ETag）包含已确认的编辑；写回冲突时内容仍留在缓冲中，
+    由客户端下一次自动保存时随 409 响应取回。没有待写回内容时不访问数据库。
+    """
+    pending = autosave_buffer.pending_note_ids(note_ids)
+    if not pending:
+        return
+    # 写回使用独立的同步会话，先结束本请求的只读事务
+    await db.commit()
+    await asyncio.to_thread(autosave_buffer.flush, SessionLocal, pending, True)
+
+
+async def _get_note_with_content(db: AsyncSession, note_id: str) -> Optional[CornellNote]:
+    """加载未删除的笔记及其内容（编辑前使用）"""
+    return (await db.execute(
+        select(CornellNote).options(
+            joinedload(CornellNote.content)
+        ).where(
+            CornellNote.id == note_id,
+            CornellNote.deleted_at.is_(None)
+        )
+    )).scalars().first()
+
+
+async def _update_content_if_version(
+    db: AsyncSession,
+    note: CornellNote,
+    expected_version: int,
+    values: dict,
+    author_id: Optional[str] = None,
+) -> None:
+    """条件更新笔记内容（乐观锁），版本冲突时回滚并抛出 409 错误
+
+    见 app.services.note_content.update_content_if_version。
+    """
+    if not await db.run_sync(update_content_if_version, note, expected_version, values, author_id):
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="笔记内容已被其他设备修改，请刷新后重试"
+        )
 
-            # 增加版本号
-            note.content.version += 1
 
-        # 重新计算字数
-        if note.content:
-            total_text = (note.content.cue_column or "") + (note.content.note_column or "") + (note.content.summary_row or "")
-            note.word_count = len(total_text.strip())
+@router.patch("/{note_id}/content", response_model=NoteContentPatchResponse)
+async def patch_note_content(
+    note_id: str,
+    patch: NoteContentPatch,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """增量更新笔记内容
+
+    客户端只上传基于 base_version 的编辑操作，由服务端应用到当前内容上，
+    响应只返回新的版本号等元数据，不回传整篇内容。
+    与整体更新相同，应用前先写回该笔记的自动保存缓冲。
+
+    写库量：note_contents 只更新有编辑操作的栏目（及提交的 mindmap_data），修订只保存差异，
+    倒排索引（ngram）只写入变化的词元；数据库全文检索（FTS5 / tsvector）不支持按列更新，
+    该笔记的索引行仍整行重建。
+
+    Args:
+        note_id: 笔记ID
+        patch: 增量更新数据
+        current_user: 当前用户
+        db: 数据库会话
+
+    Returns:
+        NoteContentPatchResponse: 更新后的版本信息
+
+    Raises:
+        HTTPException: 笔记不存在、无权编辑、版本冲突（409）或编辑操作无效（400）时抛出错误
+    """
+    await _flush_autosave(db, [note_id])
+    autosave_buffer.release(note_id)
+    note = await _get_note_with_content(db, note_id)
+
+    if not note or not note.content:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="笔记不存在"
+        )
+
+    # 权限检查：只有所有者可以编辑
+    if note.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权编辑该笔记"
+        )
+
+    if note.content.version != patch.base_version:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"内容版本冲突：当前版本为 {note.content.version}，请基于最新内容重新提交"
+        )
+
+    # 按栏目分组应用编辑操作，保持同一栏目内的操作顺序
+    edits_by_column = {}
+    for op in patch.ops:
+        edits_by_column.setdefault(op.column, []).append(op)
+
+    values = {}
+    try:
+        for column, edits in edits_by_column.items():
+            values[column] = apply_text_edits(getattr(note.content, column) or "", edits)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    if patch.mindmap_data is not None:
+        values["mindmap_data"] = patch.mindmap_data
+
+    await _update_content_if_version(db, note, patch.base_version, values, current_user.id)
+    note.last_edited_by = current_user.id
+
+    if edits_by_column:
+        await db.run_sync(search_service.index_note, note)
+
+    await db.flush()
+    result = NoteContentPatchResponse(
+        note_id=note.id,
+        version=note.content.version,
+        word_count=note.word_count,
+        estimated_review_minutes=note.estimated_review_minutes,
+        updated_at=note.updated_at
+    )
+
+    await db.commit()
+    note_response_cache.invalidate(note_id)
+
+    return result
+
+
+def _autosave_conflict_response(conflict: AutosaveConflict) -> JSONResponse:
+    """自动保存冲突的 409 响应，附带当前版本和未能写入的内容"""
+    if conflict.unsaved:
+        detail = "笔记内容已被其他设备修改，未保存的内容已随响应返回，请刷新后合并"
+    else:
+        detail = f"内容版本冲突：当前版本为 {conflict.args[0]}，请刷新后重试"
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content=NoteAutosaveConflict(
+            detail=detail, current_version=conflict.args[0], unsaved=conflict.unsaved
+        ).model_dump(mode="json"),
+    )
+
+
+@router.post(
+    "/{note_id}/autosave",
+    response_model=NoteAutosaveResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={status.HTTP_409_CONFLICT: {"model": NoteAutosaveConflict}}
+)
+async def autosave_note(
+    note_id: str,
+    data: NoteAutosave,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """自动保存笔记内容
+
+    内容只进入内存缓冲并立即确认，由后台任务合并写库（每条笔记在自动保存窗口内最多写一次）。
+    需要立即落库时调用 POST /notes/{id}/save。
+
+    Args:
+        note_id: 笔记ID
+        data: 自动保存内容
+        current_user: 当前用户
+        db: 数据库会话
+
+    Returns:
+        NoteAutosaveResponse: 确认信息；版本冲突时返回 409，
+        此前已确认但写回时发生冲突的内容在响应的 unsaved 字段中返回
+
+    Raises:
+        HTTPException: 笔记不存在或无权编辑时抛出错误
+    """
+    values = data.model_dump(exclude_unset=True, exclude={"base_version"})
+
+    # 已有缓冲时无需查询数据库
+    owner_id = autosave_buffer.owner_of(note_id)
+    db_version = None
+    if owner_id is None:
+        meta = (await db.execute(
+            select(
+                CornellNote.owner_id,
+                NoteContent.version,
+            ).join(
+                NoteContent, NoteContent.note_id == CornellNote.id
+            ).where(
+                CornellNote.id == note_id,
+                CornellNote.deleted_at.is_(None)
+            )
+        )).first()
 
-    db.commit()
-    db.refresh(note)
+        if not meta:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="笔记不存在"
+            )
+        owner_id, db_version = meta.owner_id, meta.version
 
-    # 显式访问content以确保加载
-    _ = note.content
+    # 权限检查：只有所有者可以编辑
+    if owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权编辑该笔记"
+        )
 
-    return NoteResponse.model_validate(note)
+    try:
+        base_version = autosave_buffer.submit(
+            note_id, owner_id, data.base_version, values,
+            author_id=current_user.id, db_version=db_version
+        )
+    except AutosaveConflict as e:
+        return _autosave_conflict_response(e)
+
+    return NoteAutosaveResponse(note_id=note_id, base_version=base_version, pending=True)
+
+
+@router.post(
+    "/{note_id}/save",
+    response_model=NoteAutosaveResponse,
+    responses={status.HTTP_409_CONFLICT: {"model": NoteAutosaveConflict}}
+)
+async def save_note_now(
+    note_id: str,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """立即写入笔记的自动保存缓冲
+
+    Args:
+        note_id: 笔记ID
+        current_user: 当前用户
+        db: 数据库会话
+
+    Returns:
+        NoteAutosaveResponse: 写入后的版本信息；写回时（或此前的后台写回）发生版本冲突时返回 409，
+        未能写入的内容在响应的 unsaved 字段中返回
+
+    Raises:
+        HTTPException: 笔记不存在或无权编辑时抛出错误
+    """
+    meta = (await db.execute(
+        select(CornellNote.owner_id).where(
+            CornellNote.id == note_id,
+            CornellNote.deleted_at.is_(None)
+        )
+    )).first()
+
+    if not meta:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="笔记不存在"
+        )
+
+    if meta.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权编辑该笔记"
+        )
+
+    # 写回使用独立的同步会话，先结束本请求的只读事务
+    await db.commit()
+    await asyncio.to_thread(autosave_buffer.flush, SessionLocal, [note_id], True)
+    conflict = autosave_buffer.take_conflict(note_id)
+    if conflict is not None:
+        return _autosave_conflict_response(conflict)
+
+    version = await db.scalar(select(NoteContent.version).where(NoteContent.note_id == note_id))
+    return NoteAutosaveResponse(note_id=note_id, base_version=version or 0, pending=False)
+
+
+@router.get("/{note_id}/revisions", response_model=NoteRevisionListResponse)
+async def list_note_revisions(
+    note_id: str,
+    limit: int = Query(50, ge=1, le=200, description="返回数量"),
+    before_version: Optional[int] = Query(None, ge=1, description="只返回早于该版本的修订（翻页）"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取笔记修订列表（只含元数据，按版本号降序）
+
+    Args:
+        note_id: 笔记ID
+        limit: 返回数量
+        before_version: 翻页游标
+        current_user: 当前用户
+        db: 数据库会话
+
+    Returns:
+        NoteRevisionListResponse: 修订列表
+
+    Raises:
+        HTTPException: 笔记不存在或无权访问时抛出错误
+    """
+    meta = await _get_revision_note_meta(db, note_id, current_user)
+    rows = await db.run_sync(revision_service.list_revisions, note_id, limit=limit, before_version=before_version)
+
+    return NoteRevisionListResponse(
+        items=[NoteRevisionItem.model_validate(row) for row in rows],
+        current_version=meta.version
+    )
+
+
+@router.get("/{note_id}/revisions/{version}", response_model=NoteRevisionResponse)
+async def get_note_revision(
+    note_id: str,
+    version: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取指定版本的笔记内容
+
+    从不晚于该版本的最近快照开始回放差异重建内容。
+    恢复旧版本时，客户端把返回的内容作为新内容提交即可（PUT /notes/{id}）。
+
+    Args:
+        note_id: 笔记ID
+        version: 内容版本号
+        current_user: 当前用户
+        db: 数据库会话
+
+    Returns:
+        NoteRevisionResponse: 该版本的完整内容
+
+    Raises:
+        HTTPException: 笔记或版本不存在、无权访问时抛出错误
+    """
+    await _get_revision_note_meta(db, note_id, current_user)
+
+    content = await db.run_sync(revision_service.get_revision_content, note_id, version)
+    if content is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="该版本不存在或已被清理"
+        )
+
+    return NoteRevisionResponse(note_id=note_id, version=version, **content)
+
+
+async def _get_revision_note_meta(db: AsyncSession, note_id: str, current_user: User):
+    """查询笔记元数据并检查读取权限"""
+    meta = (await db.execute(
+        select(
+            CornellNote.owner_id,
+            CornellNote.access_level,
+            NoteContent.version,
+        ).outerjoin(
+            NoteContent, NoteContent.note_id == CornellNote.id
+        ).where(
+            CornellNote.id == note_id,
+            CornellNote.deleted_at.is_(None)
+        )
+    )).first()
+
+    if not meta:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="笔记不存在"
+        )
+
+    _check_note_readable(meta.owner_id, meta.access_level, current_user)
+    return meta
 
 
 @router.post("/{note_id}/copy", response_model=NoteResponse, status_code=status.HTTP_201_CREATED)
 async def copy_note(
     note_id: str,
     notebook_id: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """复制笔记
 
@@ -358,11 +1310,17 @@ async def copy_note(
     Raises:
         HTTPException: 笔记不存在或无权访问时抛出错误
     """
-    # 获取原笔记
-    original_note = db.query(CornellNote).filter(
-        CornellNote.id == note_id,
-        CornellNote.deleted_at.is_(None)
-    ).first()
+    # 获取原笔记（只需元数据）
+    original_note = (await db.execute(
+        select(
+            CornellNote.owner_id,
+            CornellNote.notebook_id,
+            CornellNote.access_level,
+        ).where(
+            CornellNote.id == note_id,
+            CornellNote.deleted_at.is_(None)
+        )
+    )).first()
 
     if not original_note:
         raise HTTPException(
@@ -381,11 +1339,13 @@ async def copy_note(
     target_notebook_id = notebook_id or original_note.notebook_id
 
     # 验证目标笔记本
-    target_notebook = db.query(Notebook).filter(
-        Notebook.id == target_notebook_id,
-        Notebook.owner_id == current_user.id,
-        Notebook.deleted_at.is_(None)
-    ).first()
+    target_notebook = (await db.execute(
+        select(Notebook.id).where(
+            Notebook.id == target_notebook_id,
+            Notebook.owner_id == current_user.id,
+            Notebook.deleted_at.is_(None)
+        )
+    )).first()
 
     if not target_notebook:
         raise HTTPException(
@@ -393,44 +1353,37 @@ async def copy_note(
             detail="目标笔记本不存在"
         )
 
-    # 创建新笔记（副本）
-    new_note = CornellNote(
-        title=f"{original_note.title} - 副本",
-        notebook_id=target_notebook_id,
-        owner_id=current_user.id,
-        access_level=original_note.access_level,
-        is_starred=False,  # 副本默认不星标
-        last_edited_by=current_user.id,
-        word_count=original_note.word_count
+    # 在数据库内复制笔记和内容（副本默认不星标）
+    id_map = await db.run_sync(
+        note_copy.copy_notes,
+        select(CornellNote.id).where(CornellNote.id == note_id),
+        target_notebook_id,
+        current_user.id,
+        title_suffix=" - 副本",
+        keep_starred=False,
     )
 
-    db.add(new_note)
-    db.flush()  # 获取新笔记 ID
-
-    # 复制笔记内容
-    if original_note.content:
-        new_content = NoteContent(
-            note_id=new_note.id,
-            cue_column=original_note.content.cue_column or "",
-            note_column=original_note.content.note_column or "",
-            summary_row=original_note.content.summary_row or "",
+    new_note = (await db.execute(
+        select(CornellNote).options(
+            joinedload(CornellNote.content)
+        ).where(
+            CornellNote.id == id_map[note_id]
         )
-        db.add(new_content)
+    )).scalars().one()
 
-    db.commit()
-    db.refresh(new_note)
+    # 标题变化，按新标题建立索引
+    await db.run_sync(search_service.index_note, new_note)
+    result = NoteResponse.model_validate(new_note)
+    await db.commit()
 
-    # 显式访问content以确保加载
-    _ = new_note.content
-
-    return NoteResponse.model_validate(new_note)
+    return result
 
 
 @router.delete("/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_note(
     note_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """删除笔记（软删除）
 
@@ -442,10 +1395,12 @@ async def delete_note(
     Raises:
         HTTPException: 笔记不存在或无权删除时抛出错误
     """
-    note = db.query(CornellNote).filter(
-        CornellNote.id == note_id,
-        CornellNote.deleted_at.is_(None)
-    ).first()
+    note = (await db.execute(
+        select(CornellNote).where(
+            CornellNote.id == note_id,
+            CornellNote.deleted_at.is_(None)
+        )
+    )).scalars().first()
 
     if not note:
         raise HTTPException(
@@ -462,8 +1417,70 @@ async def delete_note(
 
     # 软删除
     from datetime import datetime
+    stats_before = notebook_stats.snapshot(note)
     note.deleted_at = datetime.utcnow()
+    await db.run_sync(notebook_stats.apply_change, stats_before, None)
+    await db.run_sync(search_service.remove_note, note.id)
 
-    db.commit()
+    await db.commit()
+    note_response_cache.invalidate(note_id)
+    autosave_buffer.discard(note_id)
 
     return None
+
+
+@router.post("/{note_id}/restore", response_model=NoteResponse)
+async def restore_note(
+    note_id: str,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """从回收站恢复笔记
+
+    所属笔记本也在回收站中时一并恢复，并重新写入检索索引。
+
+    Args:
+        note_id: 笔记ID
+        current_user: 当前用户
+        db: 数据库会话
+
+    Returns:
+        NoteResponse: 恢复后的笔记
+
+    Raises:
+        HTTPException: 笔记不在回收站中或无权恢复时抛出错误
+    """
+    note = (await db.execute(
+        select(CornellNote).options(
+            joinedload(CornellNote.notebook),
+            joinedload(CornellNote.content)
+        ).where(
+            CornellNote.id == note_id,
+            CornellNote.deleted_at.isnot(None)
+        )
+    )).scalars().first()
+
+    if not note:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="回收站中不存在该笔记"
+        )
+
+    if note.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权恢复该笔记"
+        )
+
+    if note.notebook is not None and note.notebook.deleted_at is not None:
+        note.notebook.deleted_at = None
+
+    note.deleted_at = None
+    await db.run_sync(notebook_stats.apply_change, None, notebook_stats.snapshot(note))
+    await db.run_sync(search_service.index_note, note)
+    response = NoteResponse.model_validate(note)
+
+    await db.commit()
+    note_response_cache.invalidate(note_id)
+
+    return response
@@ -3,6 +3,8 @@ from app.api.v1.schemas.user import (
     UserRegister,
     UserLogin,
     Token,
+    RefreshTokenRequest,
+    RefreshTokenResponse,
     UserResponse,
     LoginResponse,
     ChangePassword,
@@ -16,6 +18,26 @@ from app.api.v1.schemas.note import (
     NoteContentResponse,
     NoteListResponse,
     PaginationMeta,
+    CursorMeta,
+    NoteSearchHit,
+    NoteSearchResponse,
+    TextEditOp,
+    NoteContentPatch,
+    NoteContentPatchResponse,
+    NoteAutosave,
+    NoteAutosaveConflict,
+    NoteAutosaveResponse,
+    NoteBulkRequest,
+    NoteBulkResult,
+    NoteBulkResponse,
+    NoteBatchGetRequest,
+    NoteBatchGetError,
+    NoteBatchGetResponse,
+    NoteRevisionItem,
+    NoteRevisionListResponse,
+    NoteRevisionResponse,
+    NoteTrashItem,
+    NoteTrashResponse,
 )
 from app.api.v1.schemas.notebook import (
     NotebookCreate,
@@ -23,6 +45,7 @@ from app.api.v1.schemas.notebook import (
     NotebookResponse,
     NotebookListResponse,
 )
+from app.api.v1.schemas.bootstrap import BootstrapResponse
 from app.api.v1.schemas.ai import (
     ChatMessage,
     ChatRequest,
@@ -50,6 +73,8 @@ __all__ = [
     "UserRegister",
     "UserLogin",
     "Token",
+    "RefreshTokenRequest",
+    "RefreshTokenResponse",
     "UserResponse",
     "LoginResponse",
     "ChangePassword",
@@ -61,10 +86,31 @@ __all__ = [
     "NoteContentResponse",
     "NoteListResponse",
     "PaginationMeta",
+    "CursorMeta",
+    "NoteSearchHit",
+    "NoteSearchResponse",
+    "TextEditOp",
+    "NoteContentPatch",
+    "NoteContentPatchResponse",
+    "NoteAutosave",
+    "NoteAutosaveConflict",
+    "NoteAutosaveResponse",
+    "NoteBulkRequest",
+    "NoteBulkResult",
+    "NoteBulkResponse",
+    "NoteBatchGetRequest",
+    "NoteBatchGetError",
+    "NoteBatchGetResponse",
+    "NoteRevisionItem",
+    "NoteRevisionListResponse",
+    "NoteRevisionResponse",
+    "NoteTrashItem",
+    "NoteTrashResponse",
     "NotebookCreate",
     "NotebookUpdate",
     "NotebookResponse",
     "NotebookListResponse",
+    "BootstrapResponse",
     "ChatMessage",
     "ChatRequest",
     "ChatResponse",
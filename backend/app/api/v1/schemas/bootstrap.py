@@ -0,0 +1,15 @@
+"""工作区启动数据的 Pydantic 模式"""
+from pydantic import BaseModel, Field
+
+from app.api.v1.schemas.user import UserResponse
+from app.api.v1.schemas.notebook import NotebookResponse
+from app.api.v1.schemas.note import NoteListItem
+
+
+class BootstrapResponse(BaseModel):
+    """工作区启动数据响应"""
+    user: UserResponse
+    notebooks: list[NotebookResponse] = Field(..., description="全部未删除的笔记本（含已归档，附带统计）")
+    starred_notes: list[NoteListItem] = Field(..., description="星标笔记（按更新时间倒序）")
+    recent_notes: list[NoteListItem] = Field(..., description="最近编辑的笔记（按更新时间倒序）")
+    version: str = Field(..., description="工作区版本（与 ETag 相同）")
@@ -1,7 +1,7 @@
 """笔记相关的 Pydantic 模型"""
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, Any
+from typing import Optional, Any, Literal
 
 from app.models.cornell_note import AccessLevel
 
@@ -45,6 +45,118 @@ class NoteUpdate(BaseModel):
     is_starred: Optional[bool] = Field(None, description="是否星标")
     access_level: Optional[AccessLevel] = Field(None, description="访问级别")
     content: Optional[NoteContentBase] = Field(None, description="笔记内容")
+    version: Optional[int] = Field(None, ge=1, description="期望的内容版本号（乐观锁，不一致时返回 409）")
+
+
+# 笔记内容增量更新
+class TextEditOp(BaseModel):
+    """文本编辑操作（偏移量和长度以 UTF-16 码元计，与 JavaScript 字符串下标一致）"""
+    column: Literal["cue_column", "note_column", "summary_row"] = Field(..., description="编辑的栏目")
+    offset: int = Field(..., ge=0, description="起始位置")
+    delete: int = Field(0, ge=0, description="删除的长度")
+    insert: str = Field("", description="插入的文本")
+
+
+class NoteContentPatch(BaseModel):
+    """笔记内容增量更新请求"""
+    base_version: int = Field(..., ge=1, description="编辑所基于的内容版本号")
+    ops: list[TextEditOp] = Field(default_factory=list, max_length=1000, description="按顺序应用的编辑操作")
+    mindmap_data: Optional[Any] = Field(None, description="思维导图数据（整体替换，可选）")
+
+
+class NoteContentPatchResponse(BaseModel):
+    """笔记内容增量更新响应"""
+    note_id: str
+    version: int = Field(..., description="更新后的内容版本号")
+    word_count: int
+    estimated_review_minutes: Optional[int] = None
+    updated_at: datetime
+
+
+class NoteAutosave(BaseModel):
+    """笔记自动保存请求（只提交变化的字段即可）"""
+    base_version: int = Field(..., ge=1, description="编辑所基于的内容版本号（取上一次确认响应中的 base_version）")
+    cue_column: Optional[str] = None
+    note_column: Optional[str] = None
+    summary_row: Optional[str] = None
+    mindmap_data: Optional[Any] = None
+
+
+class NoteAutosaveResponse(BaseModel):
+    """笔记自动保存确认"""
+    note_id: str
+    base_version: int = Field(..., description="下一次提交应携带的内容版本号")
+    pending: bool = Field(..., description="是否还有未写入数据库的内容")
+
+
+class NoteAutosaveConflict(BaseModel):
+    """笔记自动保存冲突（409）"""
+    detail: str
+    current_version: Optional[int] = Field(None, description="当前数据库中的内容版本号")
+    unsaved: dict[str, Any] = Field(
+        default_factory=dict, description="因冲突未能写入数据库的已确认内容，客户端刷新后应与最新内容合并"
+    )
+
+
+class NoteBulkRequest(BaseModel):
+    """笔记批量操作请求"""
+    ids: list[str] = Field(..., min_length=1, max_length=500, description="笔记ID列表")
+    operation: Literal["move", "star", "unstar", "archive", "unarchive", "delete"] = Field(
+        ..., description="操作类型"
+    )
+    notebook_id: Optional[str] = Field(None, description="目标笔记本ID（move 时必填）")
+
+
+class NoteBulkResult(BaseModel):
+    """单条笔记的批量操作结果"""
+    id: str
+    status: Literal["ok", "not_found", "forbidden"]
+
+
+class NoteBulkResponse(BaseModel):
+    """笔记批量操作响应"""
+    operation: str
+    succeeded: int = Field(..., description="成功的笔记数量")
+    results: list[NoteBulkResult]
+
+
+class NoteBatchGetRequest(BaseModel):
+    """批量获取笔记请求"""
+    ids: list[str] = Field(..., min_length=1, max_length=100, description="笔记ID列表")
+
+
+class NoteBatchGetError(BaseModel):
+    """单条笔记的获取失败原因"""
+    status: Literal["not_found", "forbidden"]
+    detail: str
+
+
+class NoteRevisionItem(BaseModel):
+    """笔记修订列表项"""
+    version: int
+    kind: str = Field(..., description="snapshot（完整快照）或 delta（差异）")
+    author_id: Optional[str] = None
+    created_at: datetime
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class NoteRevisionListResponse(BaseModel):
+    """笔记修订列表响应"""
+    items: list[NoteRevisionItem]
+    current_version: Optional[int] = None
+
+
+class NoteRevisionResponse(BaseModel):
+    """笔记修订详情（重建后的完整内容）"""
+    note_id: str
+    version: int
+    cue_column: str = ""
+    note_column: str = ""
+    summary_row: str = ""
+    mindmap_data: Optional[Any] = None
 
 
 # 笔记响应（列表）
@@ -56,6 +168,7 @@ class NoteListItem(BaseModel):
     is_starred: bool
     access_level: AccessLevel
     word_count: int
+    estimated_review_minutes: Optional[int] = None
     view_count: int
     created_at: datetime
     updated_at: datetime
@@ -88,6 +201,12 @@ class NoteResponse(BaseModel):
     }
 
 
+class NoteBatchGetResponse(BaseModel):
+    """批量获取笔记响应"""
+    notes: dict[str, NoteResponse] = Field(..., description="笔记ID到笔记详情的映射")
+    errors: dict[str, NoteBatchGetError] = Field(..., description="笔记ID到失败原因的映射")
+
+
 # 分页响应
 class PaginationMeta(BaseModel):
     """分页元数据"""
@@ -97,7 +216,47 @@ class PaginationMeta(BaseModel):
     total_pages: int = Field(..., description="总页数")
 
 
+class CursorMeta(BaseModel):
+    """游标分页元数据"""
+    next_cursor: Optional[str] = Field(None, description="下一页游标，为空表示没有更多数据")
+    page_size: int = Field(..., description="每页数量")
+    has_more: bool = Field(..., description="是否还有下一页")
+    total: Optional[int] = Field(None, description="总记录数（仅在 with_total=true 时返回）")
+
+
 class NoteListResponse(BaseModel):
-    """笔记列表响应"""
+    """笔记列表响应
+
+    偏移分页模式返回 pagination，游标分页模式返回 cursor
+    """
     items: list[NoteListItem]
-    pagination: PaginationMeta
+    pagination: Optional[PaginationMeta] = None
+    cursor: Optional[CursorMeta] = None
+
+
+# 回收站
+class NoteTrashItem(NoteListItem):
+    """回收站列表项"""
+    deleted_at: datetime
+    purge_at: datetime = Field(..., description="预计被彻底清理的时间")
+
+
+class NoteTrashResponse(BaseModel):
+    """回收站列表响应（游标分页，按删除时间倒序）"""
+    items: list[NoteTrashItem]
+    cursor: CursorMeta
+
+
+# 全文检索
+class NoteSearchHit(NoteListItem):
+    """全文检索命中项"""
+    rank: float = Field(..., description="相关度得分（越大越相关）")
+    snippet: str = Field("", description="高亮摘要（命中词以 <mark> 包裹）")
+
+
+class NoteSearchResponse(BaseModel):
+    """全文检索响应"""
+    items: list[NoteSearchHit]
+    page: int = Field(..., description="当前页码")
+    page_size: int = Field(..., description="每页数量")
+    has_more: bool = Field(..., description="是否还有下一页")
@@ -34,6 +34,8 @@ class NotebookResponse(NotebookBase):
     is_archived: bool
     is_public: bool
     note_count: int = Field(0, description="笔记数量")
+    starred_count: int = Field(0, description="星标笔记数量")
+    word_count: int = Field(0, description="笔记总字数")
     created_at: datetime
     updated_at: datetime
 
@@ -32,6 +32,19 @@ class Token(BaseModel):
     expires_in: int = Field(..., description="过期时间(秒)")
 
 
+# 刷新令牌请求
+class RefreshTokenRequest(BaseModel):
+    """刷新令牌请求（刷新访问令牌、退出登录）"""
+    refresh_token: str = Field(..., min_length=1, max_length=128, description="刷新令牌")
+
+
+# 刷新令牌响应
+class RefreshTokenResponse(Token):
+    """刷新令牌响应：新的访问令牌和轮换后的刷新令牌"""
+    refresh_token: str = Field(..., description="新的刷新令牌，旧刷新令牌已失效")
+    refresh_expires_in: int = Field(..., description="刷新令牌过期时间(秒)")
+
+
 # 用户响应
 class UserResponse(BaseModel):
     """用户响应"""
@@ -60,6 +73,8 @@ class LoginResponse(BaseModel):
     access_token: str
     token_type: str
     expires_in: int
+    refresh_token: str
+    refresh_expires_in: int
     user: UserResponse
 
 
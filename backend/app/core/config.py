@@ -18,12 +18,53 @@ class Settings(BaseSettings):
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # 刷新令牌：每次刷新时轮换，连续 refresh_token_expire_days 天未使用则过期
+    refresh_token_expire_days: int = 30
+
+    # 密码哈希（bcrypt_sha256）
+    password_hash_rounds: int = 12  # 成本参数，低于该值的已存储哈希在用户下次登录时升级
+    password_hash_workers: int = 2  # 哈希线程数，0 表示在事件循环中直接计算（仅用于基准对比）
+    password_hash_max_pending: int = 64  # 排队和执行中的哈希任务上限，超过时返回 503
+
+    # 检索配置
+    # fulltext: 数据库全文检索（SQLite FTS5 / PostgreSQL tsvector）
+    # ngram: 基于分词器的倒排索引（note_search_terms 表），中文检索推荐
+    search_backend: str = "fulltext"
+    search_tokenizer: str = "cjk_bigram"
+
+    # 浏览次数写回间隔（秒）
+    view_count_flush_seconds: float = 10.0
+
+    # 笔记详情缓存（序列化结果，按内容版本失效）
+    note_cache_max_bytes: int = 64 * 1024 * 1024  # 0 表示禁用
+    note_cache_ttl_seconds: Optional[float] = None
+    bootstrap_cache_max_bytes: int = 32 * 1024 * 1024  # 工作区启动数据缓存，0 表示禁用
+    # 已认证用户缓存：多进程部署时其他进程中的修改（如脚本禁用用户）最迟在 TTL 后生效
+    user_cache_max_entries: int = 50_000  # 0 表示禁用
+    user_cache_ttl_seconds: float = 60.0
+
+    # 自动保存：每条笔记在窗口内最多写库一次
+    autosave_window_seconds: float = 30.0
+
+    # 笔记修订历史
+    revision_snapshot_interval: int = 20  # 每隔多少条差异写入一次完整快照
+    revision_retention_days: int = 7  # 超过该天数的修订会被压缩
+    revision_compact_bucket_minutes: int = 60  # 压缩时每个时间段只保留最后一条修订
+
+    # 回收站：软删除超过保留期的笔记和笔记本会被彻底清理
+    trash_retention_days: int = 30
+    trash_purge_batch_size: int = 200  # 每个清理事务处理的笔记数量
 
     # AI 配置
     # 深度探索的api_key
     explore_api_key: Optional[str] = None
     explore_base_url: Optional[str] = None
     explore_model_name: Optional[str] = None
+    # 单次 AI 调用的总时长上限（秒），超时后取消上游请求并返回 504
+    ai_request_timeout_seconds: float = 60.0
+    # 深度探索流式输出：增量按刷新间隔合并为一帧发送；空闲超过心跳间隔时发送 SSE 注释保持连接
+    ai_stream_flush_interval_seconds: float = 0.05
+    ai_stream_heartbeat_seconds: float = 15.0
 
     # 邀请码配置
     invite_code: str = "cornell2024"  # 默认邀请码，建议通过环境变量设置
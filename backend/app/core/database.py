@@ -1,7 +1,15 @@
-"""数据库配置"""
+"""数据库配置
+
+同时提供同步和异步两套引擎，连接同一个数据库：
+- 同步 Session（get_db）：脚本、后台写回任务和尚未迁移的端点使用
+- 异步 AsyncSession（get_async_db）：notes、conversations、auth 端点使用，
+  查询在 aiosqlite / asyncpg 上执行，等待数据库期间不阻塞事件循环
+"""
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from app.core.config import settings
 
@@ -16,6 +24,36 @@ engine = create_engine(
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+
+def async_database_url(database_url: str) -> str:
+    """把同步数据库 URL 转换为对应的异步驱动 URL
+
+    sqlite → sqlite+aiosqlite，postgresql / postgresql+psycopg2 → postgresql+asyncpg，
+    已指定其他驱动时保持不变。
+    """
+    url = make_url(database_url)
+    drivers = {
+        "sqlite": "sqlite+aiosqlite",
+        "postgresql": "postgresql+asyncpg",
+        "postgresql+psycopg2": "postgresql+asyncpg",
+    }
+    return url.set(drivername=drivers.get(url.drivername, url.drivername)).render_as_string(hide_password=False)
+
+
+# 异步引擎（与同步引擎连接同一个数据库）
+async_engine = create_async_engine(
+    async_database_url(settings.database_url),
+    echo=engine.echo
+)
+
+# 异步会话工厂：提交后不过期对象，端点在提交后读取属性不会触发隐式查询
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    expire_on_commit=False,
+    autoflush=False
+)
+
+
 def get_db() -> Generator[Session, None, None]:
     """获取数据库会话
 
@@ -28,10 +66,22 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """获取异步数据库会话
+
+    用于依赖注入。复用同步代码（services 中以 Session 为参数的函数）时，
+    通过 await db.run_sync(func, ...) 在同一事务中调用。
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db() -> None:
     """初始化数据库
 
-    创建所有表
+    创建所有表及全文检索索引
     """
     from app.models import Base
+    from app.services.search import create_search_index
     Base.metadata.create_all(bind=engine)
+    create_search_index(engine)
@@ -1,6 +1,15 @@
-"""安全相关工具"""
+"""安全相关工具
+
+bcrypt 计算一次约数百毫秒，异步端点通过 password_hasher 在专用的有界线程池中计算
+（bcrypt 计算期间释放 GIL，不阻塞事件循环），排队任务超过上限时抛出 PasswordHashingBusy，
+由全局异常处理返回 503，避免登录高峰拖垮同一进程中的其他请求。
+"""
+import asyncio
+import secrets
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 
@@ -8,7 +17,17 @@ from app.core.config import settings
 
 # 密码哈希上下文
 # 使用 bcrypt_sha256 代替 bcrypt，自动处理超长密码
-pwd_context = CryptContext(schemes=["bcrypt_sha256"], deprecated="auto")
+# min_rounds 与 default_rounds 相同：成本低于当前配置的哈希视为需要升级
+pwd_context = CryptContext(
+    schemes=["bcrypt_sha256"],
+    deprecated="auto",
+    bcrypt_sha256__default_rounds=settings.password_hash_rounds,
+    bcrypt_sha256__min_rounds=settings.password_hash_rounds,
+)
+
+
+class PasswordHashingBusy(Exception):
+    """密码哈希任务排队已满"""
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -36,6 +55,94 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def new_security_stamp() -> str:
+    """生成新的用户安全戳"""
+    return secrets.token_hex(16)
+
+
+class PasswordHasher:
+    """有界线程池中的密码哈希
+
+    只允许 max_pending 个任务排队或执行，超过时立即抛出 PasswordHashingBusy 而不是无限排队。
+    任务计数在线程池任务结束时释放（而不是等待方取消时），客户端断开不会让计数失真。
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        """
+        Args:
+            workers: 线程数，0 表示在调用方直接计算
+            max_pending: 排队和执行中的任务上限
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+            if workers > 0 else None
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        self.completed = 0
+        self.rejected = 0
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._executor is None:
+            return func(*args)
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHashingBusy()
+            self._pending += 1
+
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        """计算密码哈希"""
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """验证密码"""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """验证密码，成本参数已过时时同时返回按当前配置重新计算的哈希
+
+        Returns:
+            Tuple[bool, Optional[str]]: (是否匹配, 新哈希；无需升级时为 None)
+        """
+        return await self._run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """线程池统计"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_pending)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """创建访问令牌
 
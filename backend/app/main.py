@@ -1,10 +1,27 @@
 """FastAPI 应用主入口"""
-from fastapi import FastAPI
+import asyncio
+import logging
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.api.v1 import api_router
-from app.core.database import init_db
+from app.core.config import settings
+from app.core.database import init_db, engine, async_engine, SessionLocal
+from app.core.security import password_hasher, PasswordHashingBusy
+from app.services.autosave import autosave_buffer
+from app.services.view_counter import view_counter
+
+logger = logging.getLogger(__name__)
+
+
+def _flush_on_shutdown(name: str, flush) -> None:
+    """关闭时写回内存缓冲，单个缓冲写回失败只记录日志，不影响其他缓冲"""
+    try:
+        flush()
+    except Exception:
+        logger.exception(f"关闭时{name}写回失败")
 
 
 @asynccontextmanager
@@ -13,8 +30,20 @@ async def lifespan(app: FastAPI):
     # 启动时初始化数据库
     init_db()
     print("✅ 数据库初始化完成")
+    flush_task = asyncio.create_task(
+        view_counter.run_flush_loop(engine, settings.view_count_flush_seconds)
+    )
+    autosave_task = asyncio.create_task(
+        autosave_buffer.run_flush_loop(SessionLocal, min(1.0, settings.autosave_window_seconds))
+    )
     yield
     # 关闭时的清理工作
+    flush_task.cancel()
+    autosave_task.cancel()
+    _flush_on_shutdown("自动保存缓冲", lambda: autosave_buffer.flush(SessionLocal, force=True))
+    _flush_on_shutdown("浏览次数", lambda: view_counter.flush(engine))
+    password_hasher.shutdown()
+    await async_engine.dispose()
     print("👋 应用关闭")
 
 
@@ -35,8 +64,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    """密码哈希排队已满时返回 503，提示客户端稍后重试"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "登录请求过多，请稍后重试"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # 注册 API 路由
 app.include_router(api_router, prefix="/api/v1")
 
@@ -54,7 +94,7 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """健康检查"""
+    """健康检查（仅存活状态，运行统计见 GET /api/v1/admin/stats）"""
     return {"status": "healthy"}
 
 
@@ -5,6 +5,9 @@ from app.models.notebook import Notebook
 from app.models.cornell_note import CornellNote, AccessLevel
 from app.models.note_content import NoteContent
 from app.models.explore_conversation import ExploreConversation, ExploreQAPair
+from app.models.note_search_term import NoteSearchTerm
+from app.models.note_revision import NoteRevision
+from app.models.user_session import UserSession
 
 __all__ = [
     "Base",
@@ -17,4 +20,7 @@ __all__ = [
     "NoteContent",
     "ExploreConversation",
     "ExploreQAPair",
+    "NoteSearchTerm",
+    "NoteRevision",
+    "UserSession",
 ]
@@ -1,5 +1,5 @@
 """康奈尔笔记模型"""
-from sqlalchemy import String, Boolean, DateTime, ForeignKey, Integer, Enum
+from sqlalchemy import String, Boolean, DateTime, ForeignKey, Integer, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from typing import Optional
@@ -22,6 +22,14 @@ class CornellNote(BaseModel):
     """
 
     __tablename__ = "cornell_notes"
+    __table_args__ = (
+        # 游标分页：(owner_id, 排序字段, id) 复合索引，保证每页代价与页深无关
+        Index("ix_cornell_notes_owner_created", "owner_id", "created_at", "id"),
+        Index("ix_cornell_notes_owner_updated", "owner_id", "updated_at", "id"),
+        # 回收站列表 (owner_id, deleted_at, id) 与过期清理 (deleted_at)
+        Index("ix_cornell_notes_owner_deleted", "owner_id", "deleted_at", "id"),
+        Index("ix_cornell_notes_deleted_at", "deleted_at"),
+    )
 
     # 基本信息
     title: Mapped[str] = mapped_column(String(300), nullable=False)
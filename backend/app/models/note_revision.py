@@ -0,0 +1,50 @@
+"""笔记内容修订历史模型"""
+from datetime import datetime
+from typing import Optional
+import uuid
+
+from sqlalchemy import String, Integer, DateTime, ForeignKey, LargeBinary, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class NoteRevision(Base):
+    """笔记内容修订表
+
+    每次内容写入记录一条修订，payload 为 zlib 压缩的 JSON：
+    - snapshot：完整内容快照
+    - delta：相对上一条已存储修订的差异（按栏目记录公共前后缀之外的替换片段）
+
+    chain_length 为距最近快照的差异条数，达到配置的快照间隔时写入新快照，
+    重建任一版本最多回放一个快照间隔内的差异。由 app.services.revisions 维护。
+    """
+
+    __tablename__ = "note_revisions"
+    __table_args__ = (
+        UniqueConstraint("note_id", "version", name="uq_note_revisions_note_version"),
+    )
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    note_id: Mapped[str] = mapped_column(
+        ForeignKey("cornell_notes.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+
+    # 对应的 NoteContent.version
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # snapshot / delta
+    kind: Mapped[str] = mapped_column(String(10), nullable=False)
+    chain_length: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    author_id: Mapped[Optional[str]] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<NoteRevision(note_id={self.note_id}, version={self.version}, kind={self.kind})>"
@@ -0,0 +1,29 @@
+"""笔记检索倒排索引模型"""
+from sqlalchemy import String, Integer, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class NoteSearchTerm(Base):
+    """笔记检索倒排索引表
+
+    每行记录一个词元在一条笔记中的出现次数，由 app.services.ngram_index 维护。
+    主键 (owner_id, term, note_id) 同时充当按用户查词（含前缀范围扫描）的索引。
+    """
+
+    __tablename__ = "note_search_terms"
+
+    owner_id: Mapped[str] = mapped_column(String, primary_key=True)
+    term: Mapped[str] = mapped_column(String(64), primary_key=True)
+    note_id: Mapped[str] = mapped_column(
+        ForeignKey("cornell_notes.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True
+    )
+
+    # 加权词频（标题中的词元按更高权重计入）
+    tf: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+
+    def __repr__(self):
+        return f"<NoteSearchTerm(term={self.term}, note_id={self.note_id}, tf={self.tf})>"
@@ -1,5 +1,5 @@
 """笔记本模型"""
-from sqlalchemy import String, Boolean, DateTime, ForeignKey
+from sqlalchemy import String, Boolean, DateTime, ForeignKey, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from typing import List, Optional
@@ -27,6 +27,11 @@ class Notebook(BaseModel):
     is_archived: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False, index=True)
     is_public: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
+    # 统计信息（未删除笔记的冗余计数，由 app.services.notebook_stats 维护）
+    note_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    starred_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    word_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     # 软删除
     deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
@@ -1,10 +1,11 @@
 """用户模型"""
-from sqlalchemy import String, Boolean, DateTime, Enum
+from sqlalchemy import String, Boolean, DateTime, Enum, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 import enum
 from typing import List
 
+from app.core.security import new_security_stamp
 from app.models.base import BaseModel
 
 
@@ -46,6 +47,17 @@ class User(BaseModel):
     verified: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
 
+    # 安全戳：写入访问令牌，修改密码或禁用用户时更换，使已签发的令牌和用户缓存失效
+    security_stamp: Mapped[str] = mapped_column(
+        String(32),
+        default=new_security_stamp,
+        server_default="",
+        nullable=False
+    )
+
+    # 工作区版本号：浏览次数、笔记本统计等不更新 updated_at 的写入加一，参与工作区 ETag
+    workspace_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     # 最后登录时间
     last_login: Mapped[datetime] = mapped_column(DateTime, nullable=True)
 
@@ -0,0 +1,41 @@
+"""登录会话（刷新令牌）模型"""
+from datetime import datetime
+from typing import Optional
+import uuid
+
+from sqlalchemy import String, DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class UserSession(Base):
+    """登录会话表
+
+    每次登录创建一条会话，对应一个设备上的刷新令牌。只保存令牌的 SHA-256 摘要，
+    每次刷新时在同一条 UPDATE 中校验旧摘要并写入新摘要（轮换），旧令牌随即失效。
+    由 app.services.sessions 维护。
+    """
+
+    __tablename__ = "user_sessions"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id: Mapped[str] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+
+    # 当前刷新令牌的 SHA-256 十六进制摘要
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+
+    user_agent: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    last_used_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    # 退出登录、修改密码或禁用用户时设置
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<UserSession(id={self.id}, user_id={self.user_id}, expires_at={self.expires_at})>"
@@ -0,0 +1,296 @@
+"""笔记自动保存合并缓冲
+
+编辑器输入时每隔几秒提交一次完整内容。自动保存端点只把最新内容放进进程内缓冲并立即确认，
+后台任务保证每条笔记在 settings.autosave_window_seconds 内最多写库一次，
+窗口内的多次提交只保留最后一次（按字段合并）。
+显式“立即保存”和应用关闭时会强制写回。
+读取笔记（详情、批量获取、导出）和其他途径的写入（整体更新、增量更新）前，
+先写回该笔记尚未落库的内容，读到的内容和 ETag 总是包含已确认的编辑。
+
+版本协商：确认响应中的 base_version 是缓冲区对应的数据库版本，客户端后续提交携带它即可；
+写回后版本号加一，写回前发出的（携带上一个版本号的）请求同样接受。
+写回时仍按乐观锁条件更新。与其他设备的保存冲突时，未能写入的内容保留在缓冲中，
+直到客户端下一次提交（或“立即保存”）时随 409 响应返回，由客户端刷新后合并，
+已确认（202）的编辑不会被静默丢弃。
+
+缓冲按进程独立，多进程部署时同一笔记的自动保存需路由到同一进程（或关闭此功能）；
+进程异常退出最多丢失一个窗口内的编辑。
+"""
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.models import CornellNote
+from app.services import search as search_service
+from app.services.cache import note_response_cache
+from app.services.note_content import update_content_if_version
+
+logger = logging.getLogger(__name__)
+
+
+class AutosaveConflict(Exception):
+    """提交的基础版本与缓冲区/数据库版本不一致
+
+    args[0] 为当前数据库版本；unsaved 为写回冲突时未能写入的内容（没有时为空字典）。
+    """
+
+    def __init__(self, version: Optional[int], unsaved: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(version)
+        self.unsaved = unsaved or {}
+
+
+@dataclass
+class _PendingSave:
+    owner_id: str
+    base_version: int
+    previous_version: Optional[int] = None
+    author_id: Optional[str] = None
+    values: Dict[str, Any] = field(default_factory=dict)
+    last_write_at: float = field(default_factory=time.monotonic)
+    last_submit_at: float = field(default_factory=time.monotonic)
+    # 写回冲突时未能写入的内容及当时的数据库版本，告知客户端后才移除
+    rejected: Optional[Dict[str, Any]] = None
+    rejected_version: Optional[int] = None
+
+
+class AutosaveBuffer:
+    """自动保存合并缓冲区（线程安全）"""
+
+    def __init__(self, window_seconds: float) -> None:
+        self.window_seconds = window_seconds
+        self._entries: Dict[str, _PendingSave] = {}
+        self._lock = threading.Lock()
+        # 后台任务与“立即保存”可能同时触发写回，由 _flush_lock 串行化
+        self._flush_lock = threading.Lock()
+
+        self.submits = 0
+        self.writes = 0
+        self.conflicts = 0
+
+    def owner_of(self, note_id: str) -> Optional[str]:
+        """缓冲中笔记的所有者，没有缓冲时返回 None"""
+        with self._lock:
+            entry = self._entries.get(note_id)
+            return entry.owner_id if entry else None
+
+    def submit(
+        self,
+        note_id: str,
+        owner_id: str,
+        base_version: int,
+        values: Dict[str, Any],
+        author_id: Optional[str] = None,
+        db_version: Optional[int] = None,
+    ) -> int:
+        """提交一次自动保存
+
+        Args:
+            note_id: 笔记ID
+            owner_id: 笔记所有者
+            base_version: 客户端编辑所基于的版本
+            values: 要写入的字段
+            author_id: 修改人
+            db_version: 当前数据库版本（缓冲中没有该笔记时必须提供）
+
+        Returns:
+            int: 客户端下一次提交应携带的 base_version
+
+        Raises:
+            AutosaveConflict: 基础版本不一致，或此前的写回发生冲突时抛出（附带未写入的内容）
+        """
+        with self._lock:
+            entry = self._entries.get(note_id)
+            if entry is not None and entry.rejected is not None:
+                del self._entries[note_id]
+                raise AutosaveConflict(entry.rejected_version, entry.rejected)
+            if entry is None:
+                if db_version is None or base_version != db_version:
+                    raise AutosaveConflict(db_version)
+                entry = _PendingSave(owner_id=owner_id, base_version=db_version)
+                self._entries[note_id] = entry
+            elif base_version not in (entry.base_version, entry.previous_version):
+                raise AutosaveConflict(entry.base_version)
+
+            entry.values.update(values)
+            entry.author_id = author_id
+            entry.last_submit_at = time.monotonic()
+            self.submits += 1
+            return entry.base_version
+
+    def take_conflict(self, note_id: str) -> Optional[AutosaveConflict]:
+        """取出写回冲突时未能写入的内容（取出后从缓冲中移除）
+
+        Returns:
+            Optional[AutosaveConflict]: 没有冲突时返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(note_id)
+            if entry is None or entry.rejected is None:
+                return None
+            del self._entries[note_id]
+            return AutosaveConflict(entry.rejected_version, entry.rejected)
+
+    def discard(self, note_id: str) -> None:
+        """丢弃笔记的缓冲内容（笔记被删除时）"""
+        with self._lock:
+            self._entries.pop(note_id, None)
+
+    def release(self, note_id: str) -> None:
+        """移除已全部写回的空条目（其他途径直接写库前调用）
+
+        条目记录的 base_version 不会随其他途径的写入更新，保留它会让之后基于新版本的提交被误判为冲突；
+        移除后下一次提交重新读取数据库版本。仍有未写回内容或冲突内容的条目保留。
+        """
+        with self._lock:
+            entry = self._entries.get(note_id)
+            if entry is not None and not entry.values and entry.rejected is None:
+                del self._entries[note_id]
+
+    def pending_note_ids(
+        self,
+        note_ids: Optional[List[str]] = None,
+        owner_id: Optional[str] = None,
+    ) -> List[str]:
+        """有尚未写回内容的笔记ID（读取前据此决定是否先写回）
+
+        Args:
+            note_ids: 只检查这些笔记（默认全部）
+            owner_id: 只检查该用户的笔记（可选）
+
+        Returns:
+            List[str]: 笔记ID列表
+        """
+        with self._lock:
+            candidates = note_ids if note_ids is not None else list(self._entries)
+            pending = []
+            for note_id in candidates:
+                entry = self._entries.get(note_id)
+                if entry is not None and entry.values and (owner_id is None or entry.owner_id == owner_id):
+                    pending.append(note_id)
+            return pending
+
+    def flush(
+        self,
+        session_factory: Callable[[], Session],
+        note_ids: Optional[List[str]] = None,
+        force: bool = False,
+    ) -> int:
+        """把到期（或全部）缓冲内容写回数据库
+
+        Args:
+            session_factory: 会话工厂
+            note_ids: 只写回这些笔记（默认全部）
+            force: 忽略写入窗口立即写回
+
+        Returns:
+            int: 写回的笔记数量
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = note_ids if note_ids is not None else list(self._entries)
+            due = []
+            for note_id in candidates:
+                entry = self._entries.get(note_id)
+                if entry is None:
+                    continue
+                if not entry.values:
+                    # 长时间没有新提交的空条目直接清理（保留冲突内容的条目等待告知客户端）
+                    if entry.rejected is None and now - entry.last_submit_at > self.window_seconds * 10:
+                        del self._entries[note_id]
+                    continue
+                if force or now - entry.last_write_at >= self.window_seconds:
+                    due.append(note_id)
+
+        written = 0
+        with self._flush_lock:
+            for note_id in due:
+                if self._write(session_factory, note_id):
+                    written += 1
+        return written
+
+    def _write(self, session_factory: Callable[[], Session], note_id: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(note_id)
+            if entry is None or not entry.values:
+                return False
+            values, entry.values = entry.values, {}
+            base_version, author_id = entry.base_version, entry.author_id
+
+        db = session_factory()
+        try:
+            note = db.query(CornellNote).options(
+                joinedload(CornellNote.content)
+            ).filter(
+                CornellNote.id == note_id,
+                CornellNote.deleted_at.is_(None)
+            ).first()
+
+            if not note or not note.content or not update_content_if_version(
+                db, note, base_version, values, author_id
+            ):
+                current_version = note.content.version if note and note.content else None
+                db.rollback()
+                with self._lock:
+                    # 写回期间的新提交一并保留，之后的提交直接返回冲突
+                    entry = self._entries.get(note_id)
+                    if entry is not None:
+                        entry.rejected = {**values, **entry.values}
+                        entry.rejected_version = current_version
+                        entry.values = {}
+                    self.conflicts += 1
+                logger.warning(f"自动保存冲突，保留未写入的内容等待客户端处理: note_id={note_id}, base_version={base_version}")
+                return False
+
+            note.last_edited_by = author_id
+            search_service.index_note(db, note)
+            db.commit()
+        except Exception:
+            db.rollback()
+            # 写回失败时合并回缓冲区（期间的新提交优先）
+            with self._lock:
+                entry = self._entries.get(note_id)
+                if entry is not None:
+                    entry.values = {**values, **entry.values}
+            raise
+        finally:
+            db.close()
+
+        note_response_cache.invalidate(note_id)
+        with self._lock:
+            entry = self._entries.get(note_id)
+            if entry is not None:
+                entry.previous_version = base_version
+                entry.base_version = base_version + 1
+                entry.last_write_at = time.monotonic()
+            self.writes += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """缓冲统计信息"""
+        with self._lock:
+            return {
+                "notes": len(self._entries),
+                "pending": sum(1 for entry in self._entries.values() if entry.values),
+                "rejected": sum(1 for entry in self._entries.values() if entry.rejected is not None),
+                "submits": self.submits,
+                "writes": self.writes,
+                "conflicts": self.conflicts,
+            }
+
+    async def run_flush_loop(self, session_factory: Callable[[], Session], interval: float) -> None:
+        """后台定时检查到期的缓冲，直到任务被取消"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.flush, session_factory)
+            except Exception as e:
+                logger.error(f"自动保存写回失败: {str(e)}")
+
+
+autosave_buffer = AutosaveBuffer(settings.autosave_window_seconds)
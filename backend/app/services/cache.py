@@ -0,0 +1,180 @@
+"""进程内 LRU 缓存
+
+按条目数和估算字节数双重限容，可选 TTL。每个条目带一个版本戳（stamp），
+读取时版本戳不一致视为未命中，因此数据更新后即使没有显式失效也不会读到旧值；
+写路径仍应调用 invalidate() 尽早释放内存。
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.config import settings
+
+
+@dataclass
+class _Entry:
+    stamp: Any
+    value: Any
+    size: int
+    expires_at: Optional[float]
+
+
+class LRUCache:
+    """线程安全的 LRU 缓存"""
+
+    def __init__(
+        self,
+        name: str,
+        max_bytes: int,
+        max_entries: int = 100_000,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            name: 缓存名称（用于统计输出）
+            max_bytes: 最大估算字节数，为 0 时禁用缓存
+            max_entries: 最大条目数
+            ttl_seconds: 条目存活时间（秒），为 None 时不过期
+        """
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.max_entries > 0
+
+    def get(self, key: Hashable, stamp: Any = None) -> Optional[Any]:
+        """读取缓存
+
+        Args:
+            key: 缓存键
+            stamp: 期望的版本戳，与条目不一致时视为未命中
+
+        Returns:
+            缓存值，未命中时返回 None
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            if entry.stamp != stamp:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, key: Hashable, value: Any, size: int, stamp: Any = None) -> None:
+        """写入缓存，超出容量时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            size: 估算字节数
+            stamp: 版本戳
+        """
+        if not self.enabled or size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(stamp=stamp, value=value, size=size, expires_at=expires_at)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """使某个键失效"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+# 用户缓存条目的估算大小（按条目数限容，字节数只用于统计）
+USER_ENTRY_BYTES = 1024
+
+# 笔记详情缓存：键为笔记ID，版本戳为 (内容版本号, 更新时间)，值为可直接 JSON 序列化的字典
+note_response_cache = LRUCache(
+    name="note_response",
+    max_bytes=settings.note_cache_max_bytes,
+    ttl_seconds=settings.note_cache_ttl_seconds,
+)
+
+# 工作区启动数据缓存：键为 (用户ID, 列表长度参数)，版本戳为工作区 ETag，值为可直接 JSON 序列化的字典
+bootstrap_cache = LRUCache(
+    name="bootstrap",
+    max_bytes=settings.bootstrap_cache_max_bytes,
+    max_entries=10_000,
+)
+
+# 已认证用户缓存：键为用户ID，版本戳为访问令牌中的安全戳，值为已脱离会话的 User 对象
+user_cache = LRUCache(
+    name="user",
+    max_bytes=settings.user_cache_max_entries * USER_ENTRY_BYTES,
+    max_entries=settings.user_cache_max_entries,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+)
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """所有缓存的统计信息"""
+    return {cache.name: cache.stats() for cache in (note_response_cache, bootstrap_cache, user_cache)}
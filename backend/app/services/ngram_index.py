@@ -0,0 +1,253 @@
+"""基于分词器的笔记倒排索引
+
+索引存放在 note_search_terms 表，词元由 app.services.tokenizer 生成（默认中文二元组）。
+与数据库自带的全文检索相比，不依赖 FTS 扩展和分词配置，SQLite 与 PostgreSQL 行为一致。
+
+查询时每个查询词元对应一次 (owner_id, term) 主键范围扫描，多个词元之间取交集（INTERSECT）。
+二元组只记录出现而不记录位置，查询含三字及以上的连续中文时，
+交集得到的是候选笔记，还需在候选笔记的原文中校验短语（_verify_phrases）。
+前缀匹配使用 term >= :p AND term < :p || U+FFFF 的范围条件而不是 LIKE，
+以保证 SQLite 下同样能走主键索引。
+"""
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, delete, desc, false, func, insert, intersect, literal, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import CornellNote, NoteContent, NoteSearchTerm
+from app.services.tokenizer import QueryTerm, Tokenizer, get_tokenizer, normalize
+from app.utils.ids import COPY_ID_MAP
+from app.utils.text import html_to_text
+
+# 标题中的词元按此权重计入词频
+TITLE_WEIGHT = 5
+
+_PREFIX_UPPER_BOUND = "\uffff"
+
+# 短语校验每批读取的候选笔记数量
+_VERIFY_BATCH_SIZE = 500
+
+
+def _tokenizer() -> Tokenizer:
+    return get_tokenizer(settings.search_tokenizer)
+
+
+def index_note(db: Session, note: CornellNote, content: Optional[NoteContent] = None) -> None:
+    """刷新一条笔记的倒排索引行
+
+    与已有索引行比较，只删除消失的词元、插入新词元、更新词频变化的词元：
+    局部编辑只改动少量行，而不是整篇笔记的全部词元。
+
+    Args:
+        db: 数据库会话
+        note: 笔记
+        content: 笔记内容（默认取 note.content）
+    """
+    tokenizer = _tokenizer()
+    content = content if content is not None else note.content
+
+    counts: Counter = Counter()
+    for token in tokenizer.tokenize(note.title or ""):
+        counts[token] += TITLE_WEIGHT
+    if content:
+        for column in (content.cue_column, content.note_column, content.summary_row):
+            counts.update(tokenizer.tokenize(html_to_text(column or "")))
+
+    existing = {
+        (row.owner_id, row.term): row.tf
+        for row in db.execute(
+            select(NoteSearchTerm.owner_id, NoteSearchTerm.term, NoteSearchTerm.tf)
+            .where(NoteSearchTerm.note_id == note.id)
+        )
+    }
+    wanted = {(note.owner_id, term): tf for term, tf in counts.items()}
+
+    removed = [key for key in existing if key not in wanted]
+    for owner_id, terms in _group_terms(removed).items():
+        db.execute(delete(NoteSearchTerm).where(
+            NoteSearchTerm.note_id == note.id,
+            NoteSearchTerm.owner_id == owner_id,
+            NoteSearchTerm.term.in_(terms),
+        ))
+
+    changed = [
+        {"b_owner_id": owner_id, "b_term": term, "b_tf": tf}
+        for (owner_id, term), tf in wanted.items()
+        if (owner_id, term) in existing and existing[(owner_id, term)] != tf
+    ]
+    if changed:
+        db.execute(
+            update(NoteSearchTerm)
+            .where(
+                NoteSearchTerm.owner_id == bindparam("b_owner_id"),
+                NoteSearchTerm.term == bindparam("b_term"),
+                NoteSearchTerm.note_id == note.id,
+            )
+            .values(tf=bindparam("b_tf"))
+            .execution_options(synchronize_session=False),
+            changed,
+        )
+
+    added = [
+        {"owner_id": owner_id, "term": term, "note_id": note.id, "tf": tf}
+        for (owner_id, term), tf in wanted.items()
+        if (owner_id, term) not in existing
+    ]
+    if added:
+        db.execute(insert(NoteSearchTerm), added)
+
+
+def _group_terms(keys: List[Tuple[str, str]]) -> Dict[str, List[str]]:
+    """按所有者分组 (owner_id, term) 列表"""
+    grouped: Dict[str, List[str]] = {}
+    for owner_id, term in keys:
+        grouped.setdefault(owner_id, []).append(term)
+    return grouped
+
+
+def remove_note(db: Session, note_id: str) -> None:
+    """删除一条笔记的倒排索引行"""
+    db.execute(delete(NoteSearchTerm).where(NoteSearchTerm.note_id == note_id))
+
+
+def remove_notes(db: Session, note_ids: List[str]) -> None:
+    """批量删除笔记的倒排索引行"""
+    db.execute(delete(NoteSearchTerm).where(NoteSearchTerm.note_id.in_(note_ids)))
+
+
+def copy_index(db: Session, owner_id: str) -> None:
+    """复制笔记的倒排索引行（INSERT ... SELECT），原ID与新ID的对应取自临时映射表
+
+    Args:
+        db: 数据库会话
+        owner_id: 新笔记的所有者ID
+    """
+    db.execute(
+        insert(NoteSearchTerm).from_select(
+            ["owner_id", "term", "note_id", "tf"],
+            select(
+                literal(owner_id),
+                NoteSearchTerm.term,
+                COPY_ID_MAP.c.new_id,
+                NoteSearchTerm.tf,
+            ).join_from(NoteSearchTerm, COPY_ID_MAP, COPY_ID_MAP.c.old_id == NoteSearchTerm.note_id),
+        )
+    )
+
+
+def _term_condition(query_term: QueryTerm):
+    if query_term.prefix:
+        return and_(
+            NoteSearchTerm.term >= query_term.term,
+            NoteSearchTerm.term < query_term.term + _PREFIX_UPPER_BOUND,
+        )
+    return NoteSearchTerm.term == query_term.term
+
+
+def _verify_phrases(db: Session, note_ids: List[str], phrases: List[str]) -> List[str]:
+    """在候选笔记的原文中校验短语，返回每个短语都出现在同一栏（或标题）中的笔记ID"""
+    verified = []
+    for start in range(0, len(note_ids), _VERIFY_BATCH_SIZE):
+        rows = db.execute(
+            select(
+                CornellNote.id,
+                CornellNote.title,
+                NoteContent.cue_column,
+                NoteContent.note_column,
+                NoteContent.summary_row,
+            )
+            .outerjoin(NoteContent, NoteContent.note_id == CornellNote.id)
+            .where(CornellNote.id.in_(note_ids[start:start + _VERIFY_BATCH_SIZE]))
+        ).all()
+        for row in rows:
+            texts = [normalize(row[1] or "")] + [normalize(html_to_text(column or "")) for column in row[2:]]
+            if all(any(phrase in text for text in texts) for phrase in phrases):
+                verified.append(row[0])
+    return verified
+
+
+def match_subquery(db: Session, owner_id: str, query: str):
+    """返回包含全部查询词元的笔记ID子查询
+
+    查询需要校验短语时先取出候选笔记并在原文中校验，返回校验通过的笔记ID列表。
+
+    Args:
+        db: 数据库会话
+        owner_id: 笔记所有者ID
+        query: 搜索关键词
+
+    Returns:
+        可用于 CornellNote.id.in_() 的子查询或笔记ID列表
+    """
+    tokenizer = _tokenizer()
+    terms = tokenizer.query_terms(query)
+    if not terms:
+        return select(NoteSearchTerm.note_id).where(false())
+
+    candidates = _candidates(owner_id, terms)
+    phrases = tokenizer.query_phrases(query)
+    if not phrases:
+        return candidates
+    return _verify_phrases(db, list(db.execute(candidates).scalars()), phrases)
+
+
+def _candidates(owner_id: str, terms: List[QueryTerm]):
+    """包含全部查询词元的笔记ID子查询"""
+    selects = [
+        select(NoteSearchTerm.note_id).where(
+            NoteSearchTerm.owner_id == owner_id,
+            _term_condition(term),
+        )
+        for term in terms
+    ]
+    if len(selects) == 1:
+        return selects[0]
+    return select(intersect(*selects).subquery().c.note_id)
+
+
+def search(
+    db: Session,
+    owner_id: str,
+    query: str,
+    limit: int,
+    offset: int = 0,
+    notebook_id: Optional[str] = None,
+) -> List[Tuple[str, float]]:
+    """按命中词元的加权词频之和排序检索
+
+    Args:
+        db: 数据库会话
+        owner_id: 笔记所有者ID
+        query: 搜索关键词
+        limit: 返回数量
+        offset: 偏移量
+        notebook_id: 限定笔记本（可选）
+
+    Returns:
+        List[Tuple[str, float]]: (笔记ID, 得分)，按得分降序
+    """
+    terms = _tokenizer().query_terms(query)
+    if not terms:
+        return []
+
+    score = func.sum(NoteSearchTerm.tf).label("score")
+    stmt = (
+        select(NoteSearchTerm.note_id, score)
+        .join(CornellNote, CornellNote.id == NoteSearchTerm.note_id)
+        .where(
+            NoteSearchTerm.owner_id == owner_id,
+            NoteSearchTerm.note_id.in_(match_subquery(db, owner_id, query)),
+            or_(*[_term_condition(term) for term in terms]),
+            CornellNote.deleted_at.is_(None),
+        )
+        .group_by(NoteSearchTerm.note_id)
+        .order_by(desc(score), NoteSearchTerm.note_id)
+        .limit(limit)
+        .offset(offset)
+    )
+    if notebook_id:
+        stmt = stmt.where(CornellNote.notebook_id == notebook_id)
+
+    return [(row[0], float(row[1])) for row in db.execute(stmt).all()]
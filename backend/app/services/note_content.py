@@ -0,0 +1,70 @@
+"""笔记内容写入
+
+内容写入统一走 update_content_if_version()：乐观锁条件更新 + 修订记录 + 文本统计，
+供笔记端点和自动保存缓冲共用。
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import CornellNote, NoteContent
+from app.services import notebook_stats
+from app.services import revisions as revision_service
+from app.services import text_stats
+
+
+def update_content_if_version(
+    db: Session,
+    note: CornellNote,
+    expected_version: int,
+    values: dict,
+    author_id: Optional[str] = None,
+) -> bool:
+    """条件更新笔记内容（乐观锁）
+
+    执行 UPDATE note_contents SET ..., version = version + 1 WHERE id = :id AND version = :v。
+    成功后把新值同步到内存对象（无需回读），在同一事务内记录一条修订，
+    并增量更新笔记的字数和预计复习时长（只重新统计变化的栏目）以及所属笔记本的总字数。
+
+    Args:
+        db: 数据库会话
+        note: 已加载内容的笔记
+        expected_version: 期望的当前版本号
+        values: 要写入的字段
+        author_id: 修改人（记录在修订中）
+
+    Returns:
+        bool: 是否写入成功，版本不一致（已被并发修改）时返回 False，由调用方回滚
+    """
+    content = note.content
+    previous = revision_service.content_values(content)
+    previous_words = note.word_count or 0
+    values = {**values, "updated_at": datetime.utcnow()}
+    result = db.execute(
+        update(NoteContent)
+        .where(NoteContent.id == content.id, NoteContent.version == expected_version)
+        .values(version=NoteContent.version + 1, **values)
+        .execution_options(synchronize_session=False)
+    )
+
+    if result.rowcount != 1:
+        return False
+
+    for field, value in {**values, "version": expected_version + 1}.items():
+        set_committed_value(content, field, value)
+
+    revision_service.record_revision(
+        db,
+        content.note_id,
+        expected_version + 1,
+        previous,
+        revision_service.content_values(content),
+        author_id,
+    )
+    text_stats.update_note_stats(note, content, previous)
+    notebook_stats.adjust(db, note.notebook_id, words=note.word_count - previous_words)
+    return True
+
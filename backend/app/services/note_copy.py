@@ -0,0 +1,108 @@
+"""笔记和笔记本复制
+
+复制完全在数据库内以 INSERT ... SELECT 完成：ID映射、笔记、笔记内容和检索索引各一条语句，
+与笔记数量无关，也不需要把原数据加载到 Python 中。
+新笔记ID逐行随机生成并写入临时映射表（app.utils.ids.build_id_map），
+笔记、内容和索引的复制语句都与映射表连接，外键因此保持对应。
+"""
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy import case, func, insert, literal, null, select
+from sqlalchemy.orm import Session
+
+from app.models import CornellNote, NoteContent
+from app.services import notebook_stats
+from app.services import search as search_service
+from app.utils.ids import COPY_ID_MAP, build_id_map, random_uuid, read_id_map
+
+
+def copy_notes(
+    db: Session,
+    source_ids,
+    notebook_id: str,
+    owner_id: str,
+    title_suffix: str = "",
+    keep_starred: bool = True,
+) -> Dict[str, str]:
+    """复制一组笔记（含内容和检索索引）到目标笔记本
+
+    在调用方事务内执行，由调用方提交。浏览次数清零，内容版本重置为 1，
+    目标笔记本的计数按被复制笔记的汇总值一次性增加。
+
+    Args:
+        db: 数据库会话
+        source_ids: 原笔记ID子查询（select(CornellNote.id).where(...)）
+        notebook_id: 目标笔记本ID
+        owner_id: 新笔记的所有者ID
+        title_suffix: 追加到标题后的文字（非空时索引按新标题重建）
+        keep_starred: 是否保留星标
+
+    Returns:
+        Dict[str, str]: 原笔记ID → 新笔记ID
+    """
+    now = datetime.utcnow()
+    id_map = COPY_ID_MAP.c
+
+    copied, starred, words = db.execute(
+        select(
+            func.count(CornellNote.id),
+            func.coalesce(func.sum(case((CornellNote.is_starred, 1), else_=0)), 0),
+            func.coalesce(func.sum(CornellNote.word_count), 0),
+        ).where(CornellNote.id.in_(source_ids))
+    ).one()
+
+    build_id_map(db, source_ids)
+
+    db.execute(
+        insert(CornellNote).from_select(
+            [
+                "id", "title", "is_archived", "is_starred", "access_level",
+                "view_count", "word_count", "estimated_review_minutes",
+                "notebook_id", "owner_id", "last_edited_by", "created_at", "updated_at",
+            ],
+            select(
+                id_map.new_id,
+                CornellNote.title + literal(title_suffix) if title_suffix else CornellNote.title,
+                CornellNote.is_archived,
+                CornellNote.is_starred if keep_starred else literal(False),
+                CornellNote.access_level,
+                literal(0),
+                CornellNote.word_count,
+                CornellNote.estimated_review_minutes,
+                literal(notebook_id),
+                literal(owner_id),
+                literal(owner_id),
+                literal(now),
+                literal(now),
+            ).join_from(CornellNote, COPY_ID_MAP, id_map.old_id == CornellNote.id),
+        )
+    )
+
+    db.execute(
+        insert(NoteContent).from_select(
+            [
+                "id", "note_id", "cue_column", "note_column", "summary_row", "mindmap_data",
+                "version", "is_synced", "sync_error", "created_at", "updated_at",
+            ],
+            select(
+                random_uuid(db.get_bind().dialect.name),
+                id_map.new_id,
+                NoteContent.cue_column,
+                NoteContent.note_column,
+                NoteContent.summary_row,
+                NoteContent.mindmap_data,
+                literal(1),
+                literal(True),
+                null(),
+                literal(now),
+                literal(now),
+            ).join_from(NoteContent, COPY_ID_MAP, id_map.old_id == NoteContent.note_id),
+        )
+    )
+
+    notebook_stats.adjust(db, notebook_id, notes=copied, starred=starred if keep_starred else 0, words=words)
+
+    if not title_suffix:
+        search_service.copy_index(db, owner_id)
+    return read_id_map(db)
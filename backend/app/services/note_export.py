@@ -0,0 +1,260 @@
+"""笔记导出
+
+所有查询只选取需要的列，并以 yield_per 服务端游标分批读取，
+导出数据边读边写入响应流，内存占用与笔记数量无关：
+
+- NDJSON：每行一条记录，type 为 notebook / note / conversation
+- zip：每条笔记一个 HTML 文件（<笔记本>/<标题> (<ID前8位>).html，三栏以“线索/笔记/总结”标题分隔，
+  可直接用导入接口重新导入），深度探索对话写入 conversations.ndjson，
+  zip 以流式方式写出（不需要可回退的输出文件）
+
+对话按 (conversation_id, sequence) 排序读取问答对，同一对话的问答对在内存中聚合为一条记录，
+因此单次占用只与最大的一段对话有关。
+"""
+import json
+import re
+from html import escape
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import CornellNote, NoteContent, Notebook, ExploreConversation, ExploreQAPair
+
+# 服务端游标每批读取的行数
+EXPORT_BATCH_SIZE = 500
+
+# zip 输出缓冲达到该大小时产出一块
+ZIP_CHUNK_BYTES = 256 * 1024
+
+_UNSAFE_FILENAME_RE = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, default=_json_default)
+
+
+def safe_filename(name: str, max_length: int = 80) -> str:
+    """去除文件名中的非法字符"""
+    cleaned = _UNSAFE_FILENAME_RE.sub("_", name or "").strip(" .")
+    return cleaned[:max_length] or "untitled"
+
+
+def iter_notebooks(db: Session, owner_id: str, notebook_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """逐条读取笔记本"""
+    stmt = select(
+        Notebook.id,
+        Notebook.title,
+        Notebook.description,
+        Notebook.color,
+        Notebook.icon,
+        Notebook.is_archived,
+        Notebook.created_at,
+        Notebook.updated_at,
+    ).where(
+        Notebook.owner_id == owner_id,
+        Notebook.deleted_at.is_(None),
+    ).order_by(Notebook.created_at)
+    if notebook_id:
+        stmt = stmt.where(Notebook.id == notebook_id)
+
+    for row in db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)):
+        yield {"type": "notebook", **row._asdict()}
+
+
+def iter_notes(db: Session, owner_id: str, notebook_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """逐条读取笔记及其内容"""
+    stmt = select(
+        CornellNote.id,
+        CornellNote.notebook_id,
+        CornellNote.title,
+        CornellNote.is_starred,
+        CornellNote.is_archived,
+        CornellNote.access_level,
+        CornellNote.word_count,
+        CornellNote.created_at,
+        CornellNote.updated_at,
+        NoteContent.cue_column,
+        NoteContent.note_column,
+        NoteContent.summary_row,
+        NoteContent.mindmap_data,
+        NoteContent.version,
+    ).outerjoin(
+        NoteContent, NoteContent.note_id == CornellNote.id
+    ).where(
+        CornellNote.owner_id == owner_id,
+        CornellNote.deleted_at.is_(None),
+    ).order_by(CornellNote.notebook_id, CornellNote.created_at)
+    if notebook_id:
+        stmt = stmt.where(CornellNote.notebook_id == notebook_id)
+
+    for row in db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)):
+        yield {"type": "note", **row._asdict()}
+
+
+def iter_conversations(
+    db: Session, owner_id: str, notebook_id: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """逐段读取深度探索对话（问答对聚合到所属对话）"""
+    stmt = select(
+        ExploreConversation.id,
+        ExploreConversation.note_id,
+        ExploreConversation.title,
+        ExploreConversation.created_at,
+        ExploreQAPair.sequence,
+        ExploreQAPair.question,
+        ExploreQAPair.question_time,
+        ExploreQAPair.answer,
+        ExploreQAPair.answer_time,
+    ).join(
+        CornellNote, CornellNote.id == ExploreConversation.note_id
+    ).outerjoin(
+        ExploreQAPair, ExploreQAPair.conversation_id == ExploreConversation.id
+    ).where(
+        ExploreConversation.user_id == owner_id,
+        CornellNote.deleted_at.is_(None),
+    ).order_by(ExploreConversation.id, ExploreQAPair.sequence)
+    if notebook_id:
+        stmt = stmt.where(CornellNote.notebook_id == notebook_id)
+
+    current: Optional[Dict[str, Any]] = None
+    for row in db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)):
+        if current is None or current["id"] != row.id:
+            if current is not None:
+                yield current
+            current = {
+                "type": "conversation",
+                "id": row.id,
+                "note_id": row.note_id,
+                "title": row.title,
+                "created_at": row.created_at,
+                "qa_pairs": [],
+            }
+        if row.sequence is not None:
+            current["qa_pairs"].append({
+                "sequence": row.sequence,
+                "question": row.question,
+                "question_time": row.question_time,
+                "answer": row.answer,
+                "answer_time": row.answer_time,
+            })
+    if current is not None:
+        yield current
+
+
+def iter_records(
+    db: Session,
+    owner_id: str,
+    notebook_id: Optional[str] = None,
+    include_conversations: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """按笔记本、笔记、对话的顺序产出全部导出记录"""
+    yield from iter_notebooks(db, owner_id, notebook_id)
+    yield from iter_notes(db, owner_id, notebook_id)
+    if include_conversations:
+        yield from iter_conversations(db, owner_id, notebook_id)
+
+
+def export_ndjson(
+    db: Session,
+    owner_id: str,
+    notebook_id: Optional[str] = None,
+    include_conversations: bool = True,
+) -> Iterator[bytes]:
+    """以 NDJSON 格式流式导出"""
+    for record in iter_records(db, owner_id, notebook_id, include_conversations):
+        yield (_dumps(record) + "\n").encode("utf-8")
+
+
+def note_to_html(record: Dict[str, Any]) -> str:
+    """把笔记记录渲染为可重新导入的 HTML 文档"""
+    return (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+        f"<title>{escape(record['title'] or '')}</title></head><body>\n"
+        f"<h1>{escape(record['title'] or '')}</h1>\n"
+        f"<h2>线索</h2>\n{record.get('cue_column') or ''}\n"
+        f"<h2>笔记</h2>\n{record.get('note_column') or ''}\n"
+        f"<h2>总结</h2>\n{record.get('summary_row') or ''}\n"
+        "</body></html>\n"
+    )
+
+
+class _ZipOutput:
+    """只追加的输出缓冲，供 zipfile 流式写入"""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._size = 0
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._size += len(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    @property
+    def pending(self) -> int:
+        return self._size
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self._size = 0
+        return data
+
+
+def export_zip(
+    db: Session,
+    owner_id: str,
+    notebook_id: Optional[str] = None,
+    include_conversations: bool = True,
+) -> Iterator[bytes]:
+    """以 zip 格式流式导出"""
+    output = _ZipOutput()
+    archive = zipfile.ZipFile(output, mode="w", compression=zipfile.ZIP_DEFLATED)
+
+    # 笔记本 ID -> 目录名（笔记本数量远小于笔记数量）
+    notebook_dirs: Dict[str, str] = {}
+    with archive.open("notebooks.ndjson", mode="w", force_zip64=True) as entry:
+        for notebook in iter_notebooks(db, owner_id, notebook_id):
+            directory = safe_filename(notebook["title"])
+            if directory in notebook_dirs.values():
+                directory = f"{directory} ({notebook['id'][:8]})"
+            notebook_dirs[notebook["id"]] = directory
+            entry.write((_dumps(notebook) + "\n").encode("utf-8"))
+
+    for note in iter_notes(db, owner_id, notebook_id):
+        directory = notebook_dirs.get(note["notebook_id"], "unsorted")
+        name = f"{directory}/{safe_filename(note['title'])} ({note['id'][:8]}).html"
+        info = zipfile.ZipInfo(name, date_time=note["updated_at"].timetuple()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        archive.writestr(info, note_to_html(note))
+        if output.pending >= ZIP_CHUNK_BYTES:
+            yield output.take()
+
+    if include_conversations:
+        with archive.open("conversations.ndjson", mode="w", force_zip64=True) as entry:
+            for conversation in iter_conversations(db, owner_id, notebook_id):
+                entry.write((_dumps(conversation) + "\n").encode("utf-8"))
+                if output.pending >= ZIP_CHUNK_BYTES:
+                    yield output.take()
+
+    archive.close()
+    yield output.take()
@@ -0,0 +1,373 @@
+"""笔记批量导入
+
+支持两种格式，均按条目惰性解析，内存占用与文件大小无关：
+
+- NDJSON：每行一个 JSON 对象
+  {"title": ..., "notebook": ..., "cue_column": ..., "note_column": ..., "summary_row": ...}
+  也可以只提供 "content"（Markdown 或 HTML，按标题拆分三栏，见 split_sections）
+- zip：其中的 .md/.markdown/.txt/.html/.htm 文件各为一条笔记，
+  所在的顶层目录名作为笔记本名称，文件名（或第一个一级标题）作为笔记标题
+
+笔记按 batch_size 条一批写入，每批一个事务（批量 INSERT + 检索索引），
+提交后清空会话；不存在的笔记本按名称自动创建。
+"""
+import io
+import json
+import logging
+import os
+import re
+import zipfile
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import CornellNote, NoteContent, Notebook
+from app.services import notebook_stats
+from app.services import search as search_service
+from app.services.text_stats import update_note_stats
+from app.utils.text import html_to_text, markdown_to_html
+
+logger = logging.getLogger(__name__)
+
+# zip 中单个文件的大小上限（字节），超出的条目记为失败
+MAX_ENTRY_BYTES = 5 * 1024 * 1024
+
+# 错误明细最多保留的条数
+MAX_REPORTED_ERRORS = 100
+
+MARKDOWN_SUFFIXES = {".md", ".markdown", ".txt"}
+HTML_SUFFIXES = {".html", ".htm"}
+
+# 标题关键词到康奈尔栏目的映射（不区分大小写）
+SECTION_KEYWORDS = {
+    "cue_column": ("线索", "线索栏", "问题", "关键词", "cue", "cues", "questions", "keywords"),
+    "note_column": ("笔记", "笔记栏", "正文", "notes", "note"),
+    "summary_row": ("总结", "摘要", "小结", "summary"),
+}
+
+_HTML_HEADING_RE = re.compile(r"<h([1-6])[^>]*>(.*?)</h\1\s*>", re.IGNORECASE | re.DOTALL)
+_HTML_BODY_RE = re.compile(r"<body[^>]*>(.*?)(?:</body\s*>|$)", re.IGNORECASE | re.DOTALL)
+
+
+class ImportFormatError(ValueError):
+    """无法识别的导入文件"""
+
+
+@dataclass
+class ImportedNote:
+    """待导入的笔记"""
+    title: str
+    notebook: Optional[str] = None
+    cue_column: str = ""
+    note_column: str = ""
+    summary_row: str = ""
+
+
+@dataclass
+class ImportProgress:
+    """导入进度"""
+    imported: int = 0
+    failed: int = 0
+    notebooks_created: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def add_error(self, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    def as_dict(self) -> Dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "notebooks_created": self.notebooks_created,
+        }
+
+
+def _section_for(heading: str) -> Optional[str]:
+    key = heading.strip().strip(":：").strip().lower()
+    for column, keywords in SECTION_KEYWORDS.items():
+        if key in keywords:
+            return column
+    return None
+
+
+def split_sections(html: str) -> Dict[str, str]:
+    """按标题把 HTML 拆分为康奈尔三栏
+
+    标题文字为“线索/笔记/总结”（或 Cues/Notes/Summary 等）时，其后的内容归入对应栏目，
+    其他内容归入笔记栏。文档开头的一级标题作为笔记标题返回（键 "title"）。
+
+    Args:
+        html: HTML 字符串
+
+    Returns:
+        Dict[str, str]: 栏目名到 HTML 内容的映射，可能包含 "title"
+    """
+    parts: Dict[str, List[str]] = {"cue_column": [], "note_column": [], "summary_row": []}
+    result: Dict[str, str] = {}
+
+    current = "note_column"
+    position = 0
+    for match in _HTML_HEADING_RE.finditer(html):
+        parts[current].append(html[position:match.start()])
+        position = match.end()
+
+        heading_text = html_to_text(match.group(2))
+        column = _section_for(heading_text)
+        if column:
+            current = column
+        elif match.group(1) == "1" and "title" not in result and not "".join(parts[current]).strip():
+            result["title"] = heading_text
+        else:
+            parts[current].append(match.group(0))
+    parts[current].append(html[position:])
+
+    for column, chunks in parts.items():
+        result[column] = "".join(chunks).strip()
+    return result
+
+
+def build_note(title: str, body: str, is_markdown: bool, notebook: Optional[str] = None) -> ImportedNote:
+    """由文档正文构建待导入笔记"""
+    if is_markdown:
+        html = markdown_to_html(body)
+    else:
+        # 完整 HTML 文档只取 <body> 部分
+        match = _HTML_BODY_RE.search(body)
+        html = match.group(1) if match else body
+    sections = split_sections(html)
+    return ImportedNote(
+        title=(sections.get("title") or title or "未命名笔记")[:300],
+        notebook=notebook,
+        cue_column=sections["cue_column"],
+        note_column=sections["note_column"],
+        summary_row=sections["summary_row"],
+    )
+
+
+def iter_ndjson(stream: BinaryIO, progress: ImportProgress) -> Iterator[ImportedNote]:
+    """逐行解析 NDJSON，解析失败的行计入 progress 并跳过"""
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8", errors="replace")
+    try:
+        for line_number, line in enumerate(text_stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+                if not isinstance(data, dict):
+                    raise ValueError("每行必须是一个 JSON 对象")
+
+                if "content" in data:
+                    content = data.get("content") or ""
+                    is_markdown = data.get("format", "markdown") != "html"
+                    yield build_note(data.get("title") or "", content, is_markdown, data.get("notebook"))
+                else:
+                    yield ImportedNote(
+                        title=(data.get("title") or "未命名笔记")[:300],
+                        notebook=data.get("notebook"),
+                        cue_column=data.get("cue_column") or "",
+                        note_column=data.get("note_column") or "",
+                        summary_row=data.get("summary_row") or "",
+                    )
+            except (ValueError, TypeError, AttributeError) as e:
+                progress.add_error(f"第 {line_number} 行: {str(e)}")
+    finally:
+        # 不关闭底层文件，由调用方负责
+        text_stream.detach()
+
+
+def iter_zip(stream: BinaryIO, progress: ImportProgress) -> Iterator[ImportedNote]:
+    """逐个解析 zip 中的 Markdown/HTML 文件（只读取目录和当前条目）"""
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile:
+        raise ImportFormatError("无效的 zip 文件")
+
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+
+            name = info.filename
+            stem, suffix = os.path.splitext(os.path.basename(name))
+            suffix = suffix.lower()
+            if stem.startswith(".") or name.startswith("__MACOSX/"):
+                continue
+            if suffix not in MARKDOWN_SUFFIXES and suffix not in HTML_SUFFIXES:
+                continue
+            if info.file_size > MAX_ENTRY_BYTES:
+                progress.add_error(f"{name}: 文件过大")
+                continue
+
+            directories = [part for part in name.split("/")[:-1] if part]
+            notebook = directories[0] if directories else None
+            try:
+                with archive.open(info) as entry:
+                    body = entry.read().decode("utf-8-sig", errors="replace")
+                yield build_note(stem, body, suffix in MARKDOWN_SUFFIXES, notebook)
+            except (zipfile.BadZipFile, OSError, ValueError) as e:
+                progress.add_error(f"{name}: {str(e)}")
+
+
+def iter_import_file(stream: BinaryIO, filename: str, progress: ImportProgress) -> Iterator[ImportedNote]:
+    """按文件扩展名（或内容魔数）选择解析器"""
+    lowered = (filename or "").lower()
+    if lowered.endswith(".zip"):
+        if not zipfile.is_zipfile(stream):
+            raise ImportFormatError("无效的 zip 文件")
+        stream.seek(0)
+        return iter_zip(stream, progress)
+    if lowered.endswith((".ndjson", ".jsonl")):
+        return iter_ndjson(stream, progress)
+
+    head = stream.read(4)
+    stream.seek(0)
+    if head.startswith(b"PK") and zipfile.is_zipfile(stream):
+        stream.seek(0)
+        return iter_zip(stream, progress)
+    if head.lstrip()[:1] == b"{":
+        return iter_ndjson(stream, progress)
+    raise ImportFormatError("不支持的文件格式，请上传 .zip 或 .ndjson 文件")
+
+
+class NoteImporter:
+    """分批写入导入的笔记"""
+
+    def __init__(
+        self,
+        db: Session,
+        owner_id: str,
+        default_notebook_id: Optional[str] = None,
+        default_notebook_title: str = "导入的笔记",
+        batch_size: int = 200,
+        progress: Optional[ImportProgress] = None,
+    ) -> None:
+        """
+        Args:
+            db: 数据库会话（每批提交一次）
+            owner_id: 笔记所有者ID
+            default_notebook_id: 未指定笔记本的笔记导入到此笔记本
+            default_notebook_title: 未指定默认笔记本时，按此名称查找或创建
+            batch_size: 每批笔记数量
+            progress: 进度对象（与解析器共享，以便合并解析错误）
+        """
+        self.db = db
+        self.owner_id = owner_id
+        self.default_notebook_id = default_notebook_id
+        self.default_notebook_title = default_notebook_title
+        self.batch_size = batch_size
+        self.progress = progress or ImportProgress()
+
+        # 笔记本名称 -> ID（一次性加载现有笔记本，新建的随时加入）
+        self._notebooks: Dict[str, str] = {
+            title: notebook_id
+            for notebook_id, title in db.query(Notebook.id, Notebook.title).filter(
+                Notebook.owner_id == owner_id,
+                Notebook.deleted_at.is_(None)
+            ).order_by(Notebook.created_at)
+        }
+
+    def _notebook_id(self, title: Optional[str]) -> str:
+        if not title:
+            if self.default_notebook_id:
+                return self.default_notebook_id
+            title = self.default_notebook_title
+
+        title = title[:200]
+        notebook_id = self._notebooks.get(title)
+        if notebook_id is None:
+            notebook = Notebook(title=title, owner_id=self.owner_id)
+            self.db.add(notebook)
+            self.db.flush()
+            notebook_id = self._notebooks[title] = notebook.id
+            self.progress.notebooks_created += 1
+        return notebook_id
+
+    def _write_batch(self, batch: List[ImportedNote]) -> None:
+        notes = []
+        for item in batch:
+            note = CornellNote(
+                title=item.title or "未命名笔记",
+                notebook_id=self._notebook_id(item.notebook),
+                owner_id=self.owner_id,
+                last_edited_by=self.owner_id,
+            )
+            note.content = NoteContent(
+                cue_column=item.cue_column,
+                note_column=item.note_column,
+                summary_row=item.summary_row,
+            )
+            update_note_stats(note, note.content)
+            notes.append(note)
+
+        self.db.add_all(notes)
+        self.db.flush()
+        for note in notes:
+            search_service.index_note(self.db, note, note.content)
+        notebook_stats.apply_deltas(self.db, notebook_stats.collect(notebook_stats.snapshot(note) for note in notes))
+        self.db.commit()
+        # 释放已写入的对象，保持内存占用恒定
+        self.db.expunge_all()
+
+        self.progress.imported += len(notes)
+
+    def _flush_batch(self, batch: List[ImportedNote]) -> None:
+        try:
+            self._write_batch(batch)
+        except Exception as e:
+            self.db.rollback()
+            self.db.expunge_all()
+            # 回滚会撤销本批新建的笔记本
+            existing = {
+                title: notebook_id for title, notebook_id in self._notebooks.items()
+                if self.db.get(Notebook, notebook_id) is not None
+            }
+            self.progress.notebooks_created -= len(self._notebooks) - len(existing)
+            self._notebooks = existing
+            logger.error(f"导入批次写入失败: {str(e)}")
+            for item in batch:
+                self.progress.add_error(f"{item.title}: 写入失败")
+
+    def iter_batches(self, items: Iterable[ImportedNote]) -> Iterator[ImportProgress]:
+        """消费待导入笔记并分批写入，每批提交后产出一次进度
+
+        某一批写入失败时回滚该批并记为失败，继续处理后续条目。
+
+        Args:
+            items: 待导入笔记
+
+        Yields:
+            ImportProgress: 当前累计进度
+        """
+        batch: List[ImportedNote] = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                self._flush_batch(batch)
+                batch = []
+                yield self.progress
+        if batch:
+            self._flush_batch(batch)
+            yield self.progress
+
+    def run(
+        self,
+        items: Iterable[ImportedNote],
+        on_progress: Optional[Callable[[ImportProgress], None]] = None,
+    ) -> ImportProgress:
+        """导入全部笔记
+
+        Args:
+            items: 待导入笔记
+            on_progress: 每批提交后的回调
+
+        Returns:
+            ImportProgress: 导入结果
+        """
+        for progress in self.iter_batches(items):
+            if on_progress:
+                on_progress(progress)
+        return self.progress
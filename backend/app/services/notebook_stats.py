@@ -0,0 +1,194 @@
+"""笔记本统计（冗余计数）
+
+notebooks.note_count / starred_count / word_count 是笔记本内未删除笔记的数量、星标数量和总字数，
+由每条笔记写入路径在同一事务内增量维护，笔记本接口直接读取，不再执行 COUNT / GROUP BY：
+
+- 单条笔记的创建、移动、星标、删除、恢复：写入前后各取一次 snapshot()，用 apply_change() 记账
+- 内容写入（update_content_if_version）：按字数变化调用 adjust()
+- 批量操作、导入、复制：在内存或数据库中汇总后一次写入
+
+计数以 UPDATE notebooks SET x = x + :delta 原子递增，并发写入不会互相覆盖，
+也不修改笔记本的 updated_at（改为把所属用户的工作区版本号加一，见 app.services.workspace）。
+reconcile_notebook_stats() 按实际数据校正计数偏差。
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, case, func, select
+from sqlalchemy.orm import Session
+
+from app.models import CornellNote, Notebook
+from app.services.workspace import bump_stmt
+
+
+@dataclass(frozen=True)
+class NoteStats:
+    """一条笔记对所属笔记本计数的贡献"""
+    notebook_id: str
+    starred: bool
+    word_count: int
+
+
+@dataclass
+class NotebookDelta:
+    """笔记本计数的变化量"""
+    notes: int = 0
+    starred: int = 0
+    words: int = 0
+
+    def add(self, stats: NoteStats, sign: int = 1) -> None:
+        self.notes += sign
+        self.starred += sign if stats.starred else 0
+        self.words += sign * stats.word_count
+
+    def __bool__(self) -> bool:
+        return bool(self.notes or self.starred or self.words)
+
+
+def snapshot(note: CornellNote) -> Optional[NoteStats]:
+    """取笔记当前对计数的贡献，已删除的笔记不计入"""
+    if note.deleted_at is not None:
+        return None
+    return NoteStats(note.notebook_id, bool(note.is_starred), note.word_count or 0)
+
+
+def _increment_stmt():
+    table = Notebook.__table__
+    return (
+        table.update()
+        .where(table.c.id == bindparam("b_id"))
+        .values(
+            note_count=table.c.note_count + bindparam("b_notes"),
+            starred_count=table.c.starred_count + bindparam("b_starred"),
+            word_count=table.c.word_count + bindparam("b_words"),
+            updated_at=table.c.updated_at,
+        )
+    )
+
+
+def _bump_owners(db: Session, notebook_ids: List[str]) -> None:
+    db.execute(bump_stmt(select(Notebook.owner_id).where(Notebook.id.in_(notebook_ids))))
+
+
+def apply_deltas(db: Session, deltas: Dict[str, NotebookDelta]) -> None:
+    """把一组笔记本的计数变化写入数据库（一条 executemany UPDATE，再更新所属用户的工作区版本号）
+
+    Args:
+        db: 数据库会话
+        deltas: 笔记本ID到变化量的映射
+    """
+    params = [
+        {"b_id": notebook_id, "b_notes": delta.notes, "b_starred": delta.starred, "b_words": delta.words}
+        for notebook_id, delta in deltas.items()
+        if notebook_id and delta
+    ]
+    if params:
+        db.execute(_increment_stmt(), params)
+        _bump_owners(db, [param["b_id"] for param in params])
+
+
+def adjust(db: Session, notebook_id: str, notes: int = 0, starred: int = 0, words: int = 0) -> None:
+    """调整一个笔记本的计数"""
+    apply_deltas(db, {notebook_id: NotebookDelta(notes, starred, words)})
+
+
+def apply_change(db: Session, before: Optional[NoteStats], after: Optional[NoteStats]) -> None:
+    """按一条笔记写入前后的贡献调整计数
+
+    Args:
+        db: 数据库会话
+        before: 写入前的贡献（新建笔记为 None）
+        after: 写入后的贡献（删除笔记为 None）
+    """
+    if before == after:
+        return
+
+    deltas: Dict[str, NotebookDelta] = {}
+    if before is not None:
+        deltas.setdefault(before.notebook_id, NotebookDelta()).add(before, -1)
+    if after is not None:
+        deltas.setdefault(after.notebook_id, NotebookDelta()).add(after)
+    apply_deltas(db, deltas)
+
+
+def collect(items: Iterable[NoteStats], sign: int = 1) -> Dict[str, NotebookDelta]:
+    """按笔记本汇总一组笔记的贡献"""
+    deltas: Dict[str, NotebookDelta] = {}
+    for stats in items:
+        deltas.setdefault(stats.notebook_id, NotebookDelta()).add(stats, sign)
+    return deltas
+
+
+def _actual_stats(db: Session, notebook_ids: List[str]) -> Dict[str, NotebookDelta]:
+    rows = db.execute(
+        select(
+            CornellNote.notebook_id,
+            func.count(CornellNote.id),
+            func.coalesce(func.sum(case((CornellNote.is_starred, 1), else_=0)), 0),
+            func.coalesce(func.sum(CornellNote.word_count), 0),
+        )
+        .where(CornellNote.notebook_id.in_(notebook_ids), CornellNote.deleted_at.is_(None))
+        .group_by(CornellNote.notebook_id)
+    ).all()
+    return {row[0]: NotebookDelta(row[1], row[2], row[3]) for row in rows}
+
+
+def reconcile_notebook_stats(db: Session, batch_size: int = 500) -> Dict[str, int]:
+    """按实际数据校正笔记本计数
+
+    按笔记本ID键集分页，每批一次 GROUP BY 统计，只更新有偏差的笔记本，每批提交一次。
+
+    Args:
+        db: 数据库会话
+        batch_size: 每批笔记本数量
+
+    Returns:
+        Dict[str, int]: 检查和修正的笔记本数量
+    """
+    table = Notebook.__table__
+    stmt = (
+        table.update()
+        .where(table.c.id == bindparam("b_id"))
+        .values(
+            note_count=bindparam("b_notes"),
+            starred_count=bindparam("b_starred"),
+            word_count=bindparam("b_words"),
+            updated_at=table.c.updated_at,
+        )
+    )
+
+    counts = {"checked": 0, "fixed": 0}
+    last_id = ""
+    while True:
+        rows = db.execute(
+            select(Notebook.id, Notebook.note_count, Notebook.starred_count, Notebook.word_count)
+            .where(Notebook.id > last_id)
+            .order_by(Notebook.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        actual = _actual_stats(db, [row.id for row in rows])
+        params = []
+        for row in rows:
+            expected = actual.get(row.id, NotebookDelta())
+            if (row.note_count, row.starred_count, row.word_count) != (
+                expected.notes, expected.starred, expected.words
+            ):
+                params.append({
+                    "b_id": row.id,
+                    "b_notes": expected.notes,
+                    "b_starred": expected.starred,
+                    "b_words": expected.words,
+                })
+
+        if params:
+            db.execute(stmt, params)
+            _bump_owners(db, [param["b_id"] for param in params])
+        db.commit()
+        counts["checked"] += len(rows)
+        counts["fixed"] += len(params)
+        last_id = rows[-1].id
+
+    return counts
@@ -0,0 +1,356 @@
+"""笔记内容修订历史
+
+每次内容写入时记录一条修订（见 app.models.note_revision）：
+
+- 差异按栏目计算公共前缀和公共后缀，只保存中间被替换的片段，
+  自动保存这类局部编辑的差异通常只有几十字节，计算为线性时间
+- 每 settings.revision_snapshot_interval 条差异写入一次完整快照，
+  重建任一版本的代价为 O(差异链长度)
+- payload 为 zlib 压缩的 JSON
+
+compact_note_revisions() 把超过保留期的修订按时间段稀疏化（每段只保留最后一条），
+并重新编码受影响的快照/差异链，用于清理自动保存产生的大量中间版本。
+"""
+import json
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Integer, cast, delete, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import NoteRevision
+
+# 参与修订记录的字段
+REVISION_FIELDS = ("cue_column", "note_column", "summary_row", "mindmap_data")
+TEXT_FIELDS = ("cue_column", "note_column", "summary_row")
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+# 压缩时每批从数据库读取的修订数量
+_COMPACT_BATCH_SIZE = 50
+
+
+def _encode(data: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(payload: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+def diff_text(old: str, new: str) -> List[Any]:
+    """计算文本差异：[公共前缀长度, 旧文本中被替换部分的结束位置, 替换文本]"""
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+
+    old_end, new_end = len(old), len(new)
+    while old_end > start and new_end > start and old[old_end - 1] == new[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+
+    return [start, old_end, new[start:new_end]]
+
+
+def make_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """计算两个内容版本之间的差异，未变化的栏目不记录"""
+    delta: Dict[str, Any] = {}
+    for field in TEXT_FIELDS:
+        old, new = previous.get(field) or "", current.get(field) or ""
+        if old != new:
+            delta[field] = diff_text(old, new)
+    if previous.get("mindmap_data") != current.get("mindmap_data"):
+        delta["mindmap_data"] = {"set": current.get("mindmap_data")}
+    return delta
+
+
+def apply_delta(content: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """把差异应用到内容上，返回新内容"""
+    result = dict(content)
+    for field, change in delta.items():
+        if field == "mindmap_data":
+            result[field] = change["set"]
+        else:
+            start, old_end, replacement = change
+            value = result.get(field) or ""
+            result[field] = value[:start] + replacement + value[old_end:]
+    return result
+
+
+def content_values(content) -> Dict[str, Any]:
+    """从 NoteContent（或同名属性对象）中取出修订字段"""
+    return {field: getattr(content, field) for field in REVISION_FIELDS}
+
+
+def record_revision(
+    db: Session,
+    note_id: str,
+    version: int,
+    previous: Dict[str, Any],
+    current: Dict[str, Any],
+    author_id: Optional[str] = None,
+) -> NoteRevision:
+    """记录一次内容写入
+
+    在调用方事务内执行。如果笔记还没有修订历史（或历史与上一版本不连续），
+    会先为上一版本写入快照，使本次修改之前的内容同样可以恢复。
+
+    Args:
+        db: 数据库会话
+        note_id: 笔记ID
+        version: 写入后的内容版本号
+        previous: 写入前的内容（对应 version - 1）
+        current: 写入后的内容
+        author_id: 修改人
+
+    Returns:
+        NoteRevision: 新增的修订
+    """
+    latest = (
+        db.query(NoteRevision.version, NoteRevision.chain_length)
+        .filter(NoteRevision.note_id == note_id)
+        .order_by(NoteRevision.version.desc())
+        .first()
+    )
+
+    if latest is None or latest.version != version - 1:
+        if version > 1 and (latest is None or latest.version < version - 1):
+            db.add(NoteRevision(
+                note_id=note_id,
+                version=version - 1,
+                kind=SNAPSHOT,
+                chain_length=0,
+                payload=_encode(previous),
+            ))
+            latest_chain = 0
+        else:
+            latest_chain = None
+    else:
+        latest_chain = latest.chain_length
+
+    if latest_chain is None or latest_chain + 1 >= settings.revision_snapshot_interval:
+        revision = NoteRevision(
+            note_id=note_id,
+            version=version,
+            kind=SNAPSHOT,
+            chain_length=0,
+            payload=_encode(current),
+            author_id=author_id,
+        )
+    else:
+        revision = NoteRevision(
+            note_id=note_id,
+            version=version,
+            kind=DELTA,
+            chain_length=latest_chain + 1,
+            payload=_encode(make_delta(previous, current)),
+            author_id=author_id,
+        )
+
+    db.add(revision)
+    return revision
+
+
+def list_revisions(db: Session, note_id: str, limit: int = 50, before_version: Optional[int] = None):
+    """列出修订元数据（不解压内容），按版本号降序"""
+    query = db.query(
+        NoteRevision.version,
+        NoteRevision.kind,
+        NoteRevision.author_id,
+        NoteRevision.created_at,
+    ).filter(NoteRevision.note_id == note_id)
+    if before_version is not None:
+        query = query.filter(NoteRevision.version < before_version)
+    return query.order_by(NoteRevision.version.desc()).limit(limit).all()
+
+
+def get_revision_content(db: Session, note_id: str, version: int) -> Optional[Dict[str, Any]]:
+    """重建指定版本的完整内容
+
+    读取不晚于目标版本的最近快照，再按版本顺序回放其后的差异。
+
+    Returns:
+        Optional[Dict[str, Any]]: 内容字典，版本不存在时返回 None
+    """
+    snapshot = (
+        db.query(NoteRevision.version, NoteRevision.payload)
+        .filter(
+            NoteRevision.note_id == note_id,
+            NoteRevision.version <= version,
+            NoteRevision.kind == SNAPSHOT,
+        )
+        .order_by(NoteRevision.version.desc())
+        .first()
+    )
+    if snapshot is None:
+        return None
+
+    deltas = (
+        db.query(NoteRevision.version, NoteRevision.payload)
+        .filter(
+            NoteRevision.note_id == note_id,
+            NoteRevision.version > snapshot.version,
+            NoteRevision.version <= version,
+        )
+        .order_by(NoteRevision.version)
+        .all()
+    )
+    if (deltas[-1].version if deltas else snapshot.version) != version:
+        return None
+
+    content = _decode(snapshot.payload)
+    for delta in deltas:
+        content = apply_delta(content, _decode(delta.payload))
+    return content
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _bucket(created_at: datetime, bucket_seconds: int) -> int:
+    """修订所在的压缩时间段（created_at 为 UTC 时间）"""
+    return int((created_at - _EPOCH).total_seconds()) // bucket_seconds
+
+
+def _bucket_expr(dialect: str, bucket_seconds: int):
+    """与 _bucket 一致的 SQL 表达式"""
+    if dialect == "postgresql":
+        epoch = cast(func.floor(func.extract("epoch", NoteRevision.created_at)), Integer)
+    else:
+        # SQLite：strftime('%s') 为 UTC 秒数
+        epoch = cast(func.strftime("%s", NoteRevision.created_at), Integer)
+    return epoch // bucket_seconds
+
+
+def compact_note_revisions(db: Session, note_id: str, now: Optional[datetime] = None) -> int:
+    """压缩一条笔记的修订历史
+
+    超过保留期的修订按 revision_compact_bucket_minutes 分段，每段只保留最后一条；
+    保留期内的修订全部保留。在调用方事务内执行，由调用方提交。
+
+    保留哪些版本只根据修订元数据决定。第一个被删除的版本之前的修订原样保留，
+    从它之前最近的快照开始顺序回放，只把保留下来的版本重新编码为快照/差异链：
+    内存中只有当前内容和上一个保留版本的内容，与版本数量无关。
+
+    Returns:
+        int: 删除的修订数量
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=settings.revision_retention_days)
+    bucket_seconds = settings.revision_compact_bucket_minutes * 60
+
+    meta = (
+        db.query(
+            NoteRevision.version,
+            NoteRevision.kind,
+            NoteRevision.chain_length,
+            NoteRevision.author_id,
+            NoteRevision.created_at,
+        )
+        .filter(NoteRevision.note_id == note_id)
+        .order_by(NoteRevision.version)
+        .all()
+    )
+
+    kept = set()
+    for index, row in enumerate(meta):
+        if row.created_at >= cutoff or index == len(meta) - 1:
+            kept.add(row.version)
+            continue
+        next_row = meta[index + 1]
+        same_bucket = (
+            next_row.created_at < cutoff
+            and _bucket(next_row.created_at, bucket_seconds) == _bucket(row.created_at, bucket_seconds)
+        )
+        if not same_bucket:
+            kept.add(row.version)
+
+    removed = len(meta) - len(kept)
+    if removed == 0:
+        return 0
+
+    first = next(index for index, row in enumerate(meta) if row.version not in kept)
+    rewrite_from = meta[first].version
+    if first == 0:
+        replay_from, anchor = rewrite_from, None
+    else:
+        anchor = meta[first - 1]
+        replay_from = max(row.version for row in meta[:first] if row.kind == SNAPSHOT)
+    by_version = {row.version: row for row in meta}
+
+    payloads = (
+        db.query(NoteRevision.version, NoteRevision.kind, NoteRevision.payload)
+        .filter(NoteRevision.note_id == note_id, NoteRevision.version >= replay_from)
+        .order_by(NoteRevision.version)
+        .yield_per(_COMPACT_BATCH_SIZE)
+    )
+
+    content: Dict[str, Any] = {}
+    previous: Optional[Dict[str, Any]] = None
+    chain = anchor.chain_length if anchor else 0
+    rows: List[NoteRevision] = []
+    for row in payloads:
+        data = _decode(row.payload)
+        content = data if row.kind == SNAPSHOT else apply_delta(content, data)
+        if anchor is not None and row.version == anchor.version:
+            previous = content
+        if row.version < rewrite_from or row.version not in kept:
+            continue
+
+        if previous is None or chain + 1 >= settings.revision_snapshot_interval:
+            kind, chain, payload = SNAPSHOT, 0, _encode(content)
+        else:
+            kind, chain, payload = DELTA, chain + 1, _encode(make_delta(previous, content))
+        rows.append(NoteRevision(
+            note_id=note_id,
+            version=row.version,
+            kind=kind,
+            chain_length=chain,
+            payload=payload,
+            author_id=by_version[row.version].author_id,
+            created_at=by_version[row.version].created_at,
+        ))
+        previous = content
+
+    db.execute(
+        delete(NoteRevision)
+        .where(NoteRevision.note_id == note_id, NoteRevision.version >= rewrite_from)
+        .execution_options(synchronize_session=False)
+    )
+    db.add_all(rows)
+    db.flush()
+    return removed
+
+
+def compact_revisions(db: Session, batch_size: int = 100) -> int:
+    """压缩需要压缩的笔记，每条笔记一个短事务
+
+    只选择在保留期外的同一时间段内仍有两条及以上修订的笔记：
+    已压缩过的笔记在出现新的过期修订之前不会被再次读取。
+
+    Returns:
+        int: 删除的修订总数
+    """
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=settings.revision_retention_days)
+    bucket = _bucket_expr(db.get_bind().dialect.name, settings.revision_compact_bucket_minutes * 60)
+    candidates = (
+        select(NoteRevision.note_id)
+        .where(NoteRevision.created_at < cutoff)
+        .group_by(NoteRevision.note_id, bucket)
+        .having(func.count() > 1)
+        .subquery()
+    )
+    note_ids = list(db.execute(select(candidates.c.note_id).distinct()).scalars())
+
+    removed = 0
+    for index, note_id in enumerate(note_ids, start=1):
+        removed += compact_note_revisions(db, note_id, now)
+        db.commit()
+        if index % batch_size == 0:
+            db.expunge_all()
+    return removed
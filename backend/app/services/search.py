@@ -0,0 +1,517 @@
+"""笔记全文检索服务
+
+索引覆盖笔记标题与康奈尔三栏（线索栏、笔记栏、总结栏），由 settings.search_backend 选择实现。
+
+fulltext（默认）按数据库方言使用内置全文检索：
+
+- SQLite：FTS5 虚拟表 note_search_fts，bm25 排序，snippet() 生成高亮摘要。
+  索引行以整数 rowid 为键，rowid 与笔记ID的对应关系保存在普通表 note_search_fts_ids 中，
+  更新和删除按 rowid 定位（FTS5 只能按 rowid 或 MATCH 走索引，按 UNINDEXED 列过滤是全表扫描）；
+  owner_id 为可检索列，所有者过滤写在 MATCH 表达式中
+- PostgreSQL：note_search_index 表的 tsvector 列 + GIN 索引，ts_rank 排序，ts_headline 生成摘要
+
+ngram 使用 app.services.ngram_index 的分词倒排索引，摘要在应用层生成。
+
+索引由笔记写路径（创建、更新、复制、删除）显式维护，与业务写入处于同一事务。
+中文没有空格分词，写入索引和构造查询前都会把 CJK 字符逐字切开，
+查询时连续的中文按短语匹配，从而保持与 LIKE 子串搜索一致的召回。
+"""
+import html
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import bindparam, column, insert, literal, select, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import CornellNote, NoteContent
+from app.services import ngram_index
+from app.services.tokenizer import CJK_CLASS
+from app.utils.ids import COPY_ID_MAP
+from app.utils.text import html_to_text
+
+# 高亮标记：先用私有区字符占位，HTML 转义后再替换为 <mark>，防止笔记内容注入标签
+_MARK_START = "\ue000"
+_MARK_END = "\ue001"
+
+_CJK_RE = re.compile(f"([{CJK_CLASS}])")
+# 摘要展示时去掉切分插入的空格（含高亮标记两侧）
+_CJK_GAP_RE = re.compile(f"(?<=[{CJK_CLASS}{_MARK_START}{_MARK_END}]) (?=[{CJK_CLASS}{_MARK_START}{_MARK_END}])")
+
+# 应用层摘要的上下文长度（字符数）
+_SNIPPET_BEFORE = 20
+_SNIPPET_AFTER = 60
+
+# 各栏权重：标题 > 线索栏 > 总结栏 > 笔记栏（按列顺序 note_id, title, cue, note, summary, owner_id）
+_SQLITE_BM25_WEIGHTS = "0.0, 10.0, 4.0, 1.0, 2.0, 0.0"
+# 用户输入的检索词只匹配内容列，不匹配 owner_id
+_SQLITE_CONTENT_COLUMNS = "{title cue note summary}"
+
+
+@dataclass
+class SearchHit:
+    """检索命中结果"""
+    note_id: str
+    rank: float
+    snippet: str
+
+
+def _segment(value: str) -> str:
+    """在 CJK 字符之间插入空格，使其逐字成为独立词元"""
+    return " ".join(_CJK_RE.sub(r" \1 ", value).split())
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def _use_ngram() -> bool:
+    return settings.search_backend == "ngram"
+
+
+def create_search_index(engine: Engine) -> None:
+    """创建全文检索索引结构（幂等）
+
+    Args:
+        engine: 数据库引擎
+    """
+    if _use_ngram():
+        # 倒排索引表由 Base.metadata.create_all 创建
+        return
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS note_search_fts_ids ("
+                "id INTEGER PRIMARY KEY, note_id VARCHAR NOT NULL UNIQUE)"
+            ))
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS note_search_fts USING fts5("
+                "note_id UNINDEXED, title, cue, note, summary, owner_id, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            ))
+        elif engine.dialect.name == "postgresql":
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS note_search_index ("
+                "note_id VARCHAR PRIMARY KEY REFERENCES cornell_notes(id) ON DELETE CASCADE, "
+                "owner_id VARCHAR NOT NULL, "
+                "body TEXT NOT NULL, "
+                "document TSVECTOR NOT NULL)"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_note_search_index_document "
+                "ON note_search_index USING GIN (document)"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_note_search_index_owner_id "
+                "ON note_search_index (owner_id)"
+            ))
+
+
+def is_search_supported(db: Session) -> bool:
+    """当前配置下是否支持全文检索"""
+    return _use_ngram() or _dialect(db) in ("sqlite", "postgresql")
+
+
+def index_note(db: Session, note: CornellNote, content: Optional[NoteContent] = None) -> None:
+    """写入或刷新一条笔记的索引
+
+    在调用方事务内执行，随业务提交一起生效。
+
+    Args:
+        db: 数据库会话
+        note: 笔记
+        content: 笔记内容（默认取 note.content）
+    """
+    if _use_ngram():
+        ngram_index.index_note(db, note, content)
+        return
+
+    dialect = _dialect(db)
+    if dialect not in ("sqlite", "postgresql"):
+        return
+
+    content = content if content is not None else note.content
+    title = note.title or ""
+    cue = html_to_text(content.cue_column) if content else ""
+    body = html_to_text(content.note_column) if content else ""
+    summary = html_to_text(content.summary_row) if content else ""
+
+    if dialect == "sqlite":
+        rowid = db.execute(
+            text("SELECT id FROM note_search_fts_ids WHERE note_id = :note_id"), {"note_id": note.id}
+        ).scalar()
+        if rowid is None:
+            rowid = db.execute(
+                text("INSERT INTO note_search_fts_ids (note_id) VALUES (:note_id) RETURNING id"),
+                {"note_id": note.id},
+            ).scalar()
+        else:
+            db.execute(text("DELETE FROM note_search_fts WHERE rowid = :rowid"), {"rowid": rowid})
+        db.execute(
+            text(
+                "INSERT INTO note_search_fts (rowid, note_id, title, cue, note, summary, owner_id) "
+                "VALUES (:rowid, :note_id, :title, :cue, :note, :summary, :owner_id)"
+            ),
+            {
+                "rowid": rowid,
+                "note_id": note.id,
+                "owner_id": note.owner_id,
+                "title": _segment(title),
+                "cue": _segment(cue),
+                "note": _segment(body),
+                "summary": _segment(summary),
+            },
+        )
+    else:
+        db.execute(
+            text(
+                "INSERT INTO note_search_index (note_id, owner_id, body, document) "
+                "VALUES (:note_id, :owner_id, :body, "
+                "setweight(to_tsvector('simple', :title), 'A') || "
+                "setweight(to_tsvector('simple', :cue), 'B') || "
+                "setweight(to_tsvector('simple', :summary), 'C') || "
+                "setweight(to_tsvector('simple', :note), 'D')) "
+                "ON CONFLICT (note_id) DO UPDATE SET "
+                "owner_id = EXCLUDED.owner_id, body = EXCLUDED.body, document = EXCLUDED.document"
+            ),
+            {
+                "note_id": note.id,
+                "owner_id": note.owner_id,
+                "body": _segment("\n".join(part for part in (title, cue, summary, body) if part)),
+                "title": _segment(title),
+                "cue": _segment(cue),
+                "summary": _segment(summary),
+                "note": _segment(body),
+            },
+        )
+
+
+_PG_INDEX = table("note_search_index", column("note_id"), column("owner_id"), column("body"), column("document"))
+
+
+def copy_index(db: Session, owner_id: str) -> None:
+    """在数据库内复制笔记的索引行（INSERT ... SELECT）
+
+    用于批量复制笔记：标题和内容不变时索引内容也不变，无需逐条重新分词。
+    原ID与新ID的对应关系取自临时映射表（app.utils.ids.build_id_map）。
+
+    Args:
+        db: 数据库会话
+        owner_id: 新笔记的所有者ID
+    """
+    if _use_ngram():
+        ngram_index.copy_index(db, owner_id)
+        return
+
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        # 先为新笔记分配 rowid，再按原笔记的 rowid 读取索引行
+        db.execute(text(
+            "INSERT INTO note_search_fts_ids (note_id) "
+            "SELECT m.new_id FROM copy_id_map m JOIN note_search_fts_ids s ON s.note_id = m.old_id"
+        ))
+        db.execute(
+            text(
+                "INSERT INTO note_search_fts (rowid, note_id, title, cue, note, summary, owner_id) "
+                "SELECT d.id, m.new_id, f.title, f.cue, f.note, f.summary, :owner_id "
+                "FROM copy_id_map m "
+                "JOIN note_search_fts_ids s ON s.note_id = m.old_id "
+                "JOIN note_search_fts f ON f.rowid = s.id "
+                "JOIN note_search_fts_ids d ON d.note_id = m.new_id"
+            ),
+            {"owner_id": owner_id},
+        )
+    elif dialect == "postgresql":
+        db.execute(
+            insert(_PG_INDEX).from_select(
+                ["note_id", "owner_id", "body", "document"],
+                select(
+                    COPY_ID_MAP.c.new_id,
+                    literal(owner_id),
+                    _PG_INDEX.c.body,
+                    _PG_INDEX.c.document,
+                ).join_from(_PG_INDEX, COPY_ID_MAP, COPY_ID_MAP.c.old_id == _PG_INDEX.c.note_id),
+            )
+        )
+
+
+def remove_note(db: Session, note_id: str) -> None:
+    """从索引中移除一条笔记
+
+    Args:
+        db: 数据库会话
+        note_id: 笔记ID
+    """
+    remove_notes(db, [note_id])
+
+
+def remove_notes(db: Session, note_ids: List[str]) -> None:
+    """从索引中批量移除笔记
+
+    SQLite 先经 note_search_fts_ids 查出 rowid，再按 rowid 删除索引行；
+    PostgreSQL 按主键 note_id 删除。
+
+    Args:
+        db: 数据库会话
+        note_ids: 笔记ID列表
+    """
+    if not note_ids:
+        return
+
+    if _use_ngram():
+        ngram_index.remove_notes(db, note_ids)
+        return
+
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        statements = (
+            "DELETE FROM note_search_fts WHERE rowid IN "
+            "(SELECT id FROM note_search_fts_ids WHERE note_id IN :note_ids)",
+            "DELETE FROM note_search_fts_ids WHERE note_id IN :note_ids",
+        )
+    elif dialect == "postgresql":
+        statements = ("DELETE FROM note_search_index WHERE note_id IN :note_ids",)
+    else:
+        return
+
+    for statement in statements:
+        stmt = text(statement).bindparams(bindparam("note_ids", expanding=True))
+        db.execute(stmt, {"note_ids": list(note_ids)})
+
+
+def _build_sqlite_query(owner_id: str, query: str) -> str:
+    """把用户输入转换为安全的 FTS5 查询
+
+    每个词（或连续中文）作为一个短语，短语之间为 AND，只匹配内容列；
+    所有者作为 owner_id 列上的短语一并写入 MATCH，由全文索引完成过滤。
+
+    Returns:
+        str: MATCH 表达式；没有可检索的词时返回空字符串
+    """
+    phrases = []
+    for term in query.split():
+        segmented = _segment(term).replace('"', '""')
+        if segmented:
+            phrases.append(f'"{segmented}"')
+    if not phrases:
+        return ""
+    owner = owner_id.replace('"', '""')
+    return f'owner_id : "{owner}" AND {_SQLITE_CONTENT_COLUMNS} : ({" ".join(phrases)})'
+
+
+def _build_pg_query(query: str) -> str:
+    """把用户输入转换为 websearch_to_tsquery 语法：每个词（或连续中文）作为一个短语"""
+    phrases = []
+    for term in query.split():
+        segmented = _segment(term.replace('"', " "))
+        if segmented:
+            phrases.append(f'"{segmented}"')
+    return " ".join(phrases)
+
+
+def match_subquery(db: Session, owner_id: str, query: str):
+    """返回匹配笔记ID的子查询，供列表查询以 IN 过滤使用
+
+    Args:
+        db: 数据库会话
+        owner_id: 笔记所有者ID
+        query: 搜索关键词
+
+    Returns:
+        可用于 CornellNote.id.in_() 的子查询（倒排索引需要校验短语时为笔记ID列表）；
+        不支持全文检索时返回 None
+    """
+    if _use_ngram():
+        return ngram_index.match_subquery(db, owner_id, query)
+
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        match = _build_sqlite_query(owner_id, query)
+        stmt = text(
+            "SELECT note_id FROM note_search_fts WHERE note_search_fts MATCH :match"
+        ).bindparams(match=match or '""')
+    elif dialect == "postgresql":
+        stmt = text(
+            "SELECT note_id FROM note_search_index "
+            "WHERE owner_id = :owner_id AND document @@ websearch_to_tsquery('simple', :match)"
+        ).bindparams(match=_build_pg_query(query), owner_id=owner_id)
+    else:
+        return None
+    return stmt.columns(note_id=CornellNote.id.type)
+
+
+def _render_snippet(raw: Optional[str]) -> str:
+    """转义摘要文本并把占位标记替换为 <mark>"""
+    escaped = html.escape(_CJK_GAP_RE.sub("", raw or ""))
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _python_snippet(value: str, query: str) -> str:
+    """在纯文本中定位首个命中词并截取上下文，命中词以 <mark> 包裹"""
+    terms = sorted({term.lower() for term in query.split() if term}, key=len, reverse=True)
+    # 保证与原文逐字符对齐，少数字符小写后长度会变化，此时退化为区分大小写
+    haystack = value.lower() if len(value.lower()) == len(value) else value
+
+    positions = [(haystack.find(term), term) for term in terms]
+    positions = [(pos, term) for pos, term in positions if pos >= 0]
+    if not positions:
+        return html.escape(value[:_SNIPPET_AFTER])
+
+    first = min(pos for pos, _ in positions)
+    start = max(0, first - _SNIPPET_BEFORE)
+    end = min(len(value), first + _SNIPPET_AFTER)
+
+    pattern = re.compile("|".join(re.escape(term) for term in terms))
+    window = haystack[start:end]
+    pieces = []
+    cursor = 0
+    for match in pattern.finditer(window):
+        pieces.append(html.escape(value[start + cursor:start + match.start()]))
+        pieces.append(f"<mark>{html.escape(value[start + match.start():start + match.end()])}</mark>")
+        cursor = match.end()
+    pieces.append(html.escape(value[start + cursor:end]))
+
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(value) else ""
+    return prefix + "".join(pieces) + suffix
+
+
+def _with_python_snippets(db: Session, scored, query: str) -> List[SearchHit]:
+    """为倒排索引的检索结果在应用层生成摘要"""
+    if not scored:
+        return []
+
+    note_ids = [note_id for note_id, _ in scored]
+    rows = (
+        db.query(CornellNote.id, CornellNote.title, NoteContent.cue_column, NoteContent.note_column, NoteContent.summary_row)
+        .outerjoin(NoteContent, NoteContent.note_id == CornellNote.id)
+        .filter(CornellNote.id.in_(note_ids))
+        .all()
+    )
+    texts = {
+        row[0]: " ".join(
+            " ".join(part.split()) for part in (row[1], *(html_to_text(col or "") for col in row[2:])) if part
+        )
+        for row in rows
+    }
+
+    return [
+        SearchHit(note_id=note_id, rank=score, snippet=_python_snippet(texts.get(note_id, ""), query))
+        for note_id, score in scored
+    ]
+
+
+def search_notes(
+    db: Session,
+    owner_id: str,
+    query: str,
+    limit: int,
+    offset: int = 0,
+    notebook_id: Optional[str] = None,
+) -> List[SearchHit]:
+    """按相关度检索笔记
+
+    Args:
+        db: 数据库会话
+        owner_id: 笔记所有者ID
+        query: 搜索关键词
+        limit: 返回数量
+        offset: 偏移量
+        notebook_id: 限定笔记本（可选）
+
+    Returns:
+        List[SearchHit]: 按相关度降序排列的命中结果
+    """
+    if _use_ngram():
+        scored = ngram_index.search(db, owner_id, query, limit, offset, notebook_id)
+        return _with_python_snippets(db, scored, query)
+
+    dialect = _dialect(db)
+    params = {"owner_id": owner_id, "limit": limit, "offset": offset, "notebook_id": notebook_id}
+    notebook_filter = "AND n.notebook_id = :notebook_id " if notebook_id else ""
+
+    if dialect == "sqlite":
+        match = _build_sqlite_query(owner_id, query)
+        if not match:
+            return []
+        rows = db.execute(
+            text(
+                f"SELECT f.note_id, bm25(note_search_fts, {_SQLITE_BM25_WEIGHTS}) AS score, "
+                f"snippet(note_search_fts, -1, :mark_start, :mark_end, '…', 24) AS snippet "
+                "FROM note_search_fts f JOIN cornell_notes n ON n.id = f.note_id "
+                "WHERE note_search_fts MATCH :match AND n.deleted_at IS NULL "
+                f"{notebook_filter}"
+                "ORDER BY score LIMIT :limit OFFSET :offset"
+            ),
+            {**params, "match": match, "mark_start": _MARK_START, "mark_end": _MARK_END},
+        ).all()
+        # bm25 越小越相关，取负数使 rank 越大越相关
+        return [SearchHit(note_id=row[0], rank=-row[1], snippet=_render_snippet(row[2])) for row in rows]
+
+    if dialect == "postgresql":
+        match = _build_pg_query(query)
+        if not match:
+            return []
+        rows = db.execute(
+            text(
+                "WITH hits AS ("
+                "SELECT s.note_id, s.body, ts_rank(s.document, q) AS score, q "
+                "FROM note_search_index s JOIN cornell_notes n ON n.id = s.note_id, "
+                "websearch_to_tsquery('simple', :match) q "
+                "WHERE s.owner_id = :owner_id AND s.document @@ q AND n.deleted_at IS NULL "
+                f"{notebook_filter}"
+                "ORDER BY score DESC LIMIT :limit OFFSET :offset) "
+                "SELECT note_id, score, ts_headline('simple', body, q, :options) FROM hits "
+                "ORDER BY score DESC"
+            ),
+            {
+                **params,
+                "match": match,
+                "options": f'StartSel="{_MARK_START}", StopSel="{_MARK_END}", MaxFragments=2, MaxWords=24',
+            },
+        ).all()
+        return [SearchHit(note_id=row[0], rank=float(row[1]), snippet=_render_snippet(row[2])) for row in rows]
+
+    return []
+
+
+def rebuild_search_index(db: Session, batch_size: int = 500) -> int:
+    """重建全部笔记的索引（用于历史数据回填）
+
+    Args:
+        db: 数据库会话
+        batch_size: 每批提交的笔记数量
+
+    Returns:
+        int: 写入索引的笔记数量
+    """
+    from sqlalchemy.orm import joinedload
+
+    if not is_search_supported(db):
+        return 0
+
+    query = (
+        db.query(CornellNote)
+        .options(joinedload(CornellNote.content))
+        .filter(CornellNote.deleted_at.is_(None))
+        .order_by(CornellNote.id)
+    )
+
+    count = 0
+    last_id = None
+    while True:
+        batch_query = query if last_id is None else query.filter(CornellNote.id > last_id)
+        notes = batch_query.limit(batch_size).all()
+        if not notes:
+            break
+        for note in notes:
+            index_note(db, note)
+        db.commit()
+        count += len(notes)
+        last_id = notes[-1].id
+        db.expunge_all()
+
+    return count
@@ -0,0 +1,142 @@
+"""登录会话（刷新令牌）
+
+访问令牌有效期较短（settings.access_token_expire_minutes），过期后客户端用刷新令牌
+调用 /auth/refresh 换取新的访问令牌，无需重新提交密码，也不做任何 bcrypt 计算。
+
+- 刷新令牌是 32 字节随机串，数据库只保存其 SHA-256 摘要（高熵随机串无需慢哈希）
+- 每次刷新都轮换：一条 UPDATE ... WHERE token_hash = 旧摘要 RETURNING user_id
+  同时完成校验和替换，并发提交同一个令牌时只有一个请求能更新到该行，旧令牌立即失效
+- 会话在连续 settings.refresh_token_expire_days 天未刷新后过期
+- 退出登录撤销当前会话；修改密码、禁用用户时撤销该用户的全部会话
+
+本模块的函数只执行语句，由调用方提交事务。
+"""
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import UserSession
+
+
+def new_refresh_token() -> str:
+    """生成新的刷新令牌"""
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    """刷新令牌的存储摘要"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def session_expires_at(now: Optional[datetime] = None) -> datetime:
+    """从 now 起算的会话过期时间"""
+    return (now or datetime.utcnow()) + timedelta(days=settings.refresh_token_expire_days)
+
+
+def create_session(db: Session, user_id: str, user_agent: Optional[str] = None) -> str:
+    """为用户创建登录会话
+
+    同时清理该用户已过期或已撤销的会话，会话表不会无限增长。
+
+    Args:
+        db: 数据库会话
+        user_id: 用户ID
+        user_agent: 客户端 User-Agent
+
+    Returns:
+        str: 刷新令牌明文（只在此处返回一次）
+    """
+    now = datetime.utcnow()
+    db.execute(
+        delete(UserSession)
+        .where(
+            UserSession.user_id == user_id,
+            or_(UserSession.expires_at <= now, UserSession.revoked_at.is_not(None))
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    token = new_refresh_token()
+    db.add(UserSession(
+        user_id=user_id,
+        token_hash=hash_refresh_token(token),
+        user_agent=user_agent[:255] if user_agent else None,
+        created_at=now,
+        last_used_at=now,
+        expires_at=session_expires_at(now),
+    ))
+    return token
+
+
+def rotate_session(db: Session, token: str) -> Optional[Tuple[str, str]]:
+    """校验并轮换刷新令牌（单条语句）
+
+    Args:
+        db: 数据库会话
+        token: 客户端提交的刷新令牌
+
+    Returns:
+        Optional[Tuple[str, str]]: (用户ID, 新刷新令牌)；令牌不存在、已轮换、已撤销或已过期时返回 None
+    """
+    now = datetime.utcnow()
+    new_token = new_refresh_token()
+    user_id = db.execute(
+        update(UserSession)
+        .where(
+            UserSession.token_hash == hash_refresh_token(token),
+            UserSession.revoked_at.is_(None),
+            UserSession.expires_at > now
+        )
+        .values(
+            token_hash=hash_refresh_token(new_token),
+            last_used_at=now,
+            expires_at=session_expires_at(now)
+        )
+        .returning(UserSession.user_id)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+
+    if user_id is None:
+        return None
+    return user_id, new_token
+
+
+def revoke_session(db: Session, token: str) -> bool:
+    """撤销刷新令牌对应的会话（退出登录）
+
+    Returns:
+        bool: 是否撤销了一个有效会话
+    """
+    result = db.execute(
+        update(UserSession)
+        .where(
+            UserSession.token_hash == hash_refresh_token(token),
+            UserSession.revoked_at.is_(None)
+        )
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+
+def revoke_user_sessions(db: Session, user_id: str) -> int:
+    """撤销用户的全部会话（修改密码、禁用用户）
+
+    Returns:
+        int: 撤销的会话数量
+    """
+    result = db.execute(
+        update(UserSession)
+        .where(
+            UserSession.user_id == user_id,
+            UserSession.revoked_at.is_(None)
+        )
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
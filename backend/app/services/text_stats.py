@@ -0,0 +1,189 @@
+"""笔记文本统计
+
+字数 = 中日韩字符数 + 拉丁（及其他字母文字）单词数，HTML 标签、实体和 script/style 内容不计入。
+统计在 HTMLParser 的单次流式解析中完成，不拼接纯文本字符串。
+
+复习时长按字数估算：ceil(字数 / REVIEW_UNITS_PER_MINUTE)，至少 1 分钟（空笔记为 0）。
+
+笔记内容更新时只重新统计发生变化的栏目：新字数 = 原字数 - 旧栏目字数 + 新栏目字数。
+estimated_review_minutes 为空的笔记（统计从未按此规则计算过）总是全量统计；
+历史数据用 scripts/backfill_note_stats.py 批量回填。
+"""
+import math
+import re
+from html.parser import HTMLParser
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+from app.models import CornellNote, NoteContent
+from app.services.tokenizer import CJK_CLASS
+from app.utils.text import BLOCK_TAGS, SKIP_TAGS
+
+TEXT_COLUMNS = ("cue_column", "note_column", "summary_row")
+
+# 复习速度（字/分钟）：低于一般阅读速度，留出回忆和自测时间
+REVIEW_UNITS_PER_MINUTE = 200
+
+_CJK_RE = re.compile(f"[{CJK_CLASS}]")
+# 单词：连续的非 CJK 字母/数字，允许中间带撇号（it's）
+_WORD_RE = re.compile(f"[^\\W{CJK_CLASS}]+(?:['\u2019][^\\W{CJK_CLASS}]+)*")
+
+
+class _WordCounter(HTMLParser):
+    """流式字数统计器"""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.cjk_chars = 0
+        self.words = 0
+        self._skip_depth = 0
+        # 上一段文本是否以单词字符结尾（行内标签分隔的 <b>wo</b>rd 仍算一个词）
+        self._in_word = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._in_word = False
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._in_word = False
+
+    def handle_data(self, data):
+        if self._skip_depth or not data:
+            return
+
+        self.cjk_chars += len(_CJK_RE.findall(data))
+        words = len(_WORD_RE.findall(data))
+        if words and self._in_word and _WORD_RE.match(data):
+            # 与上一段文本末尾的单词相连
+            words -= 1
+        self.words += words
+        self._in_word = bool(_WORD_RE.match(data[-1]))
+
+
+def count_words(html: Optional[str]) -> int:
+    """统计一段 HTML（或纯文本）的字数"""
+    if not html:
+        return 0
+
+    counter = _WordCounter()
+    counter.feed(html)
+    counter.close()
+    return counter.cjk_chars + counter.words
+
+
+def estimate_review_minutes(word_count: int) -> int:
+    """按字数估算复习时长（分钟）"""
+    if word_count <= 0:
+        return 0
+    return max(1, math.ceil(word_count / REVIEW_UNITS_PER_MINUTE))
+
+
+def compute_stats(columns: Dict[str, Optional[str]]) -> Tuple[int, int]:
+    """全量统计
+
+    Args:
+        columns: 栏目名到内容的映射
+
+    Returns:
+        Tuple[int, int]: (字数, 预计复习分钟数)
+    """
+    word_count = sum(count_words(columns.get(column)) for column in TEXT_COLUMNS)
+    return word_count, estimate_review_minutes(word_count)
+
+
+def update_note_stats(
+    note: CornellNote,
+    content: Optional[NoteContent],
+    previous: Optional[Dict[str, Optional[str]]] = None,
+) -> None:
+    """更新笔记的字数和预计复习时长
+
+    Args:
+        note: 笔记
+        content: 更新后的笔记内容
+        previous: 更新前的栏目内容；提供时只重新统计发生变化的栏目
+    """
+    if content is None:
+        note.word_count, note.estimated_review_minutes = 0, 0
+        return
+
+    current = {column: getattr(content, column) for column in TEXT_COLUMNS}
+    if previous is None or note.estimated_review_minutes is None:
+        note.word_count, note.estimated_review_minutes = compute_stats(current)
+        return
+
+    word_count = note.word_count
+    for column in TEXT_COLUMNS:
+        old, new = previous.get(column) or "", current[column] or ""
+        if old != new:
+            word_count += count_words(new) - count_words(old)
+
+    word_count = max(0, word_count)
+    note.word_count, note.estimated_review_minutes = word_count, estimate_review_minutes(word_count)
+
+
+def backfill_note_stats(db: Session, batch_size: int = 500, only_missing: bool = False) -> int:
+    """批量重新统计笔记字数和复习时长
+
+    按笔记ID键集分页读取（只取三栏内容），每批一次 executemany UPDATE 并提交，
+    内存占用与笔记总数无关。不修改 updated_at。
+
+    Args:
+        db: 数据库会话
+        batch_size: 每批笔记数量
+        only_missing: 只处理 estimated_review_minutes 为空的笔记
+
+    Returns:
+        int: 处理的笔记数量
+    """
+    table = CornellNote.__table__
+    stmt = (
+        table.update()
+        .where(table.c.id == bindparam("b_id"))
+        .values(
+            word_count=bindparam("b_words"),
+            estimated_review_minutes=bindparam("b_minutes"),
+            updated_at=table.c.updated_at,
+        )
+    )
+
+    processed = 0
+    last_id = ""
+    while True:
+        query = (
+            select(
+                CornellNote.id,
+                NoteContent.cue_column,
+                NoteContent.note_column,
+                NoteContent.summary_row,
+            )
+            .outerjoin(NoteContent, NoteContent.note_id == CornellNote.id)
+            .where(CornellNote.id > last_id)
+            .order_by(CornellNote.id)
+            .limit(batch_size)
+        )
+        if only_missing:
+            query = query.where(CornellNote.estimated_review_minutes.is_(None))
+
+        rows = db.execute(query).all()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            word_count, minutes = compute_stats(dict(zip(TEXT_COLUMNS, row[1:])))
+            params.append({"b_id": row.id, "b_words": word_count, "b_minutes": minutes})
+
+        db.execute(stmt, params)
+        db.commit()
+        processed += len(rows)
+        last_id = rows[-1].id
+
+    return processed
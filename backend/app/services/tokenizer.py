@@ -0,0 +1,134 @@
+"""检索分词器
+
+中文没有空格分隔，按空白切分（以及数据库默认的 FTS 分词器）会把整段中文当作一个词，
+无法做子串检索。这里提供可插拔的分词器，供倒排索引（app.services.ngram_index）使用：
+
+- cjk_bigram：中日韩文字按二元组（bigram）切分，拉丁文字按单词切分（默认）
+- whitespace：按空白和标点切分，仅作对照基线
+
+新增分词器时继承 Tokenizer 并注册到 TOKENIZERS。
+"""
+import re
+import unicodedata
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Type
+
+# 中日韩文字范围：扩展 A、基本汉字、兼容汉字、假名、韩文音节
+CJK_CLASS = r"\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af"
+
+_TOKEN_RE = re.compile(f"([{CJK_CLASS}]+)|([^\\W{CJK_CLASS}]+)")
+
+# 单个词元的最大长度，超出部分截断（与 note_search_terms.term 列长度一致）
+MAX_TERM_LENGTH = 64
+
+
+@dataclass(frozen=True)
+class QueryTerm:
+    """查询词元
+
+    prefix 为 True 时按前缀匹配（LIKE 'term%'），否则精确匹配
+    """
+    term: str
+    prefix: bool = False
+
+
+def normalize(text: str) -> str:
+    """统一全角/半角并转小写"""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+class Tokenizer(ABC):
+    """分词器基类"""
+
+    name: str = ""
+
+    @abstractmethod
+    def tokenize(self, text: str) -> List[str]:
+        """索引时分词，返回的词元可重复（用于统计词频）"""
+
+    @abstractmethod
+    def query_terms(self, text: str) -> List[QueryTerm]:
+        """查询时分词，返回去重后的查询词元，词元之间为 AND 关系"""
+
+    def query_phrases(self, text: str) -> List[str]:
+        """查询词元不能保证相邻关系时需要在原文中校验的短语（已规范化），默认没有"""
+        return []
+
+
+class CJKBigramTokenizer(Tokenizer):
+    """中日韩二元组 + 拉丁单词分词器
+
+    索引时每段连续 CJK 文字输出全部二元组，并额外输出末尾单字，
+    使每个汉字都是某个词元的首字，单字查询可以退化为词元前缀查询：
+
+        "康奈尔笔记" -> 康奈 奈尔 尔笔 笔记 记
+
+    查询时连续 CJK 文字按二元组精确匹配，单个汉字和拉丁单词按前缀匹配。
+    三个字及以上的连续 CJK 文字拆成多个二元组后只能保证各自出现，
+    由 query_phrases 返回原短语，检索时在候选笔记的原文中校验相邻关系：
+    "北京大学" 不应命中分别包含 "北京"、"京大"、"大学" 的笔记。
+    """
+
+    name = "cjk_bigram"
+
+    def tokenize(self, text: str) -> List[str]:
+        tokens: List[str] = []
+        for cjk, word in _TOKEN_RE.findall(normalize(text or "")):
+            if cjk:
+                tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+                tokens.append(cjk[-1])
+            else:
+                tokens.append(word[:MAX_TERM_LENGTH])
+        return tokens
+
+    def query_terms(self, text: str) -> List[QueryTerm]:
+        terms: Dict[QueryTerm, None] = {}
+        for cjk, word in _TOKEN_RE.findall(normalize(text or "")):
+            if cjk and len(cjk) == 1:
+                terms[QueryTerm(cjk, prefix=True)] = None
+            elif cjk:
+                for i in range(len(cjk) - 1):
+                    terms[QueryTerm(cjk[i:i + 2])] = None
+            else:
+                terms[QueryTerm(word[:MAX_TERM_LENGTH], prefix=True)] = None
+        return list(terms)
+
+    def query_phrases(self, text: str) -> List[str]:
+        return list(dict.fromkeys(cjk for cjk, _ in _TOKEN_RE.findall(normalize(text or "")) if len(cjk) > 2))
+
+
+class WhitespaceTokenizer(Tokenizer):
+    """空白/标点分词器（对照基线，不适合中文）"""
+
+    name = "whitespace"
+
+    def tokenize(self, text: str) -> List[str]:
+        return [token[:MAX_TERM_LENGTH] for token in re.findall(r"\w+", normalize(text or ""))]
+
+    def query_terms(self, text: str) -> List[QueryTerm]:
+        return list(dict.fromkeys(QueryTerm(token) for token in self.tokenize(text)))
+
+
+TOKENIZERS: Dict[str, Type[Tokenizer]] = {
+    CJKBigramTokenizer.name: CJKBigramTokenizer,
+    WhitespaceTokenizer.name: WhitespaceTokenizer,
+}
+
+
+def get_tokenizer(name: str) -> Tokenizer:
+    """按名称获取分词器实例
+
+    Args:
+        name: 分词器名称
+
+    Returns:
+        Tokenizer: 分词器实例
+
+    Raises:
+        ValueError: 分词器不存在
+    """
+    try:
+        return TOKENIZERS[name]()
+    except KeyError:
+        raise ValueError(f"未知的分词器: {name}，可选: {', '.join(TOKENIZERS)}")
@@ -0,0 +1,149 @@
+"""回收站清理
+
+delete_note / delete_notebook 只设置 deleted_at，被删除的记录进入回收站，
+可在 settings.trash_retention_days 天内恢复。purge_expired() 彻底删除超过保留期的记录：
+
+- 笔记按 deleted_at 分批（每批 settings.trash_purge_batch_size 条），每批一个短事务，
+  依次删除问答对、探索对话、修订、检索索引、笔记内容和笔记本身，
+  不依赖数据库的外键级联（SQLite 默认不启用外键约束）
+- 每条 DELETE 都带 deleted_at < 截止时间 条件，批次选出后被恢复的笔记不会被误删
+- 笔记全部清理后，再删除已过期且不再包含任何笔记的笔记本
+
+单批只锁定少量行，批次之间可以暂停（pause_seconds），不会长时间阻塞在线写入。
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import (
+    CornellNote,
+    ExploreConversation,
+    ExploreQAPair,
+    NoteContent,
+    NoteRevision,
+    Notebook,
+)
+from app.services import search as search_service
+
+
+def purge_cutoff(now: Optional[datetime] = None) -> datetime:
+    """回收站保留期截止时间，早于该时间删除的记录会被清理"""
+    return (now or datetime.utcnow()) - timedelta(days=settings.trash_retention_days)
+
+
+def purge_at(deleted_at: datetime) -> datetime:
+    """回收站中的记录预计被清理的时间"""
+    return deleted_at + timedelta(days=settings.trash_retention_days)
+
+
+def purge_notes(db: Session, note_ids: List[str], cutoff: datetime) -> int:
+    """彻底删除一批已过期的笔记及其关联数据（不提交）
+
+    Args:
+        db: 数据库会话
+        note_ids: 笔记ID列表
+        cutoff: 截止时间，只删除 deleted_at 早于该时间的笔记
+
+    Returns:
+        int: 删除的笔记数量
+    """
+    if not note_ids:
+        return 0
+
+    expired = select(CornellNote.id).where(
+        CornellNote.id.in_(note_ids),
+        CornellNote.deleted_at < cutoff,
+    )
+    conversations = select(ExploreConversation.id).where(ExploreConversation.note_id.in_(expired))
+
+    db.execute(delete(ExploreQAPair).where(ExploreQAPair.conversation_id.in_(conversations)))
+    db.execute(delete(ExploreConversation).where(ExploreConversation.note_id.in_(expired)))
+    db.execute(delete(NoteRevision).where(NoteRevision.note_id.in_(expired)))
+    db.execute(delete(NoteContent).where(NoteContent.note_id.in_(expired)))
+    result = db.execute(
+        delete(CornellNote)
+        .where(CornellNote.id.in_(note_ids), CornellNote.deleted_at < cutoff)
+        .execution_options(synchronize_session=False)
+    )
+    # 索引行在软删除时已移除，这里再清理一次，兼容旧数据
+    search_service.remove_notes(db, note_ids)
+    return result.rowcount
+
+
+def purge_expired(
+    db: Session,
+    batch_size: Optional[int] = None,
+    pause_seconds: float = 0.0,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """分批彻底删除回收站中超过保留期的笔记和笔记本
+
+    Args:
+        db: 数据库会话
+        batch_size: 每批笔记数量（默认 settings.trash_purge_batch_size）
+        pause_seconds: 每批提交后的暂停时间，给在线请求让出数据库
+        now: 当前时间（默认 utcnow）
+
+    Returns:
+        Dict[str, int]: 删除的笔记和笔记本数量
+    """
+    batch_size = batch_size or settings.trash_purge_batch_size
+    cutoff = purge_cutoff(now)
+    counts = {"notes": 0, "notebooks": 0}
+
+    # 已删除的行不会再被选中，因此每次都取最早的一批
+    while True:
+        note_ids = list(
+            db.execute(
+                select(CornellNote.id)
+                .where(CornellNote.deleted_at < cutoff)
+                .order_by(CornellNote.deleted_at)
+                .limit(batch_size)
+            ).scalars()
+        )
+        if not note_ids:
+            break
+
+        counts["notes"] += purge_notes(db, note_ids, cutoff)
+        db.commit()
+        if len(note_ids) < batch_size:
+            break
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    # 笔记本：已过期且不再包含任何笔记（包括回收站中尚未过期的笔记）
+    while True:
+        notebook_ids = list(
+            db.execute(
+                select(Notebook.id)
+                .where(
+                    Notebook.deleted_at < cutoff,
+                    ~exists().where(CornellNote.notebook_id == Notebook.id),
+                )
+                .limit(batch_size)
+            ).scalars()
+        )
+        if not notebook_ids:
+            break
+
+        result = db.execute(
+            delete(Notebook)
+            .where(
+                Notebook.id.in_(notebook_ids),
+                Notebook.deleted_at < cutoff,
+                ~exists().where(CornellNote.notebook_id == Notebook.id),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        counts["notebooks"] += result.rowcount
+        db.commit()
+        if len(notebook_ids) < batch_size:
+            break
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    return counts
@@ -0,0 +1,89 @@
+"""笔记浏览次数写回缓冲
+
+打开笔记只在进程内存中累加浏览次数，由后台任务按固定间隔（以及应用关闭时）批量写回：
+
+    UPDATE cornell_notes SET view_count = view_count + :n WHERE id = :id
+
+同一事务内把这些笔记所有者的工作区版本号加一（见 app.services.workspace）。
+读路径因此不再需要写事务和 refresh 查询。缓冲按进程独立，进程异常退出时
+最多丢失一个刷新周期内的计数，这对浏览统计是可以接受的。
+"""
+import asyncio
+import logging
+import threading
+from typing import Dict
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.engine import Engine
+
+from app.models import CornellNote
+from app.services.workspace import bump_stmt
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCountBuffer:
+    """浏览次数写回缓冲区（线程安全）"""
+
+    def __init__(self) -> None:
+        self._pending: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, note_id: str, count: int = 1) -> None:
+        """记录一次（或多次）浏览"""
+        with self._lock:
+            self._pending[note_id] = self._pending.get(note_id, 0) + count
+
+    def pending(self, note_id: str) -> int:
+        """尚未写回数据库的浏览次数"""
+        with self._lock:
+            return self._pending.get(note_id, 0)
+
+    def flush(self, engine: Engine) -> int:
+        """把缓冲的计数批量写回数据库
+
+        写回失败时计数会重新合并回缓冲区，等待下一次刷新。
+
+        Args:
+            engine: 数据库引擎
+
+        Returns:
+            int: 写回的笔记数量
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        if not pending:
+            return 0
+
+        table = CornellNote.__table__
+        # 显式保留 updated_at，浏览不应改变笔记的修改时间
+        stmt = (
+            table.update()
+            .where(table.c.id == bindparam("b_id"))
+            .values(view_count=table.c.view_count + bindparam("b_delta"), updated_at=table.c.updated_at)
+        )
+
+        try:
+            with engine.begin() as conn:
+                conn.execute(stmt, [{"b_id": note_id, "b_delta": delta} for note_id, delta in pending.items()])
+                conn.execute(bump_stmt(select(table.c.owner_id).where(table.c.id.in_(list(pending)))))
+        except Exception:
+            with self._lock:
+                for note_id, delta in pending.items():
+                    self._pending[note_id] = self._pending.get(note_id, 0) + delta
+            raise
+
+        return len(pending)
+
+    async def run_flush_loop(self, engine: Engine, interval: float) -> None:
+        """后台定时刷新，直到任务被取消"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.flush, engine)
+            except Exception as e:
+                logger.error(f"浏览次数写回失败: {str(e)}")
+
+
+view_counter = ViewCountBuffer()
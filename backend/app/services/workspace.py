@@ -0,0 +1,26 @@
+"""工作区版本号
+
+笔记和笔记本的写入都会更新各自的 updated_at，工作区 ETag 直接取其最大值（索引查找）。
+浏览次数写回和笔记本统计刻意不更新 updated_at，改为在同一事务内把所属用户的
+users.workspace_version 加一，工作区 ETag 因此无需对全部笔记做聚合。
+"""
+from sqlalchemy import Select, Update
+
+from app.models import User
+
+
+def bump_stmt(owner_ids: Select) -> Update:
+    """把一组用户的工作区版本号加一
+
+    Args:
+        owner_ids: 返回用户ID的子查询
+
+    Returns:
+        Update: UPDATE 语句（保留 updated_at）
+    """
+    table = User.__table__
+    return (
+        table.update()
+        .where(table.c.id.in_(owner_ids))
+        .values(workspace_version=table.c.workspace_version + 1, updated_at=table.c.updated_at)
+    )
@@ -0,0 +1,58 @@
+"""HTTP 实体标签（ETag）工具"""
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+
+def note_etag(note_id: str, version: Optional[int], updated_at: datetime) -> str:
+    """根据笔记ID、内容版本号和更新时间生成强 ETag
+
+    Args:
+        note_id: 笔记ID
+        version: 笔记内容版本号（无内容时为 None）
+        updated_at: 笔记更新时间
+
+    Returns:
+        str: 带双引号的 ETag，如 "3f2a..."
+    """
+    raw = f"{note_id}:{version or 0}:{updated_at.isoformat()}"
+    return f'"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def version_etag(*parts) -> str:
+    """根据一组版本信息生成强 ETag（任一部分变化 ETag 即变化）
+
+    Args:
+        parts: 版本信息（时间戳、版本号、序列化内容等），None 视为空
+
+    Returns:
+        str: 带双引号的 ETag
+    """
+    raw = ":".join("" if part is None else part.isoformat() if isinstance(part, datetime) else str(part) for part in parts)
+    return f'"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    """判断 If-None-Match / If-Match 请求头是否匹配
+
+    Args:
+        header: 请求头的值，可包含以逗号分隔的多个 ETag 或 *
+        etag: 当前资源的 ETag
+        weak: 是否使用弱比较（忽略 W/ 前缀），If-None-Match 使用弱比较，If-Match 使用强比较
+
+    Returns:
+        bool: 是否匹配
+    """
+    if not header:
+        return False
+
+    for candidate in (part.strip() for part in header.split(",")):
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -0,0 +1,71 @@
+"""主键ID工具
+
+数据库内批量复制（INSERT ... SELECT）时需要在 SQL 中为每一行生成新ID，
+并让笔记、笔记内容和检索索引的各条复制语句使用同一组新ID。
+
+做法：先用一条 INSERT ... SELECT 把 (原ID, 新ID) 写入临时映射表 copy_id_map，
+新ID由 random_uuid() 在数据库内逐行随机生成（与应用生成的 UUID v4 字符串格式相同），
+之后各条复制语句与映射表连接取得新ID。
+"""
+from typing import Dict
+
+from sqlalchemy import String, cast, column, func, insert, literal, select, table, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+# 复制用的临时映射表（每个数据库连接一份，不在 Base.metadata 中）
+COPY_ID_MAP = table("copy_id_map", column("old_id", String), column("new_id", String))
+
+
+def _random_hex(length: int) -> ColumnElement:
+    """SQLite：length 个随机十六进制字符（小写）"""
+    return func.lower(func.substr(func.hex(func.randomblob((length + 1) // 2)), 1, length))
+
+
+def random_uuid(dialect: str) -> ColumnElement:
+    """SQL 表达式：每行求值一次，生成随机 UUID v4 字符串
+
+    Args:
+        dialect: 数据库方言名称
+
+    Returns:
+        ColumnElement: 新ID表达式
+    """
+    if dialect == "postgresql":
+        return cast(func.gen_random_uuid(), String)
+
+    # SQLite：xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx，y 取 8/9/a/b
+    return (
+        _random_hex(8) + literal("-") + _random_hex(4) + literal("-4") + _random_hex(3) + literal("-")
+        + func.substr(literal("89ab"), func.random().op("&")(3) + 1, 1) + _random_hex(3) + literal("-")
+        + _random_hex(12)
+    )
+
+
+def build_id_map(db: Session, source_ids) -> None:
+    """为一组原ID逐行生成新ID，写入（清空后的）临时映射表 copy_id_map
+
+    在调用方事务内执行。映射表属于当前连接，复制语句须使用同一个会话。
+
+    Args:
+        db: 数据库会话
+        source_ids: 原ID子查询（select(Model.id).where(...)）
+    """
+    db.execute(text(
+        "CREATE TEMPORARY TABLE IF NOT EXISTS copy_id_map ("
+        "old_id VARCHAR PRIMARY KEY, new_id VARCHAR NOT NULL UNIQUE)"
+    ))
+    db.execute(text("DELETE FROM copy_id_map"))
+
+    source = source_ids.subquery()
+    db.execute(
+        insert(COPY_ID_MAP).from_select(
+            ["old_id", "new_id"],
+            select(source.c[0], random_uuid(db.get_bind().dialect.name)),
+        )
+    )
+
+
+def read_id_map(db: Session) -> Dict[str, str]:
+    """读取当前映射表（原ID → 新ID）"""
+    return dict(db.execute(select(COPY_ID_MAP.c.old_id, COPY_ID_MAP.c.new_id)).all())
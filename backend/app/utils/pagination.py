@@ -0,0 +1,81 @@
+"""游标分页工具
+
+游标（cursor）是对 (排序字段, 排序值, 记录ID) 的 base64url 编码，
+对客户端不透明，服务端据此生成 keyset 条件：
+
+    (sort_col, id) > (:value, :id)    -- 升序
+    (sort_col, id) < (:value, :id)    -- 降序
+
+配合 (owner_id, sort_col, id) 复合索引，每一页的代价与页深无关。
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Tuple
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(sort: str, value: Any, row_id: str) -> str:
+    """编码游标
+
+    Args:
+        sort: 排序参数（如 "-created_at"）
+        value: 当前页最后一条记录的排序字段值
+        row_id: 当前页最后一条记录的ID
+
+    Returns:
+        str: 不透明的游标字符串
+    """
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = json.dumps({"s": sort, "v": value, "id": row_id}, ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, str]:
+    """解码游标
+
+    Args:
+        cursor: 游标字符串
+        sort: 本次请求的排序参数，必须与生成游标时一致
+
+    Returns:
+        Tuple[Any, str]: (排序字段值, 记录ID)
+
+    Raises:
+        ValueError: 游标格式错误或与排序参数不匹配
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        value, row_id = payload["v"], payload["id"]
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("无效的分页游标") from e
+
+    if payload.get("s") != sort or not isinstance(row_id, str):
+        raise ValueError("分页游标与排序参数不匹配")
+
+    return value, row_id
+
+
+def keyset_filter(sort_column, id_column, value: Any, row_id: str, descending: bool):
+    """构建 keyset 过滤条件
+
+    使用展开的 OR/AND 形式而不是行值比较，兼容 SQLite 与 PostgreSQL。
+
+    Args:
+        sort_column: 排序列
+        id_column: 主键列（用作并列值的决胜字段）
+        value: 游标中的排序字段值
+        row_id: 游标中的记录ID
+        descending: 是否降序
+
+    Returns:
+        SQLAlchemy 过滤表达式
+    """
+    if descending:
+        return or_(sort_column < value, and_(sort_column == value, id_column < row_id))
+    return or_(sort_column > value, and_(sort_column == value, id_column > row_id))
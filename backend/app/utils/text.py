@@ -0,0 +1,160 @@
+"""文本处理工具"""
+import html
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+# 块级标签：转换为纯文本时在其前后插入换行，避免相邻段落的文字粘连
+BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+    "blockquote", "pre", "tr", "td", "th", "table", "section", "article", "hr",
+}
+
+# 内容不参与正文的标签
+SKIP_TAGS = {"script", "style"}
+
+
+class _TextExtractor(HTMLParser):
+    """HTML 纯文本提取器"""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    """将富文本 HTML 转换为纯文本
+
+    Args:
+        html: HTML 字符串（也可以是普通文本）
+
+    Returns:
+        str: 去除标签、解码实体后的纯文本
+    """
+    if not html:
+        return ""
+
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+
+    lines = (" ".join(line.split()) for line in "".join(parser.parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+_MD_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_MD_LIST_RE = re.compile(r"^\s*(?:[-*+]|(\d+)[.)])\s+(.*)$")
+_MD_INLINE_RULES = (
+    (re.compile(r"`([^`]+)`"), r"<code>\1</code>"),
+    (re.compile(r"\*\*(.+?)\*\*|__(.+?)__"), lambda m: f"<strong>{m.group(1) or m.group(2)}</strong>"),
+    (re.compile(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?!\*)"), r"<em>\1</em>"),
+    (re.compile(r"\[([^\]]+)\]\((https?://[^)\s]+)\)"), r'<a href="\2">\1</a>'),
+)
+
+
+def _markdown_inline(text: str) -> str:
+    result = html.escape(text, quote=False)
+    for pattern, replacement in _MD_INLINE_RULES:
+        result = pattern.sub(replacement, result)
+    return result
+
+
+def markdown_to_html(markdown: str) -> str:
+    """将常见 Markdown 语法转换为编辑器使用的 HTML
+
+    支持标题、段落、有序/无序列表、引用、代码块以及粗体、斜体、行内代码和链接，
+    其他语法按普通文本处理（内容会被转义）。
+
+    Args:
+        markdown: Markdown 文本
+
+    Returns:
+        str: HTML 字符串
+    """
+    blocks: List[str] = []
+    paragraph: List[str] = []
+    list_items: List[str] = []
+    list_tag = "ul"
+    code_lines: Optional[List[str]] = None
+
+    def flush_paragraph():
+        if paragraph:
+            blocks.append("<p>" + "<br>".join(_markdown_inline(line) for line in paragraph) + "</p>")
+            paragraph.clear()
+
+    def flush_list():
+        if list_items:
+            blocks.append(f"<{list_tag}>" + "".join(f"<li>{item}</li>" for item in list_items) + f"</{list_tag}>")
+            list_items.clear()
+
+    for raw_line in markdown.splitlines():
+        line = raw_line.rstrip()
+
+        if code_lines is not None:
+            if line.strip().startswith("```"):
+                blocks.append("<pre><code>" + html.escape("\n".join(code_lines), quote=False) + "</code></pre>")
+                code_lines = None
+            else:
+                code_lines.append(raw_line)
+            continue
+
+        if line.strip().startswith("```"):
+            flush_paragraph()
+            flush_list()
+            code_lines = []
+            continue
+
+        if not line.strip():
+            flush_paragraph()
+            flush_list()
+            continue
+
+        heading = _MD_HEADING_RE.match(line)
+        if heading:
+            flush_paragraph()
+            flush_list()
+            level = len(heading.group(1))
+            blocks.append(f"<h{level}>{_markdown_inline(heading.group(2))}</h{level}>")
+            continue
+
+        item = _MD_LIST_RE.match(line)
+        if item:
+            flush_paragraph()
+            tag = "ol" if item.group(1) else "ul"
+            if list_items and tag != list_tag:
+                flush_list()
+            list_tag = tag
+            list_items.append(_markdown_inline(item.group(2)))
+            continue
+
+        if line.lstrip().startswith(">"):
+            flush_paragraph()
+            flush_list()
+            blocks.append(f"<blockquote><p>{_markdown_inline(line.lstrip()[1:].strip())}</p></blockquote>")
+            continue
+
+        flush_list()
+        paragraph.append(line.strip())
+
+    if code_lines is not None:
+        blocks.append("<pre><code>" + html.escape("\n".join(code_lines), quote=False) + "</code></pre>")
+    flush_paragraph()
+    flush_list()
+    return "".join(blocks)
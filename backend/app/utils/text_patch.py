@@ -0,0 +1,41 @@
+"""文本增量编辑
+
+编辑操作的偏移量和长度以 UTF-16 码元计，与浏览器端 JavaScript 字符串下标一致，
+前端可以直接用编辑器给出的位置构造操作。
+"""
+from typing import Iterable, Protocol
+
+
+class TextEdit(Protocol):
+    """单个编辑操作：从 offset 开始删除 delete 个码元，再插入 insert"""
+    offset: int
+    delete: int
+    insert: str
+
+
+def apply_text_edits(value: str, edits: Iterable[TextEdit]) -> str:
+    """按顺序应用编辑操作，每个操作的偏移量基于上一个操作之后的文本
+
+    Args:
+        value: 原文本
+        edits: 编辑操作列表
+
+    Returns:
+        str: 编辑后的文本
+
+    Raises:
+        ValueError: 偏移量越界或切分了代理对
+    """
+    buffer = (value or "").encode("utf-16-le")
+    for edit in edits:
+        length = len(buffer) // 2
+        if edit.offset < 0 or edit.delete < 0 or edit.offset + edit.delete > length:
+            raise ValueError(f"编辑操作越界: offset={edit.offset}, delete={edit.delete}, length={length}")
+        start = edit.offset * 2
+        end = start + edit.delete * 2
+        buffer = buffer[:start] + edit.insert.encode("utf-16-le") + buffer[end:]
+
+    try:
+        return buffer.decode("utf-16-le")
+    except UnicodeDecodeError as e:
+        raise ValueError("编辑操作切分了代理对字符") from e
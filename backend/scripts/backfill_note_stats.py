@@ -0,0 +1,41 @@
+"""
+回填笔记字数和预计复习时长（按新的统计规则重新计算历史笔记）
+执行: python scripts/backfill_note_stats.py [--batch-size 500] [--only-missing]
+"""
+import argparse
+import sys
+import os
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.services.notebook_stats import reconcile_notebook_stats
+from app.services.text_stats import backfill_note_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回填笔记字数和预计复习时长")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批笔记数量")
+    parser.add_argument("--only-missing", action="store_true", help="只处理尚未统计过的笔记")
+    args = parser.parse_args()
+
+    print("[*] Backfilling note word counts and review estimates...")
+
+    db = SessionLocal()
+    try:
+        count = backfill_note_stats(db, batch_size=args.batch_size, only_missing=args.only_missing)
+        print(f"[OK] Updated {count} notes")
+        # 字数变化后同步笔记本总字数
+        counts = reconcile_notebook_stats(db)
+        print(f"[OK] Fixed word totals of {counts['fixed']} notebooks")
+    except Exception as e:
+        db.rollback()
+        print(f"[ERROR] Backfill failed: {str(e)}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+异步数据库层基准测试 - 单个 worker（单事件循环）上的并发伸缩
+对同一查询（笔记列表的 COUNT + 偏移分页）分别使用：
+- 异步会话：已迁移的 GET /notes（aiosqlite / asyncpg，等待数据库期间事件循环可处理其他请求）
+- 同步会话：基准脚本内注册的对照端点，按迁移前的方式在 async def 中直接使用同步 Session
+在不同并发数下统计吞吐量和延迟，并用探测任务测量事件循环的调度延迟（被阻塞的程度）。
+应用在进程内以 ASGI 方式调用，默认使用临时 SQLite 数据库。
+
+本地 SQLite 查询是纯 CPU 计算，单核机器上无论同步还是异步都无法并行；异步的收益来自等待网络数据库的时间。
+--db-latency-ms 为 SQLite 的每条语句模拟一次数据库往返：在执行语句的线程中等待（同步会话是事件循环线程，
+aiosqlite 是其后台线程）。也可以用 --database-url 指定真实的 PostgreSQL（需预先建好空库）。
+
+同步会话的对照端点在并发数超过连接池容量（默认 5 + 10）时会死锁：事件循环阻塞在取连接上，
+而归还连接的依赖清理需要事件循环调度，直到取连接超时（30 秒）。因此对照端点跳过这些并发级别。
+
+执行: python scripts/benchmark_async_db.py [--notes 2000] [--requests 200] [--concurrency 1,4,8,32,64] [--db-latency-ms 5]
+"""
+import argparse
+import asyncio
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = "secret123"
+LEGACY_PATH = "/benchmark/sync-notes"
+# 同步引擎默认连接池容量（pool_size 5 + max_overflow 10）
+SYNC_POOL_CAPACITY = 15
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def setup_database(notes: int) -> None:
+    """创建一个用户和指定数量的笔记"""
+    from app.core.database import SessionLocal, init_db
+    from app.core.security import get_password_hash
+    from app.models import User, Notebook, CornellNote
+
+    init_db()
+    db = SessionLocal()
+    user = User(username="bench", email="bench@example.com", password_hash=get_password_hash(PASSWORD))
+    db.add(user)
+    db.flush()
+    notebook = Notebook(title="默认笔记本", owner_id=user.id, note_count=notes)
+    db.add(notebook)
+    db.flush()
+    db.bulk_save_objects([
+        CornellNote(title=f"笔记 {index}", notebook_id=notebook.id, owner_id=user.id, word_count=index % 500)
+        for index in range(notes)
+    ])
+    db.commit()
+    db.close()
+
+
+def install_sqlite_latency(latency_ms: float) -> None:
+    """为同步和异步引擎的 SQLite 连接注入每条语句的模拟往返延迟"""
+    from sqlalchemy import event
+
+    from app.core.database import async_engine, engine
+
+    def wait(_statement):
+        time.sleep(latency_ms / 1000)
+
+    # 准备数据时创建的连接没有注入延迟，丢弃后重新建立
+    engine.dispose()
+
+    @event.listens_for(engine, "connect")
+    def on_sync_connect(dbapi_connection, _record):
+        dbapi_connection.set_trace_callback(wait)
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def on_async_connect(dbapi_connection, _record):
+        # sqlite3 连接只能在 aiosqlite 的后台线程中操作
+        dbapi_connection.run_async(
+            lambda connection: connection._execute(connection._conn.set_trace_callback, wait)
+        )
+
+
+def register_legacy_endpoint(app) -> None:
+    """注册对照端点：与迁移前的 GET /notes 相同，在 async def 中使用同步会话"""
+    from fastapi import Depends, Query
+    from sqlalchemy.orm import Session
+
+    from app.api.deps import get_current_user, get_db
+    from app.api.v1.schemas import NoteListItem
+    from app.models import CornellNote
+
+    async def legacy_notes(
+        page: int = Query(1, ge=1),
+        page_size: int = Query(20, ge=1, le=100),
+        current_user=Depends(get_current_user),
+        db: Session = Depends(get_db)
+    ):
+        query = db.query(CornellNote).filter(
+            CornellNote.owner_id == current_user.id,
+            CornellNote.deleted_at.is_(None)
+        ).order_by(CornellNote.word_count)
+        total = query.count()
+        notes = query.offset((page - 1) * page_size).limit(page_size).all()
+        return {
+            "items": [NoteListItem.model_validate(note).model_dump(mode="json") for note in notes],
+            "total": total,
+            "total_pages": math.ceil(total / page_size),
+        }
+
+    app.add_api_route(LEGACY_PATH, legacy_notes, methods=["GET"])
+
+
+async def run_level(client, path: str, headers: dict, concurrency: int, total_requests: int, page: int):
+    """以固定并发数发送请求，同时测量事件循环调度延迟（每 10ms 醒来一次，记录实际比预期晚多少）"""
+    latencies = []
+    probes = []
+    stop = asyncio.Event()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            probes.append((time.perf_counter() - start - 0.01) * 1000)
+
+    async def request():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(f"{path}?page={page}&page_size=20&sort=word_count", headers=headers)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+
+    return {
+        "rps": total_requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": percentile(latencies, 0.99),
+        "probe_p99": percentile(probes, 0.99) if probes else float("nan"),
+    }
+
+
+async def run_benchmark(args) -> None:
+    import httpx
+    from app.main import app
+
+    register_legacy_endpoint(app)
+    levels = [int(value) for value in args.concurrency.split(",")]
+    page = max(1, args.notes // 20 // 2)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/api/v1/auth/login", json={"username": "bench", "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        for label, path in (("sync Session (legacy)", LEGACY_PATH), ("AsyncSession", "/api/v1/notes")):
+            # 预热连接池和用户缓存
+            await run_level(client, path, headers, 4, 8, page)
+            print(f"\n[{label}] GET {path}")
+            print(f"  {'concurrency':>11} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'loop lag p99 ms':>16}")
+            for concurrency in levels:
+                if path == LEGACY_PATH and concurrency > SYNC_POOL_CAPACITY:
+                    print(f"  {concurrency:>11} skipped: exceeds sync pool capacity ({SYNC_POOL_CAPACITY}), deadlocks")
+                    continue
+                result = await run_level(client, path, headers, concurrency, args.requests, page)
+                print(
+                    f"  {concurrency:>11} {result['rps']:>8.1f} {result['p50']:>8.1f} "
+                    f"{result['p99']:>8.1f} {result['probe_p99']:>16.1f}"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="单 worker 上同步/异步数据库会话的并发伸缩基准测试")
+    parser.add_argument("--notes", type=int, default=2000, help="笔记数量")
+    parser.add_argument("--requests", type=int, default=200, help="每个并发级别的请求数")
+    parser.add_argument("--concurrency", default="1,4,8,32,64", help="并发级别，逗号分隔")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0, help="SQLite 每条语句的模拟往返延迟（毫秒），0 表示不模拟")
+    parser.add_argument("--database-url", help="使用指定的空数据库（同步驱动 URL），默认使用临时 SQLite")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        workdir = tempfile.mkdtemp(prefix="async-db-bench-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["PASSWORD_HASH_ROUNDS"] = "4"
+
+    print(f"[*] Creating {args.notes} notes...")
+    setup_database(args.notes)
+    if args.db_latency_ms and os.environ["DATABASE_URL"].startswith("sqlite"):
+        print(f"[*] Simulating {args.db_latency_ms} ms per statement")
+        install_sqlite_latency(args.db_latency_ms)
+
+    asyncio.run(run_benchmark(args))
+
+    print("\n[OK] Benchmark finished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+登录高峰基准测试 - 上课开始时大量学生同时登录
+在登录风暴期间持续请求 GET /notes，对比密码哈希在事件循环中直接计算（原实现）
+与在有界线程池中计算时 /notes 的延迟分布。应用在进程内以 ASGI 方式调用，使用临时 SQLite 数据库。
+
+执行: python scripts/benchmark_login_storm.py [--students 200] [--concurrency 50] [--readers 4] [--rounds 12]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = "secret123"
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def setup_database(students: int) -> None:
+    """创建学生账号（共用同一个密码哈希，避免准备阶段耗时）和一些笔记"""
+    from app.core.database import SessionLocal, init_db
+    from app.core.security import get_password_hash
+    from app.models import User, Notebook, CornellNote, NoteContent
+
+    init_db()
+    db = SessionLocal()
+    password_hash = get_password_hash(PASSWORD)
+    for index in range(students):
+        user = User(username=f"student{index:04d}", email=f"s{index}@example.com", password_hash=password_hash)
+        db.add(user)
+        db.flush()
+        notebook = Notebook(title="默认笔记本", owner_id=user.id)
+        db.add(notebook)
+        db.flush()
+        if index == 0:
+            for number in range(50):
+                note = CornellNote(title=f"笔记 {number}", notebook_id=notebook.id, owner_id=user.id)
+                note.content = NoteContent(note_column="<p>康奈尔笔记</p>")
+                db.add(note)
+    db.commit()
+    db.close()
+
+
+async def run_scenario(label: str, workers: int, args) -> None:
+    import httpx
+    from app.api.v1.endpoints import auth as auth_module
+    from app.core.security import PasswordHasher
+    from app.main import app
+
+    # 替换认证端点使用的哈希器：workers=0 即在事件循环中直接计算
+    hasher = PasswordHasher(workers, args.max_pending)
+    auth_module.password_hasher = hasher
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/api/v1/auth/login", json={"username": "student0000", "password": PASSWORD})
+        reader_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        latencies = []
+        stop = asyncio.Event()
+
+        async def reader():
+            while not stop.is_set():
+                start = time.perf_counter()
+                await client.get("/api/v1/notes?page_size=20", headers=reader_headers)
+                latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.01)
+
+        statuses = {}
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def login(index: int):
+            async with semaphore:
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    json={"username": f"student{index:04d}", "password": PASSWORD},
+                )
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        readers = [asyncio.create_task(reader()) for _ in range(args.readers)]
+        await asyncio.sleep(0.5)
+        baseline = list(latencies)
+        latencies.clear()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(login(index) for index in range(args.students)))
+        storm_seconds = time.perf_counter() - start
+        stop.set()
+        await asyncio.gather(*readers)
+
+    hasher.shutdown()
+    print(f"\n[{label}]")
+    print(f"  logins: {args.students} in {storm_seconds:.2f}s, status counts {statuses}")
+    if baseline:
+        print(f"  /notes before storm: p50 {statistics.median(baseline):.1f} ms, p99 {percentile(baseline, 0.99):.1f} ms")
+    if latencies:
+        print(
+            f"  /notes during storm: n={len(latencies)}, p50 {statistics.median(latencies):.1f} ms, "
+            f"p99 {percentile(latencies, 0.99):.1f} ms, max {max(latencies):.1f} ms"
+        )
+    else:
+        print("  /notes during storm: no request completed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="登录高峰期间 /notes 延迟基准测试")
+    parser.add_argument("--students", type=int, default=200, help="同时登录的学生数量")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发登录请求数")
+    parser.add_argument("--readers", type=int, default=4, help="持续请求 /notes 的并发数")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt 成本参数")
+    parser.add_argument("--workers", type=int, default=2, help="哈希线程数")
+    parser.add_argument("--max-pending", type=int, default=64, help="哈希任务排队上限")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="login-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["PASSWORD_HASH_ROUNDS"] = str(args.rounds)
+
+    print(f"[*] Creating {args.students} students (bcrypt rounds={args.rounds})...")
+    setup_database(args.students)
+
+    asyncio.run(run_scenario("inline hashing (blocks event loop)", 0, args))
+    asyncio.run(run_scenario(f"bounded hashing pool (workers={args.workers})", args.workers, args))
+
+    print("\n[OK] Benchmark finished")
+
+
+if __name__ == "__main__":
+    main()
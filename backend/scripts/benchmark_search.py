@@ -0,0 +1,185 @@
+"""
+笔记检索基准测试 - 合成中文语料
+对比 LIKE '%关键词%' 子串扫描（原 contains() 实现）、数据库全文检索和分词倒排索引的召回率与延迟。
+以 LIKE 扫描的结果作为召回率基准。
+
+执行: python scripts/benchmark_search.py [--notes 20000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, or_, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models import Base, User, Notebook, CornellNote, NoteContent, NoteSearchTerm
+from app.services import search as search_service
+
+# 常用汉字，用于生成合成词汇
+CHAR_POOL = (
+    "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经"
+    "十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样"
+    "与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总"
+    "次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处队南给色光门即保治北造"
+)
+
+LATIN_WORDS = ["python", "cornell", "note", "summary", "review", "sql", "index", "cache", "async", "token"]
+
+
+def build_vocabulary(rng: random.Random, size: int):
+    """生成 2-4 字的合成中文词汇"""
+    return ["".join(rng.choice(CHAR_POOL) for _ in range(rng.randint(2, 4))) for _ in range(size)]
+
+
+def build_paragraph(rng: random.Random, vocabulary, words: int) -> str:
+    """由词汇拼接段落，偶尔混入英文单词"""
+    parts = []
+    for _ in range(words):
+        if rng.random() < 0.05:
+            parts.append(f" {rng.choice(LATIN_WORDS)} ")
+        else:
+            parts.append(rng.choice(vocabulary))
+        if rng.random() < 0.1:
+            parts.append("，")
+    return "<p>" + "".join(parts) + "。</p>"
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run_like(db, owner_id: str, query: str) -> set:
+    """原实现：对标题和三栏做 LIKE 子串扫描"""
+    pattern = f"%{query}%"
+    rows = (
+        db.query(CornellNote.id)
+        .outerjoin(NoteContent, NoteContent.note_id == CornellNote.id)
+        .filter(
+            CornellNote.owner_id == owner_id,
+            or_(
+                CornellNote.title.like(pattern),
+                NoteContent.cue_column.like(pattern),
+                NoteContent.note_column.like(pattern),
+                NoteContent.summary_row.like(pattern),
+            ),
+        )
+        .all()
+    )
+    return {row[0] for row in rows}
+
+
+def run_index(db, owner_id: str, query: str) -> set:
+    """检索服务：通过 match_subquery 取匹配的笔记ID"""
+    subquery = search_service.match_subquery(db, owner_id, query)
+    rows = db.query(CornellNote.id).filter(CornellNote.id.in_(subquery)).all()
+    return {row[0] for row in rows}
+
+
+def measure(db, runner, owner_id: str, queries, truth):
+    latencies = []
+    recalls = []
+    for query in queries:
+        start = time.perf_counter()
+        result = runner(db, owner_id, query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        expected = truth[query]
+        recalls.append(len(result & expected) / len(expected) if expected else 1.0)
+    return latencies, recalls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="笔记检索基准测试")
+    parser.add_argument("--notes", type=int, default=20000, help="合成笔记数量")
+    parser.add_argument("--queries", type=int, default=200, help="查询数量")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = build_vocabulary(rng, 5000)
+
+    workdir = tempfile.mkdtemp(prefix="cornell-bench-")
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    db = Session()
+
+    print(f"[*] Generating {args.notes} synthetic notes in {workdir} ...")
+    user = User(username="bench", email="bench@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    notebook = Notebook(title="bench", owner_id=user.id)
+    db.add(notebook)
+    db.flush()
+
+    notes = []
+    for i in range(args.notes):
+        note = CornellNote(title="".join(rng.sample(vocabulary, 3)), notebook_id=notebook.id, owner_id=user.id)
+        note.content = NoteContent(
+            cue_column=build_paragraph(rng, vocabulary, 8),
+            note_column=build_paragraph(rng, vocabulary, rng.randint(80, 300)),
+            summary_row=build_paragraph(rng, vocabulary, 20),
+        )
+        notes.append(note)
+    db.add_all(notes)
+    db.commit()
+    owner_id = user.id
+
+    queries = [rng.choice(vocabulary) for _ in range(args.queries)]
+    queries += [f"{rng.choice(vocabulary)} {rng.choice(vocabulary)}" for _ in range(args.queries // 4)]
+    queries += [rng.choice(CHAR_POOL) for _ in range(args.queries // 10)]
+    queries += [rng.choice(LATIN_WORDS) for _ in range(args.queries // 10)]
+
+    # 原实现只支持单个关键词，多词查询的基准取各词 LIKE 结果的交集
+    truth = {}
+    for query in queries:
+        sets = [run_like(db, owner_id, term) for term in query.split()]
+        truth[query] = set.intersection(*sets)
+
+    results = []
+    latencies, recalls = measure(
+        db, lambda s, o, q: set.intersection(*[run_like(s, o, t) for t in q.split()]), owner_id, queries, truth
+    )
+    results.append(("LIKE scan (contains)", latencies, recalls, 0.0))
+
+    for backend, tokenizer in (("fulltext", "cjk_bigram"), ("ngram", "cjk_bigram"), ("ngram", "whitespace")):
+        settings.search_backend = backend
+        settings.search_tokenizer = tokenizer
+        db.execute(text("DROP TABLE IF EXISTS note_search_fts"))
+        db.execute(text("DROP TABLE IF EXISTS note_search_fts_ids"))
+        db.query(NoteSearchTerm).delete()
+        db.commit()
+        search_service.create_search_index(engine)
+
+        start = time.perf_counter()
+        search_service.rebuild_search_index(db)
+        build_seconds = time.perf_counter() - start
+
+        latencies, recalls = measure(db, run_index, owner_id, queries, truth)
+        label = "FTS5 (per-char phrase)" if backend == "fulltext" else f"ngram index ({tokenizer})"
+        results.append((label, latencies, recalls, build_seconds))
+
+    print()
+    print(f"{'method':<28}{'recall':>8}{'p50 ms':>10}{'p95 ms':>10}{'build s':>10}")
+    for label, latencies, recalls, build_seconds in results:
+        print(
+            f"{label:<28}{statistics.mean(recalls):>8.3f}"
+            f"{percentile(latencies, 0.5):>10.2f}{percentile(latencies, 0.95):>10.2f}{build_seconds:>10.1f}"
+        )
+
+    db.close()
+    engine.dispose()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+压缩笔记修订历史：超过保留期的修订按时间段只保留最后一条
+保留期和时间段长度见 REVISION_RETENTION_DAYS / REVISION_COMPACT_BUCKET_MINUTES
+执行: python scripts/compact_revisions.py
+"""
+import sys
+import os
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.services.revisions import compact_revisions
+
+
+def main():
+    print("[*] Compacting note revisions...")
+
+    db = SessionLocal()
+    try:
+        removed = compact_revisions(db)
+        print(f"[OK] Removed {removed} revisions")
+    except Exception as e:
+        db.rollback()
+        print(f"[ERROR] Compaction failed: {str(e)}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
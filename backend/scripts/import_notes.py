@@ -0,0 +1,63 @@
+"""
+批量导入笔记（zip 中的 Markdown/HTML 文件，或 NDJSON）
+执行: python scripts/import_notes.py <文件> --user <用户名> [--notebook <默认笔记本名称>] [--batch-size 200]
+"""
+import argparse
+import sys
+import os
+import time
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.models import User
+from app.services.note_import import ImportFormatError, ImportProgress, NoteImporter, iter_import_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量导入笔记")
+    parser.add_argument("path", help="zip 或 NDJSON 文件路径")
+    parser.add_argument("--user", required=True, help="导入到该用户名下")
+    parser.add_argument("--notebook", default="导入的笔记", help="未指定笔记本的笔记导入到此笔记本（按名称查找或创建）")
+    parser.add_argument("--batch-size", type=int, default=200, help="每批写入的笔记数量")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == args.user).first()
+        if not user:
+            print(f"[ERROR] User not found: {args.user}")
+            sys.exit(1)
+
+        progress = ImportProgress()
+        importer = NoteImporter(
+            db, user.id, default_notebook_title=args.notebook, batch_size=args.batch_size, progress=progress
+        )
+        start = time.perf_counter()
+        with open(args.path, "rb") as stream:
+            items = iter_import_file(stream, args.path, progress)
+            print(f"[*] Importing {args.path} ...")
+            for current in importer.iter_batches(items):
+                rate = current.imported / max(time.perf_counter() - start, 1e-6)
+                print(f"    imported={current.imported} failed={current.failed} ({rate:.0f} notes/s)")
+
+        for error in progress.errors:
+            print(f"[WARN] {error}")
+        print(
+            f"[OK] Imported {progress.imported} notes, {progress.failed} failed, "
+            f"{progress.notebooks_created} notebooks created"
+        )
+    except ImportFormatError as e:
+        print(f"[ERROR] {str(e)}")
+        sys.exit(1)
+    except Exception as e:
+        db.rollback()
+        print(f"[ERROR] Import failed: {str(e)}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
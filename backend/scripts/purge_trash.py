@@ -0,0 +1,38 @@
+"""
+彻底清理回收站：删除软删除超过 TRASH_RETENTION_DAYS 天的笔记（含内容、修订、探索对话）和笔记本
+每批一个短事务，可用 --pause 在批次之间暂停
+执行: python scripts/purge_trash.py [--batch-size 200] [--pause 0.1]
+"""
+import sys
+import os
+import argparse
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.services.trash import purge_expired
+
+
+def main():
+    parser = argparse.ArgumentParser(description="彻底清理回收站中超过保留期的笔记和笔记本")
+    parser.add_argument("--batch-size", type=int, default=None, help="每个事务处理的笔记数量")
+    parser.add_argument("--pause", type=float, default=0.0, help="批次之间暂停的秒数")
+    args = parser.parse_args()
+
+    print("[*] Purging expired trash...")
+
+    db = SessionLocal()
+    try:
+        counts = purge_expired(db, batch_size=args.batch_size, pause_seconds=args.pause)
+        print(f"[OK] Purged {counts['notes']} notes and {counts['notebooks']} notebooks")
+    except Exception as e:
+        db.rollback()
+        print(f"[ERROR] Purge failed: {str(e)}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+重建笔记全文检索索引（回填历史笔记）
+执行: python scripts/rebuild_search_index.py
+"""
+import sys
+import os
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal, engine
+from app.services.search import create_search_index, rebuild_search_index
+
+
+def main():
+    print("[*] Rebuilding note search index...")
+
+    db = SessionLocal()
+    try:
+        create_search_index(engine)
+        count = rebuild_search_index(db)
+        print(f"[OK] Indexed {count} notes")
+    except Exception as e:
+        print(f"[ERROR] Rebuild failed: {str(e)}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
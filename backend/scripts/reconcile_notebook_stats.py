@@ -0,0 +1,36 @@
+"""
+校正笔记本冗余计数（笔记数、星标数、总字数），只更新与实际数据不一致的笔记本
+执行: python scripts/reconcile_notebook_stats.py [--batch-size 500]
+"""
+import sys
+import os
+import argparse
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.services.notebook_stats import reconcile_notebook_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="校正笔记本笔记数、星标数和总字数")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批笔记本数量")
+    args = parser.parse_args()
+
+    print("[*] Reconciling notebook stats...")
+
+    db = SessionLocal()
+    try:
+        counts = reconcile_notebook_stats(db, batch_size=args.batch_size)
+        print(f"[OK] Checked {counts['checked']} notebooks, fixed {counts['fixed']}")
+    except Exception as e:
+        db.rollback()
+        print(f"[ERROR] Reconcile failed: {str(e)}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
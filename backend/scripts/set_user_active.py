@@ -0,0 +1,49 @@
+"""
+启用或禁用用户
+禁用时同时更换安全戳并撤销全部登录会话：已签发的访问令牌和刷新令牌失效，运行中的服务最迟在 USER_CACHE_TTL_SECONDS 秒后拒绝该用户
+执行: python scripts/set_user_active.py <用户名> --disable | --enable
+"""
+import sys
+import os
+import argparse
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.core.security import new_security_stamp
+from app.models import User
+from app.services.sessions import revoke_user_sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启用或禁用用户")
+    parser.add_argument("username", help="用户名")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--disable", action="store_true", help="禁用用户")
+    group.add_argument("--enable", action="store_true", help="启用用户")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == args.username).first()
+        if user is None:
+            print(f"[ERROR] User not found: {args.username}")
+            sys.exit(1)
+
+        user.is_active = args.enable
+        if args.disable:
+            user.security_stamp = new_security_stamp()
+            revoke_user_sessions(db, user.id)
+        db.commit()
+        print(f"[OK] User {args.username} {'enabled' if args.enable else 'disabled'}")
+    except Exception as e:
+        db.rollback()
+        print(f"[ERROR] Update failed: {str(e)}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""测试公共夹具
+
+每个测试使用独立的临时 SQLite 数据库（建表与应用启动时相同），
+并清空进程内缓存、自动保存缓冲和浏览计数缓冲。
+"""
+import asyncio
+import os
+import tempfile
+
+# 必须在导入 app 之前设置：配置和数据库引擎在导入时创建
+_workdir = tempfile.mkdtemp(prefix="cornell-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ["PASSWORD_HASH_ROUNDS"] = "4"
+os.environ["SEARCH_BACKEND"] = "fulltext"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, init_db
+from app.main import app
+from app.models import Base
+from app.services.autosave import autosave_buffer
+from app.services.cache import bootstrap_cache, note_response_cache, user_cache
+from app.services.view_counter import view_counter
+
+PASSWORD = "secret1"
+
+
+def _reset_database() -> None:
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        for (name,) in conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'note_search_fts%'"
+        )).all():
+            conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    init_db()
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    """重置数据库和进程内状态"""
+    _reset_database()
+    for cache in (note_response_cache, bootstrap_cache, user_cache):
+        cache.clear()
+    autosave_buffer._entries.clear()
+    view_counter._pending.clear()
+    yield
+
+
+@pytest.fixture
+def db():
+    """同步数据库会话"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def _app_client():
+    # 应用生命周期（后台写回任务、密码哈希线程池）在整个测试会话中只启动一次
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def client(_app_client):
+    """未登录的测试客户端"""
+    _app_client.headers.pop("Authorization", None)
+    _app_client.cookies.clear()
+    return _app_client
+
+
+def register_and_login(client: TestClient, username: str = "alice") -> dict:
+    """注册并登录用户，返回登录响应"""
+    response = client.post("/api/v1/auth/register", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": PASSWORD,
+        "invite_code": settings.invite_code,
+    })
+    assert response.status_code == 201, response.text
+    response = client.post("/api/v1/auth/login", json={"username": username, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.fixture
+def auth_client(client):
+    """已登录 alice 的测试客户端"""
+    login = register_and_login(client)
+    client.headers["Authorization"] = f"Bearer {login['access_token']}"
+    return client
+
+
+def create_note(client: TestClient, title: str = "笔记", notebook_id=None, **content) -> dict:
+    """创建笔记，content 为康奈尔三栏内容"""
+    payload = {"title": title, "content": content or {"note_column": "<p>内容</p>"}}
+    if notebook_id:
+        payload["notebook_id"] = notebook_id
+    response = client.post("/api/v1/notes", json=payload)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+class FakeRequest:
+    """只提供 receive()：disconnect 事件被设置后返回 http.disconnect"""
+
+    def __init__(self):
+        self.disconnect = asyncio.Event()
+
+    async def receive(self):
+        await self.disconnect.wait()
+        return {"type": "http.disconnect"}
+
+
+class Chunk:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeAgent:
+    """按给定的 (延迟秒数, 增量) 序列输出，记录是否被取消"""
+
+    def __init__(self, steps, error=None):
+        self.steps = steps
+        self.error = error
+        self.cancelled = False
+        self.produced = 0
+
+    def arun(self, messages, stream=False):
+        async def generate():
+            try:
+                for delay, content in self.steps:
+                    await asyncio.sleep(delay)
+                    self.produced += 1
+                    yield Chunk(content)
+                if self.error:
+                    raise self.error
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+
+        if stream:
+            return generate()
+
+        async def run():
+            result = [chunk.content async for chunk in generate()]
+            return Chunk("".join(result))
+
+        return run()
@@ -0,0 +1,35 @@
+"""健康检查与管理员运行统计"""
+from app.api.deps import invalidate_user
+from app.core.config import settings
+from app.models import User, UserType
+
+
+def test_health_only_reports_liveness(client):
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "healthy"}
+
+
+def test_runtime_stats_require_admin(client, auth_client, db):
+    assert client.get("/api/v1/admin/stats", headers={"Authorization": ""}).status_code in (401, 403)
+    assert auth_client.get("/api/v1/admin/stats").status_code == 403
+
+    user = db.query(User).filter(User.username == "alice").one()
+    user.user_type = UserType.ADMIN
+    db.commit()
+    invalidate_user(user.id)
+
+    response = auth_client.get("/api/v1/admin/stats")
+    assert response.status_code == 200
+    assert {"caches", "autosave", "password_hashing"} <= set(response.json())
+
+
+def test_admin_accounts_cannot_self_register(client):
+    response = client.post("/api/v1/auth/register", json={
+        "username": "mallory",
+        "email": "mallory@example.com",
+        "password": "secret1",
+        "invite_code": settings.invite_code,
+        "user_type": "admin",
+    })
+    assert response.status_code == 403
@@ -0,0 +1,40 @@
+"""AI 非流式调用：超时、客户端断开时取消上游调用"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints import ai
+from app.core.config import settings
+from conftest import FakeAgent, FakeRequest
+
+
+async def test_run_agent_times_out_with_504(monkeypatch):
+    monkeypatch.setattr(settings, "ai_request_timeout_seconds", 0.1)
+    agent = FakeAgent([(1.0, "慢")])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await ai._run_agent(agent, [], FakeRequest())
+    await asyncio.sleep(0.01)
+
+    assert exc_info.value.status_code == 504
+    assert agent.cancelled
+
+
+async def test_run_agent_disconnect_returns_499():
+    agent = FakeAgent([(1.0, "慢")])
+    request = FakeRequest()
+    request.disconnect.set()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await ai._run_agent(agent, [], request)
+    await asyncio.sleep(0.01)
+
+    assert exc_info.value.status_code == 499
+    assert agent.cancelled
+
+
+async def test_run_agent_returns_result():
+    agent = FakeAgent([(0.01, "线索一\n"), (0.01, "线索二")])
+    result = await ai._run_agent(agent, [], FakeRequest())
+    assert result.content == "线索一\n线索二"
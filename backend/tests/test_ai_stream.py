@@ -0,0 +1,86 @@
+"""深度探索 SSE 流：分帧、合并、心跳和客户端断开时取消上游调用"""
+import asyncio
+
+import pytest
+
+from app.api.v1.endpoints import ai
+from app.core.config import settings
+from conftest import FakeAgent, FakeRequest
+
+
+def parse_sse(raw):
+    """按 SSE 规范解析：空行分隔事件，多条 data: 行以换行拼接，: 开头为注释"""
+    events, comments = [], 0
+    for block in raw.split("\n\n"):
+        lines = [line for line in block.split("\n") if line]
+        comments += sum(line.startswith(":") for line in lines)
+        data = [line[6:] if line.startswith("data: ") else line[5:] for line in lines if line.startswith("data:")]
+        if data:
+            events.append("\n".join(data))
+    return events, comments
+
+
+async def _collect(agent, request=None):
+    frames = [frame async for frame in ai._stream_agent(agent, [], request or FakeRequest())]
+    return "".join(frames), frames
+
+
+@pytest.fixture
+def stream_settings(monkeypatch):
+    monkeypatch.setattr(settings, "ai_stream_flush_interval_seconds", 0.05)
+    monkeypatch.setattr(settings, "ai_stream_heartbeat_seconds", 0.2)
+
+
+def test_multiline_text_is_framed_as_multiple_data_lines():
+    assert ai._sse_data("a\nb") == "data: a\ndata: b\n\n"
+    assert ai._sse_data("a\r\n\r\nb") == "data: a\ndata: \ndata: b\n\n"
+    assert ai._sse_data("") == "data: \n\n"
+
+
+async def test_deltas_are_coalesced_and_newlines_round_trip(stream_settings):
+    agent = FakeAgent([(0.001, "第一行\n\n第二行")] + [(0.001, "x")] * 49)
+
+    raw, frames = await _collect(agent)
+    events, _ = parse_sse(raw)
+
+    assert events[-1] == "[DONE]"
+    assert "".join(events[:-1]) == "第一行\n\n第二行" + "x" * 49
+    # 50 个增量在刷新间隔内合并为少量帧
+    assert len(frames) < 20
+
+
+async def test_heartbeat_is_sent_while_upstream_is_silent(stream_settings):
+    agent = FakeAgent([(0.5, "答案")])
+
+    raw, _ = await _collect(agent)
+    events, comments = parse_sse(raw)
+
+    assert comments >= 2
+    assert events == ["答案", "[DONE]"]
+
+
+async def test_upstream_error_is_reported_in_stream(stream_settings):
+    agent = FakeAgent([(0.001, "部分")], error=RuntimeError("上游错误"))
+
+    raw, _ = await _collect(agent)
+    events, _ = parse_sse(raw)
+
+    assert events == ["部分", "对话异常：上游错误"]
+
+
+async def test_client_disconnect_cancels_upstream(stream_settings):
+    agent = FakeAgent([(0.01, "x")] * 1000)
+    request = FakeRequest()
+
+    async def disconnect_later():
+        await asyncio.sleep(0.1)
+        request.disconnect.set()
+
+    disconnector = asyncio.create_task(disconnect_later())
+    raw, _ = await asyncio.wait_for(_collect(agent, request), timeout=2)
+    await disconnector
+    await asyncio.sleep(0.05)
+
+    assert agent.cancelled
+    assert agent.produced < 100
+    assert "[DONE]" not in raw
@@ -0,0 +1,44 @@
+"""刷新令牌的轮换与撤销"""
+from conftest import PASSWORD, register_and_login
+
+
+def _refresh(client, token):
+    return client.post("/api/v1/auth/refresh", json={"refresh_token": token})
+
+
+def test_refresh_rotates_token_and_old_token_is_rejected(client):
+    login = register_and_login(client)
+
+    response = _refresh(client, login["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != login["refresh_token"]
+    me = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.status_code == 200
+
+    # 已轮换的旧令牌再次使用返回 401
+    assert _refresh(client, login["refresh_token"]).status_code == 401
+    assert _refresh(client, rotated["refresh_token"]).status_code == 200
+
+
+def test_unknown_token_returns_401(client):
+    register_and_login(client)
+    assert _refresh(client, "not-a-token").status_code == 401
+
+
+def test_logout_and_password_change_revoke_sessions(client):
+    first = register_and_login(client)
+    second = client.post("/api/v1/auth/login", json={"username": "alice", "password": PASSWORD}).json()
+
+    response = client.post("/api/v1/auth/logout", json={"refresh_token": second["refresh_token"]})
+    assert response.status_code == 200
+    assert _refresh(client, second["refresh_token"]).status_code == 401
+
+    response = client.put(
+        "/api/v1/auth/change-password",
+        json={"old_password": PASSWORD, "new_password": "secret2"},
+        headers={"Authorization": f"Bearer {first['access_token']}"},
+    )
+    assert response.status_code == 200
+    assert _refresh(client, first["refresh_token"]).status_code == 401
+    assert _refresh(client, response.json()["refresh_token"]).status_code == 200
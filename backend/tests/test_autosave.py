@@ -0,0 +1,124 @@
+"""自动保存合并缓冲与写回冲突"""
+from app.core.database import SessionLocal
+from app.models import CornellNote
+from app.services.autosave import autosave_buffer
+from app.services.note_content import update_content_if_version
+from conftest import create_note
+
+
+def _autosave(client, note_id, base_version, **values):
+    return client.post(f"/api/v1/notes/{note_id}/autosave", json={"base_version": base_version, **values})
+
+
+def _edit_elsewhere(note_id, note_column):
+    # 其他进程直接写库（本进程内的写入会先写回自动保存缓冲）
+    db = SessionLocal()
+    try:
+        note = db.get(CornellNote, note_id)
+        assert update_content_if_version(db, note, 1, {"note_column": note_column})
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_save_writes_buffered_edits(auth_client):
+    note_id = create_note(auth_client, note_column="a")["id"]
+
+    assert _autosave(auth_client, note_id, 1, note_column="b").status_code == 202
+    assert _autosave(auth_client, note_id, 1, cue_column="线索").status_code == 202
+
+    response = auth_client.post(f"/api/v1/notes/{note_id}/save")
+    assert response.status_code == 200, response.text
+    assert response.json() == {"note_id": note_id, "base_version": 2, "pending": False}
+
+    content = auth_client.get(f"/api/v1/notes/{note_id}").json()["content"]
+    assert (content["note_column"], content["cue_column"]) == ("b", "线索")
+
+
+def test_save_conflict_returns_unsaved_edits(auth_client):
+    note_id = create_note(auth_client, note_column="a")["id"]
+    assert _autosave(auth_client, note_id, 1, note_column="本机编辑").status_code == 202
+    _edit_elsewhere(note_id, "其他设备")
+
+    response = auth_client.post(f"/api/v1/notes/{note_id}/save")
+    assert response.status_code == 409
+    body = response.json()
+    assert body["current_version"] == 2
+    assert body["unsaved"] == {"note_column": "本机编辑"}
+    assert auth_client.get(f"/api/v1/notes/{note_id}").json()["content"]["note_column"] == "其他设备"
+
+    # 已告知客户端，之后按普通的版本冲突处理
+    response = _autosave(auth_client, note_id, 1, note_column="x")
+    assert response.status_code == 409
+    assert response.json()["unsaved"] == {}
+    assert _autosave(auth_client, note_id, 2, note_column="合并后").status_code == 202
+
+
+def test_background_flush_conflict_is_reported_on_next_submit(auth_client):
+    note_id = create_note(auth_client, note_column="a")["id"]
+    assert _autosave(auth_client, note_id, 1, note_column="本机编辑", summary_row="总结").status_code == 202
+    _edit_elsewhere(note_id, "其他设备")
+
+    assert autosave_buffer.flush(SessionLocal, force=True) == 0
+    assert autosave_buffer.stats()["rejected"] == 1
+
+    # 冲突内容不会被空条目清理移除
+    autosave_buffer.window_seconds, window = 0, autosave_buffer.window_seconds
+    try:
+        autosave_buffer.flush(SessionLocal)
+    finally:
+        autosave_buffer.window_seconds = window
+
+    response = _autosave(auth_client, note_id, 1, cue_column="新线索")
+    assert response.status_code == 409
+    body = response.json()
+    assert body["current_version"] == 2
+    assert body["unsaved"] == {"note_column": "本机编辑", "summary_row": "总结"}
+    assert autosave_buffer.stats()["rejected"] == 0
+
+
+def test_reads_include_buffered_edits(auth_client):
+    note_id = create_note(auth_client, note_column="a")["id"]
+    etag = auth_client.get(f"/api/v1/notes/{note_id}").headers["ETag"]
+    assert _autosave(auth_client, note_id, 1, note_column="b").status_code == 202
+
+    response = auth_client.get(f"/api/v1/notes/{note_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["content"]["note_column"] == "b"
+    assert response.json()["content"]["version"] == 2
+
+    assert _autosave(auth_client, note_id, 2, note_column="c").status_code == 202
+    body = auth_client.post("/api/v1/notes/batch-get", json={"ids": [note_id]}).json()
+    assert body["notes"][note_id]["content"]["note_column"] == "c"
+
+    assert _autosave(auth_client, note_id, 3, note_column="导出内容").status_code == 202
+    exported = auth_client.get("/api/v1/export", params={"format": "ndjson", "include_conversations": False})
+    assert "导出内容" in exported.content.decode("utf-8")
+
+
+def test_put_does_not_overwrite_buffered_edits(auth_client):
+    note_id = create_note(auth_client, note_column="a")["id"]
+    assert _autosave(auth_client, note_id, 1, note_column="已确认").status_code == 202
+
+    # 基于写回前版本的整体更新按版本冲突处理
+    response = auth_client.put(f"/api/v1/notes/{note_id}", json={"content": {"note_column": "覆盖"}, "version": 1})
+    assert response.status_code == 409
+    assert auth_client.get(f"/api/v1/notes/{note_id}").json()["content"]["note_column"] == "已确认"
+
+    response = auth_client.put(f"/api/v1/notes/{note_id}", json={"content": {"note_column": "合并"}, "version": 2})
+    assert response.status_code == 200, response.text
+    # 整体更新后基于新版本的自动保存不会被误判为冲突
+    assert _autosave(auth_client, note_id, 3, note_column="继续编辑").status_code == 202
+    assert auth_client.post(f"/api/v1/notes/{note_id}/save").json()["base_version"] == 4
+
+
+def test_patch_after_autosave_uses_written_version(auth_client):
+    note_id = create_note(auth_client, note_column="abc")["id"]
+    assert _autosave(auth_client, note_id, 1, note_column="abcd").status_code == 202
+
+    op = {"column": "note_column", "offset": 4, "insert": "e"}
+    response = auth_client.patch(f"/api/v1/notes/{note_id}/content", json={"base_version": 2, "ops": [op]})
+    assert response.status_code == 200, response.text
+    assert auth_client.get(f"/api/v1/notes/{note_id}").json()["content"]["note_column"] == "abcde"
+    assert _autosave(auth_client, note_id, 3, note_column="abcdef").status_code == 202
@@ -0,0 +1,102 @@
+"""工作区启动数据与 ETag"""
+from sqlalchemy import event
+
+from app.core.database import async_engine, engine
+from app.services import notebook_stats
+from app.services.view_counter import view_counter
+from conftest import create_note, register_and_login
+
+
+def _notebook(body, notebook_id):
+    return next(notebook for notebook in body["notebooks"] if notebook["id"] == notebook_id)
+
+
+def _bootstrap(client, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get("/api/v1/bootstrap", headers=headers)
+
+
+def test_bootstrap_returns_workspace_and_revalidates(auth_client):
+    notebook_id = auth_client.post("/api/v1/notebooks", json={"title": "课程"}).json()["id"]
+    note = create_note(auth_client, "牛顿定律", notebook_id=notebook_id)
+    auth_client.put(f"/api/v1/notes/{note['id']}", json={"is_starred": True})
+
+    response = _bootstrap(auth_client)
+    assert response.status_code == 200
+    body = response.json()
+    etag = response.headers["ETag"]
+    assert body["version"] == etag
+    assert body["user"]["username"] == "alice"
+    notebook = _notebook(body, notebook_id)
+    assert (notebook["note_count"], notebook["starred_count"]) == (1, 1)
+    assert [n["id"] for n in body["starred_notes"]] == [note["id"]]
+    assert [n["id"] for n in body["recent_notes"]] == [note["id"]]
+
+    assert _bootstrap(auth_client, etag).status_code == 304
+
+    create_note(auth_client, "开普勒定律")
+    response = _bootstrap(auth_client, etag)
+    assert response.status_code == 200
+    assert len(response.json()["recent_notes"]) == 2
+
+
+def test_view_count_flush_changes_etag(auth_client):
+    note_id = create_note(auth_client)["id"]
+    etag = _bootstrap(auth_client).headers["ETag"]
+
+    assert auth_client.get(f"/api/v1/notes/{note_id}").status_code == 200
+    view_counter.flush(engine)
+
+    response = _bootstrap(auth_client, etag)
+    assert response.status_code == 200
+    assert response.json()["recent_notes"][0]["view_count"] == 1
+
+
+def test_notebook_counter_change_changes_etag(auth_client, db):
+    notebook_id = auth_client.post("/api/v1/notebooks", json={"title": "课程"}).json()["id"]
+    create_note(auth_client, notebook_id=notebook_id)
+    response = _bootstrap(auth_client)
+    etag, words = response.headers["ETag"], _notebook(response.json(), notebook_id)["word_count"]
+
+    # 统计校正等只修改计数、不更新 updated_at 的写入
+    notebook_stats.adjust(db, notebook_id, words=5)
+    db.commit()
+
+    response = _bootstrap(auth_client, etag)
+    assert response.status_code == 200
+    assert _notebook(response.json(), notebook_id)["word_count"] == words + 5
+
+
+def test_revalidation_does_not_aggregate_notes(auth_client):
+    for index in range(3):
+        create_note(auth_client, f"n{index}")
+    etag = _bootstrap(auth_client).headers["ETag"]
+
+    queries = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement.lower())
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        assert _bootstrap(auth_client, etag).status_code == 304
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    assert len(queries) == 1
+    assert "sum(" not in queries[0]
+
+
+def test_view_count_flush_changes_only_owner_etag(auth_client):
+    note_id = create_note(auth_client)["id"]
+    login = register_and_login(auth_client, "bob")
+    bob = {"Authorization": f"Bearer {login['access_token']}"}
+    alice_etag = _bootstrap(auth_client).headers["ETag"]
+    bob_etag = auth_client.get("/api/v1/bootstrap", headers=bob).headers["ETag"]
+
+    assert auth_client.get(f"/api/v1/notes/{note_id}").status_code == 200
+    view_counter.flush(engine)
+
+    assert _bootstrap(auth_client, alice_etag).status_code == 200
+    response = auth_client.get("/api/v1/bootstrap", headers={**bob, "If-None-Match": bob_etag})
+    assert response.status_code == 304
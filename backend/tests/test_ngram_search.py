@@ -0,0 +1,60 @@
+"""分词器与倒排索引检索"""
+import pytest
+
+from app.core.config import settings
+from app.services.tokenizer import CJKBigramTokenizer, QueryTerm, Tokenizer, WhitespaceTokenizer
+from conftest import create_note
+
+
+@pytest.fixture
+def ngram_backend(monkeypatch):
+    monkeypatch.setattr(settings, "search_backend", "ngram")
+    monkeypatch.setattr(settings, "search_tokenizer", "cjk_bigram")
+
+
+def test_tokenizer_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        Tokenizer()
+
+    class Incomplete(Tokenizer):
+        def tokenize(self, text):
+            return []
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_cjk_bigram_tokens_and_phrases():
+    tokenizer = CJKBigramTokenizer()
+    assert tokenizer.tokenize("康奈尔笔记 Cornell") == ["康奈", "奈尔", "尔笔", "笔记", "记", "cornell"]
+    assert tokenizer.query_terms("笔 北京大学") == [
+        QueryTerm("笔", prefix=True), QueryTerm("北京"), QueryTerm("京大"), QueryTerm("大学"),
+    ]
+    # 两个字只有一个二元组，无需校验相邻关系
+    assert tokenizer.query_phrases("北京 北京大学 ＡＢ") == ["北京大学"]
+    assert WhitespaceTokenizer().query_phrases("北京大学") == []
+
+
+def _search_ids(client, q):
+    response = client.get("/api/v1/notes/search", params={"q": q})
+    assert response.status_code == 200, response.text
+    return {hit["id"] for hit in response.json()["items"]}
+
+
+def _list_ids(client, q):
+    response = client.get("/api/v1/notes", params={"search": q})
+    assert response.status_code == 200, response.text
+    return {note["id"] for note in response.json()["items"]}
+
+
+def test_multi_char_query_requires_adjacent_phrase(auth_client, ngram_backend):
+    phrase = create_note(auth_client, "北京大学简介", note_column="<p>校史</p>")
+    # 包含 北京、京大、大学 三个二元组，但不相邻
+    scattered = create_note(auth_client, "北京见闻", note_column="<p>南京大桥 与 清华大学</p>")
+    # 短语跨越 HTML 标签时按纯文本校验
+    tagged = create_note(auth_client, "笔记", note_column="<p>北京<b>大学</b></p>")
+
+    assert _search_ids(auth_client, "北京大学") == {phrase["id"], tagged["id"]}
+    assert _list_ids(auth_client, "北京大学") == {phrase["id"], tagged["id"]}
+    # 两个字的查询无需校验
+    assert _search_ids(auth_client, "北京") == {phrase["id"], scattered["id"], tagged["id"]}
@@ -0,0 +1,45 @@
+"""笔记内容写入的乐观锁（version / If-Match）"""
+from conftest import create_note
+
+
+def test_put_with_stale_version_returns_409(auth_client):
+    note_id = create_note(auth_client, note_column="a")["id"]
+
+    response = auth_client.put(f"/api/v1/notes/{note_id}", json={"content": {"note_column": "b"}, "version": 1})
+    assert response.status_code == 200
+    assert response.json()["content"]["version"] == 2
+
+    response = auth_client.put(f"/api/v1/notes/{note_id}", json={"content": {"note_column": "c"}, "version": 1})
+    assert response.status_code == 409
+    assert auth_client.get(f"/api/v1/notes/{note_id}").json()["content"]["note_column"] == "b"
+
+
+def test_put_with_if_match(auth_client):
+    note_id = create_note(auth_client, note_column="a")["id"]
+    etag = auth_client.get(f"/api/v1/notes/{note_id}").headers["ETag"]
+
+    response = auth_client.put(
+        f"/api/v1/notes/{note_id}", json={"content": {"note_column": "b"}}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    # 旧 ETag 已失效
+    response = auth_client.put(
+        f"/api/v1/notes/{note_id}", json={"content": {"note_column": "c"}}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 409
+    assert auth_client.get(f"/api/v1/notes/{note_id}").json()["content"]["note_column"] == "b"
+
+
+def test_patch_with_stale_base_version_returns_409(auth_client):
+    note_id = create_note(auth_client, note_column="hello")["id"]
+    op = {"column": "note_column", "offset": 5, "insert": "!"}
+
+    response = auth_client.patch(f"/api/v1/notes/{note_id}/content", json={"base_version": 1, "ops": [op]})
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+
+    response = auth_client.patch(f"/api/v1/notes/{note_id}/content", json={"base_version": 1, "ops": [op]})
+    assert response.status_code == 409
+    assert auth_client.get(f"/api/v1/notes/{note_id}").json()["content"]["note_column"] == "hello!"
@@ -0,0 +1,92 @@
+"""笔记和笔记本复制"""
+import pytest
+
+from app.core.config import settings
+from conftest import create_note
+
+
+def _notebook(client, title="课程"):
+    response = client.post("/api/v1/notebooks", json={"title": title})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _notes_in(client, notebook_id):
+    response = client.get("/api/v1/notes", params={"notebook_id": notebook_id, "page_size": 100})
+    assert response.status_code == 200, response.text
+    return response.json()["items"]
+
+
+def test_duplicate_notebook_copies_notes_content_and_index(auth_client):
+    notebook_id = _notebook(auth_client)
+    sources = [
+        create_note(auth_client, f"第{index}讲", notebook_id=notebook_id, note_column=f"<p>牛顿 {index}</p>")
+        for index in range(5)
+    ]
+    auth_client.put(f"/api/v1/notes/{sources[0]['id']}", json={"is_starred": True})
+    auth_client.put(f"/api/v1/notes/{sources[1]['id']}", json={"content": {"note_column": "<p>牛顿 新</p>"}})
+
+    response = auth_client.post(f"/api/v1/notebooks/{notebook_id}/duplicate")
+    assert response.status_code == 201, response.text
+    copy = response.json()
+    assert copy["title"] == "课程 - 副本"
+    assert copy["note_count"] == 5
+    assert copy["starred_count"] == 1
+
+    copies = _notes_in(auth_client, copy["id"])
+    assert sorted(note["title"] for note in copies) == sorted(note["title"] for note in sources)
+    assert not {note["id"] for note in copies} & {note["id"] for note in sources}
+
+    detail = auth_client.get(f"/api/v1/notes/{next(n['id'] for n in copies if n['title'] == '第1讲')}").json()
+    assert detail["content"]["note_column"] == "<p>牛顿 新</p>"
+    assert detail["content"]["version"] == 1
+
+    hits = auth_client.get("/api/v1/notes/search", params={"q": "牛顿", "page_size": 100}).json()["items"]
+    assert len(hits) == 10
+
+
+def test_copy_note_appends_suffix_and_indexes_new_title(auth_client):
+    notebook_id = _notebook(auth_client)
+    source = create_note(auth_client, "牛顿定律", notebook_id=notebook_id)
+
+    response = auth_client.post(f"/api/v1/notes/{source['id']}/copy")
+    assert response.status_code == 201, response.text
+    copy = response.json()
+    assert copy["title"] == "牛顿定律 - 副本"
+    assert copy["notebook_id"] == notebook_id
+    assert copy["id"] != source["id"]
+
+    hits = auth_client.get("/api/v1/notes/search", params={"q": "副本"}).json()["items"]
+    assert [hit["id"] for hit in hits] == [copy["id"]]
+
+
+@pytest.mark.parametrize("backend", ["fulltext", "ngram"])
+def test_duplicate_notebook_containing_a_copied_note(auth_client, monkeypatch, backend):
+    # 回归：新ID曾由“随机前缀 + 原ID后缀”拼成，笔记与其副本复制后ID相同，主键冲突返回 500
+    monkeypatch.setattr(settings, "search_backend", backend)
+    notebook_id = _notebook(auth_client)
+    source = create_note(auth_client, "牛顿定律", notebook_id=notebook_id, note_column="<p>惯性</p>")
+    copied = auth_client.post(f"/api/v1/notes/{source['id']}/copy").json()
+
+    response = auth_client.post(f"/api/v1/notebooks/{notebook_id}/duplicate")
+    assert response.status_code == 201, response.text
+    duplicate_id = response.json()["id"]
+
+    copies = _notes_in(auth_client, duplicate_id)
+    assert sorted(note["title"] for note in copies) == ["牛顿定律", "牛顿定律 - 副本"]
+    new_ids = {note["id"] for note in copies}
+    assert len(new_ids) == 2
+    assert not new_ids & {source["id"], copied["id"]}
+    # 新ID与原ID没有共同的后缀
+    assert not {note_id[19:] for note_id in new_ids} & {source["id"][19:], copied["id"][19:]}
+
+    for note in copies:
+        detail = auth_client.get(f"/api/v1/notes/{note['id']}").json()
+        assert detail["content"]["note_column"] == "<p>惯性</p>"
+
+    hits = auth_client.get("/api/v1/notes/search", params={"q": "惯性", "page_size": 100}).json()["items"]
+    assert len(hits) == 4
+    assert new_ids <= {hit["id"] for hit in hits}
+
+    # 再复制一次同样成功
+    assert auth_client.post(f"/api/v1/notebooks/{duplicate_id}/duplicate").status_code == 201
@@ -0,0 +1,73 @@
+"""笔记导出与重新导入"""
+import io
+import json
+import zipfile
+
+from conftest import create_note, register_and_login
+
+
+def _export(client, path="/api/v1/export", **params):
+    response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def _records(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_ndjson_export_contains_live_records(auth_client):
+    physics = auth_client.post("/api/v1/notebooks", json={"title": "物理"}).json()["id"]
+    chemistry = auth_client.post("/api/v1/notebooks", json={"title": "化学"}).json()["id"]
+    note = create_note(auth_client, "牛顿定律", notebook_id=physics, cue_column="F=ma?", note_column="<p>力</p>")
+    create_note(auth_client, "酸碱", notebook_id=chemistry)
+    deleted = create_note(auth_client, "已删除", notebook_id=physics)["id"]
+    assert auth_client.delete(f"/api/v1/notes/{deleted}").status_code == 204
+    response = auth_client.post("/api/v1/ai/conversations", json={
+        "note_id": note["id"], "qa_pairs": [{"question": "为什么?", "answer": "因为"}]
+    })
+    assert response.status_code == 201, response.text
+
+    records = _records(_export(auth_client, format="ndjson"))
+    by_type = {}
+    for record in records:
+        by_type.setdefault(record["type"], []).append(record)
+    assert {record["title"] for record in by_type["note"]} == {"牛顿定律", "酸碱"}
+    exported = next(record for record in by_type["note"] if record["id"] == note["id"])
+    assert (exported["cue_column"], exported["note_column"]) == ("F=ma?", "<p>力</p>")
+    assert [pair["question"] for pair in by_type["conversation"][0]["qa_pairs"]] == ["为什么?"]
+
+    records = _records(_export(
+        auth_client, f"/api/v1/notebooks/{physics}/export", format="ndjson", include_conversations=False
+    ))
+    assert [(record["type"], record["title"]) for record in records] == [("notebook", "物理"), ("note", "牛顿定律")]
+
+
+def test_zip_export_round_trips_through_import(auth_client):
+    notebook_id = auth_client.post("/api/v1/notebooks", json={"title": "物理/力学"}).json()["id"]
+    columns = {"cue_column": "<p>F=ma?</p>", "note_column": "<p>力等于质量乘加速度</p>", "summary_row": "<p>总结</p>"}
+    create_note(auth_client, "牛顿定律", notebook_id=notebook_id, **columns)
+    create_note(auth_client, "未分类")
+
+    response = _export(auth_client, format="zip", include_conversations=False)
+    assert response.headers["content-type"] == "application/zip"
+    names = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    assert "notebooks.ndjson" in names
+    assert any(name.startswith("物理_力学/牛顿定律 (") for name in names)
+
+    login = register_and_login(auth_client, "bob")
+    bob = {"Authorization": f"Bearer {login['access_token']}"}
+    imported = auth_client.post(
+        "/api/v1/notes/import", files={"file": ("export.zip", response.content)}, headers=bob
+    )
+    assert json.loads(imported.text.splitlines()[-1])["imported"] == 2
+
+    notes = {
+        item["title"]: item
+        for item in auth_client.get("/api/v1/notes", headers=bob).json()["items"]
+    }
+    assert set(notes) == {"牛顿定律", "未分类"}
+    content = auth_client.get(f"/api/v1/notes/{notes['牛顿定律']['id']}", headers=bob).json()["content"]
+    assert {column: content[column] for column in columns} == columns
+    notebook = auth_client.get(f"/api/v1/notebooks/{notes['牛顿定律']['notebook_id']}", headers=bob).json()
+    assert notebook["title"] == "物理_力学"
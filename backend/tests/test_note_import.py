@@ -0,0 +1,86 @@
+"""笔记批量导入"""
+import io
+import json
+import zipfile
+
+from app.services.note_import import split_sections
+
+
+def _import(client, filename, data, **params):
+    response = client.post("/api/v1/notes/import", params=params, files={"file": (filename, data)})
+    assert response.status_code == 200, response.text
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def _notes(client):
+    return {item["title"]: item for item in client.get("/api/v1/notes", params={"page_size": 100}).json()["items"]}
+
+
+def _content(client, note_id):
+    return client.get(f"/api/v1/notes/{note_id}").json()["content"]
+
+
+def test_split_sections():
+    sections = split_sections("<h1>牛顿定律</h1><p>引言</p><h2>线索</h2><p>F=ma?</p><h2>Summary</h2><p>总结</p>")
+    assert sections == {
+        "title": "牛顿定律",
+        "cue_column": "<p>F=ma?</p>",
+        "note_column": "<p>引言</p>",
+        "summary_row": "<p>总结</p>",
+    }
+
+
+def test_ndjson_import_reports_progress_and_errors(auth_client):
+    lines = [
+        {"title": "栏目", "notebook": "物理", "cue_column": "线索", "note_column": "<p>正文</p>"},
+        "不是 JSON",
+        {"title": "文档", "notebook": "物理", "content": "# 标题\n\n## 笔记\n\n内容\n\n## 总结\n\n小结"},
+        [1, 2],
+    ]
+    data = "\n".join(line if isinstance(line, str) else json.dumps(line, ensure_ascii=False) for line in lines)
+
+    events = _import(auth_client, "notes.ndjson", data.encode("utf-8"), batch_size=1)
+
+    assert [event["event"] for event in events] == ["progress", "progress", "done"]
+    done = events[-1]
+    assert (done["imported"], done["failed"]) == (2, 2)
+    assert [error.split(":")[0] for error in done["errors"]] == ["第 2 行", "第 4 行"]
+
+    notes = _notes(auth_client)
+    assert set(notes) == {"栏目", "标题"}
+    assert notes["栏目"]["notebook_id"] == notes["标题"]["notebook_id"]
+    notebook = auth_client.get(f"/api/v1/notebooks/{notes['栏目']['notebook_id']}").json()
+    assert (notebook["title"], notebook["note_count"]) == ("物理", 2)
+    content = _content(auth_client, notes["标题"]["id"])
+    assert ("内容" in content["note_column"], "小结" in content["summary_row"]) == (True, True)
+
+
+def test_zip_import_uses_directories_as_notebooks(auth_client):
+    default = auth_client.post("/api/v1/notebooks", json={"title": "收件箱"}).json()["id"]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("化学/酸碱.md", "## Cues\n\npH?\n\n## Notes\n\n酸碱中和")
+        archive.writestr("散页.html", "<html><body><h2>笔记</h2><p>无目录</p></body></html>")
+        archive.writestr("化学/图片.png", b"\x89PNG")
+        archive.writestr("__MACOSX/._酸碱.md", "忽略")
+
+    events = _import(auth_client, "notes.zip", buffer.getvalue(), notebook_id=default)
+
+    assert events[-1]["imported"] == 2
+    notes = _notes(auth_client)
+    assert set(notes) == {"酸碱", "散页"}
+    assert notes["散页"]["notebook_id"] == default
+    assert notes["酸碱"]["notebook_id"] != default
+    content = _content(auth_client, notes["酸碱"]["id"])
+    assert "pH?" in content["cue_column"] and "酸碱中和" in content["note_column"]
+
+
+def test_import_rejects_unknown_format_and_notebook(auth_client):
+    response = auth_client.post("/api/v1/notes/import", files={"file": ("notes.bin", b"\x00\x01")})
+    assert response.status_code == 400
+    response = auth_client.post("/api/v1/notes/import", files={"file": ("notes.zip", b"not a zip")})
+    assert response.status_code == 400
+    response = auth_client.post(
+        "/api/v1/notes/import", params={"notebook_id": "missing"}, files={"file": ("a.ndjson", b"{}")}
+    )
+    assert response.status_code == 404
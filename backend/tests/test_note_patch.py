@@ -0,0 +1,68 @@
+"""增量更新笔记内容（PATCH /notes/{id}/content）"""
+import pytest
+from sqlalchemy import event, func, select
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.models import NoteSearchTerm
+from conftest import create_note
+
+
+@pytest.fixture
+def statements():
+    """记录请求执行的写语句"""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield captured
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+def _patch(client, note_id, base_version, *ops):
+    return client.patch(f"/api/v1/notes/{note_id}/content", json={"base_version": base_version, "ops": list(ops)})
+
+
+def test_patch_applies_ops_and_writes_only_changed_columns(auth_client, statements):
+    note = create_note(auth_client, cue_column="线索", note_column="<p>abc</p>", summary_row="总结")
+
+    response = _patch(auth_client, note["id"], 1, {"column": "note_column", "offset": 3, "insert": "X"})
+    assert response.status_code == 200, response.text
+    assert response.json()["version"] == 2
+
+    content_updates = [sql for sql, _ in statements if sql.startswith("UPDATE note_contents")]
+    assert len(content_updates) == 1
+    assigned = content_updates[0].split(" SET ")[1].split(" WHERE ")[0]
+    assert "note_column" in assigned
+    assert not {"cue_column", "summary_row", "mindmap_data"} & {part.split("=")[0].strip() for part in assigned.split(",")}
+
+    content = auth_client.get(f"/api/v1/notes/{note['id']}").json()["content"]
+    assert (content["cue_column"], content["note_column"], content["summary_row"]) == ("线索", "<p>Xabc</p>", "总结")
+
+
+def test_patch_rejects_out_of_range_edit(auth_client):
+    note = create_note(auth_client, note_column="abc")
+    response = _patch(auth_client, note["id"], 1, {"column": "note_column", "offset": 10, "delete": 1})
+    assert response.status_code == 400
+
+
+def test_ngram_index_writes_only_changed_terms(auth_client, monkeypatch, db, statements):
+    monkeypatch.setattr(settings, "search_backend", "ngram")
+    body = "<p>" + "康奈尔笔记法帮助学生整理课堂内容" * 3 + "</p>"
+    note = create_note(auth_client, "笔记", note_column=body)
+    total_terms = db.scalar(select(func.count()).select_from(NoteSearchTerm))
+    statements.clear()
+
+    response = _patch(auth_client, note["id"], 1, {"column": "note_column", "offset": 3, "insert": "复习"})
+    assert response.status_code == 200, response.text
+
+    term_writes = [(sql, params) for sql, params in statements if "note_search_terms" in sql]
+    assert not any(sql.startswith("DELETE") and "term IN" not in sql for sql, _ in term_writes)
+    written_rows = sum(len(params) if isinstance(params, list) else 1 for _, params in term_writes)
+    assert written_rows < total_terms / 2
+
+    hits = auth_client.get("/api/v1/notes/search", params={"q": "复习"}).json()["items"]
+    assert [hit["id"] for hit in hits] == [note["id"]]
@@ -0,0 +1,59 @@
+"""笔记本冗余计数的增量维护与校正"""
+from app.models import Notebook
+from app.services.notebook_stats import reconcile_notebook_stats
+from conftest import create_note
+
+
+def _counts(client, notebook_id):
+    notebook = client.get(f"/api/v1/notebooks/{notebook_id}").json()
+    return notebook["note_count"], notebook["starred_count"], notebook["word_count"]
+
+
+def test_note_writes_keep_counters_in_sync(auth_client, db):
+    first = auth_client.post("/api/v1/notebooks", json={"title": "物理"}).json()["id"]
+    second = auth_client.post("/api/v1/notebooks", json={"title": "化学"}).json()["id"]
+
+    note = create_note(auth_client, notebook_id=first, note_column="一二三")
+    other = create_note(auth_client, notebook_id=first, note_column="四五")
+    assert _counts(auth_client, first) == (2, 0, 5)
+
+    auth_client.put(f"/api/v1/notes/{note['id']}", json={"is_starred": True})
+    assert _counts(auth_client, first) == (2, 1, 5)
+
+    content = {"note_column": "一二三四", "cue_column": "", "summary_row": ""}
+    auth_client.put(f"/api/v1/notes/{note['id']}", json={"content": content, "version": 1})
+    assert _counts(auth_client, first) == (2, 1, 6)
+
+    auth_client.put(f"/api/v1/notes/{note['id']}", json={"notebook_id": second})
+    assert _counts(auth_client, first) == (1, 0, 2)
+    assert _counts(auth_client, second) == (1, 1, 4)
+
+    assert auth_client.post(f"/api/v1/notes/{other['id']}/copy", params={"notebook_id": second}).status_code == 201
+    assert _counts(auth_client, second) == (2, 1, 6)
+
+    assert auth_client.delete(f"/api/v1/notes/{note['id']}").status_code == 204
+    assert _counts(auth_client, second) == (1, 0, 2)
+    assert auth_client.post(f"/api/v1/notes/{note['id']}/restore").status_code == 200
+    assert _counts(auth_client, second) == (2, 1, 6)
+
+    # 增量维护的结果与按实际数据统计一致
+    assert reconcile_notebook_stats(db)["fixed"] == 0
+
+
+def test_reconcile_fixes_drift_without_touching_updated_at(auth_client, db):
+    notebook_id = auth_client.post("/api/v1/notebooks", json={"title": "物理"}).json()["id"]
+    create_note(auth_client, notebook_id=notebook_id, note_column="一二三")
+    notebook = db.get(Notebook, notebook_id)
+    updated_at = notebook.updated_at
+    db.query(Notebook).filter(Notebook.id == notebook_id).update(
+        {"note_count": 7, "starred_count": 3, "word_count": 0, "updated_at": updated_at}
+    )
+    db.commit()
+
+    counts = reconcile_notebook_stats(db, batch_size=1)
+
+    assert counts["fixed"] == 1
+    assert counts["checked"] >= 2
+    assert _counts(auth_client, notebook_id) == (1, 0, 3)
+    db.refresh(notebook)
+    assert notebook.updated_at == updated_at
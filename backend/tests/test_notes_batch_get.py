@@ -0,0 +1,41 @@
+"""批量获取笔记详情"""
+from app.services.view_counter import view_counter
+from conftest import create_note, register_and_login
+
+
+def _batch_get(client, ids, **kwargs):
+    return client.post("/api/v1/notes/batch-get", json={"ids": ids}, **kwargs)
+
+
+def test_batch_get_accepts_at_most_100_ids(auth_client):
+    note_id = create_note(auth_client)["id"]
+
+    response = _batch_get(auth_client, [note_id] + [f"missing-{index}" for index in range(99)])
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert list(body["notes"]) == [note_id]
+    assert len(body["errors"]) == 99
+
+    assert _batch_get(auth_client, [f"missing-{index}" for index in range(101)]).status_code == 422
+    assert _batch_get(auth_client, []).status_code == 422
+
+
+def test_batch_get_reports_per_note_errors(auth_client):
+    private = create_note(auth_client, "私有")["id"]
+    public = create_note(auth_client, "公开")["id"]
+    auth_client.put(f"/api/v1/notes/{public}", json={"access_level": "public"})
+
+    login = register_and_login(auth_client, "bob")
+    bob = {"Authorization": f"Bearer {login['access_token']}"}
+    response = _batch_get(auth_client, [public, private, "missing", public], headers=bob)
+    assert response.status_code == 200, response.text
+    body = response.json()
+
+    assert list(body["notes"]) == [public]
+    assert body["notes"][public]["title"] == "公开"
+    assert {note_id: error["status"] for note_id, error in body["errors"].items()} == {
+        private: "forbidden", "missing": "not_found"
+    }
+    # 重复的ID只计一次浏览
+    assert view_counter.pending(public) == 1
+    assert body["notes"][public]["view_count"] == 1
@@ -0,0 +1,69 @@
+"""笔记批量操作"""
+from app.services.autosave import autosave_buffer
+from conftest import create_note, register_and_login
+
+
+def _bulk(client, operation, ids, **extra):
+    return client.post("/api/v1/notes/bulk", json={"operation": operation, "ids": ids, **extra})
+
+
+def _notebook(client, notebook_id):
+    return client.get(f"/api/v1/notebooks/{notebook_id}").json()
+
+
+def test_bulk_move_reports_each_note_and_updates_counters(auth_client):
+    source = auth_client.post("/api/v1/notebooks", json={"title": "源"}).json()["id"]
+    target = auth_client.post("/api/v1/notebooks", json={"title": "目标"}).json()["id"]
+    first = create_note(auth_client, "a", notebook_id=source)
+    second = create_note(auth_client, "b", notebook_id=source)
+    _bulk(auth_client, "star", [first["id"]])
+
+    login = register_and_login(auth_client, "bob")
+    bob = {"Authorization": f"Bearer {login['access_token']}"}
+    bob_note = auth_client.post("/api/v1/notes", json={"title": "bob"}, headers=bob).json()
+
+    ids = [first["id"], second["id"], bob_note["id"], "missing", first["id"]]
+    response = _bulk(auth_client, "move", ids, notebook_id=target)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["succeeded"] == 2
+    assert [result["status"] for result in body["results"]] == ["ok", "ok", "forbidden", "not_found"]
+
+    assert auth_client.get(f"/api/v1/notes/{first['id']}").json()["notebook_id"] == target
+    assert auth_client.get(f"/api/v1/notes/{bob_note['id']}", headers=bob).json()["notebook_id"] != target
+    words = first["word_count"] + second["word_count"]
+    assert [_notebook(auth_client, source)[key] for key in ("note_count", "starred_count", "word_count")] == [0, 0, 0]
+    assert [_notebook(auth_client, target)[key] for key in ("note_count", "starred_count", "word_count")] == [2, 1, words]
+
+
+def test_bulk_move_requires_an_owned_target(auth_client):
+    note_id = create_note(auth_client)["id"]
+    assert _bulk(auth_client, "move", [note_id]).status_code == 400
+    assert _bulk(auth_client, "move", [note_id], notebook_id="missing").status_code == 404
+    assert _bulk(auth_client, "move", []).status_code == 422
+
+
+def test_bulk_delete_moves_notes_to_trash(auth_client):
+    notebook_id = auth_client.post("/api/v1/notebooks", json={"title": "课程"}).json()["id"]
+    kept = create_note(auth_client, "保留", notebook_id=notebook_id)
+    deleted = [create_note(auth_client, f"删除{index}", notebook_id=notebook_id)["id"] for index in range(2)]
+    assert auth_client.post(
+        f"/api/v1/notes/{deleted[0]}/autosave", json={"base_version": 1, "note_column": "未写回"}
+    ).status_code == 202
+
+    response = _bulk(auth_client, "delete", deleted)
+    assert response.status_code == 200, response.text
+    assert response.json()["succeeded"] == 2
+
+    for note_id in deleted:
+        assert auth_client.get(f"/api/v1/notes/{note_id}").status_code == 404
+    assert autosave_buffer.owner_of(deleted[0]) is None
+    trash = auth_client.get("/api/v1/notes/trash").json()
+    assert sorted(item["id"] for item in trash["items"]) == sorted(deleted)
+    assert _notebook(auth_client, notebook_id)["note_count"] == 1
+    assert _notebook(auth_client, notebook_id)["word_count"] == kept["word_count"]
+
+    # 已删除的笔记再次删除按不存在处理
+    assert [result["status"] for result in _bulk(auth_client, "delete", deleted).json()["results"]] == [
+        "not_found", "not_found"
+    ]
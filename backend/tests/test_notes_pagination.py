@@ -0,0 +1,59 @@
+"""笔记列表游标分页"""
+import pytest
+
+from conftest import create_note
+
+
+def _collect(client, sort, page_size=7, on_page=None):
+    titles, cursor, pages = [], "", 0
+    while cursor is not None:
+        response = client.get("/api/v1/notes", params={"cursor": cursor, "page_size": page_size, "sort": sort})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        titles += [item["title"] for item in body["items"]]
+        cursor = body["cursor"]["next_cursor"]
+        pages += 1
+        if on_page:
+            on_page(pages)
+    return titles
+
+
+@pytest.mark.parametrize("sort", ["created_at", "-created_at", "updated_at", "-updated_at"])
+def test_cursor_pages_cover_every_note_once(auth_client, sort):
+    for index in range(25):
+        create_note(auth_client, f"n{index:02d}")
+
+    titles = _collect(auth_client, sort)
+
+    assert len(titles) == 25
+    assert len(set(titles)) == 25
+
+
+def test_cursor_is_stable_under_concurrent_inserts(auth_client):
+    for index in range(20):
+        create_note(auth_client, f"n{index:02d}")
+
+    def insert_between_pages(page):
+        # 翻页期间新增的笔记排在已读页之前，不应导致后续页重复或遗漏
+        if page == 1:
+            create_note(auth_client, "late")
+
+    titles = _collect(auth_client, "-created_at", on_page=insert_between_pages)
+
+    assert titles[:7] == [f"n{index:02d}" for index in range(19, 12, -1)]
+    assert sorted(titles) == sorted(f"n{index:02d}" for index in range(20))
+
+
+def test_cursor_with_total_and_invalid_cursor(auth_client):
+    for index in range(3):
+        create_note(auth_client, f"n{index}")
+
+    body = auth_client.get("/api/v1/notes", params={"cursor": "", "with_total": True}).json()
+    assert body["cursor"]["total"] == 3
+    assert body["cursor"]["has_more"] is False
+
+    assert auth_client.get("/api/v1/notes", params={"cursor": "bad"}).status_code == 400
+    # 只有带复合索引的排序字段支持游标分页
+    for sort in ("id", "title", "word_count", "-view_count"):
+        assert auth_client.get("/api/v1/notes", params={"cursor": "", "sort": sort}).status_code == 400
+    assert auth_client.get("/api/v1/notes", params={"sort": "title"}).status_code == 200
@@ -0,0 +1,43 @@
+"""密码哈希线程池的背压"""
+import asyncio
+
+from app.api.v1.endpoints import auth as auth_endpoints
+from app.core.security import PasswordHasher, PasswordHashingBusy
+from conftest import PASSWORD, register_and_login
+
+
+async def test_requests_beyond_max_pending_are_rejected():
+    hasher = PasswordHasher(workers=1, max_pending=2)
+    try:
+        results = await asyncio.gather(*(hasher.hash("x") for _ in range(5)), return_exceptions=True)
+    finally:
+        hasher.shutdown()
+
+    assert sum(isinstance(result, PasswordHashingBusy) for result in results) == 3
+    assert sum(isinstance(result, str) for result in results) == 2
+    stats = hasher.stats()
+    assert stats["pending"] == 0
+    assert stats["rejected"] == 3
+
+
+async def test_pending_count_is_released_after_completion():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    try:
+        for _ in range(3):
+            assert await hasher.verify(PASSWORD, await hasher.hash(PASSWORD))
+    finally:
+        hasher.shutdown()
+    assert hasher.stats()["rejected"] == 0
+
+
+def test_login_returns_503_when_hasher_is_saturated(client, monkeypatch):
+    register_and_login(client)
+    saturated = PasswordHasher(workers=1, max_pending=0)
+    monkeypatch.setattr(auth_endpoints, "password_hasher", saturated)
+    try:
+        response = client.post("/api/v1/auth/login", json={"username": "alice", "password": PASSWORD})
+    finally:
+        saturated.shutdown()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
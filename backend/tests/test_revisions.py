@@ -0,0 +1,97 @@
+"""笔记修订历史：快照 + 差异链重建"""
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.models import NoteRevision
+from app.services import revisions
+from conftest import create_note
+
+
+def _write_versions(client, monkeypatch, count):
+    monkeypatch.setattr(settings, "revision_snapshot_interval", 4)
+    note_id = create_note(client, note_column="<p>v1</p>")["id"]
+    expected = {1: {"cue_column": "", "note_column": "<p>v1</p>", "summary_row": ""}}
+    version = 1
+    for index in range(count):
+        content = {"note_column": f"<p>第 {index} 版\n多行内容 {index * 'x'}</p>", "cue_column": "问" * index}
+        response = client.put(f"/api/v1/notes/{note_id}", json={"content": content, "version": version})
+        assert response.status_code == 200, response.text
+        version = response.json()["content"]["version"]
+        expected[version] = {**expected[version - 1], **content}
+    return note_id, expected
+
+
+def test_every_version_is_reconstructed_from_delta_chain(auth_client, monkeypatch, db):
+    note_id, expected = _write_versions(auth_client, monkeypatch, 10)
+
+    kinds = [
+        (row.version, row.kind)
+        for row in db.query(NoteRevision).filter(NoteRevision.note_id == note_id).order_by(NoteRevision.version)
+    ]
+    # 快照间隔 4：链中既有快照也有差异
+    assert {kind for _, kind in kinds} == {revisions.SNAPSHOT, revisions.DELTA}
+
+    for version, content in expected.items():
+        response = auth_client.get(f"/api/v1/notes/{note_id}/revisions/{version}")
+        assert response.status_code == 200, (version, response.text)
+        body = response.json()
+        assert {field: body[field] for field in content} == content, version
+
+    assert auth_client.get(f"/api/v1/notes/{note_id}/revisions/99").status_code == 404
+
+
+def test_compaction_keeps_remaining_versions_reconstructable(auth_client, monkeypatch, db):
+    note_id, expected = _write_versions(auth_client, monkeypatch, 10)
+    old = datetime.utcnow() - timedelta(days=settings.revision_retention_days + 1)
+    for row in db.query(NoteRevision).filter(NoteRevision.version <= 8):
+        row.created_at = old
+    db.commit()
+
+    assert revisions.compact_revisions(db) > 0
+
+    remaining = [row.version for row in db.query(NoteRevision).filter(NoteRevision.note_id == note_id)]
+    for version in remaining:
+        assert revisions.get_revision_content(db, note_id, version) == {**expected[version], "mindmap_data": None}
+
+
+def test_compaction_rewrites_only_the_affected_tail(auth_client, monkeypatch, db):
+    note_id, expected = _write_versions(auth_client, monkeypatch, 10)
+    base = (datetime.utcnow() - timedelta(days=settings.revision_retention_days + 2)).replace(
+        minute=0, second=0, microsecond=0
+    )
+    # 版本 1-3 各在不同时间段，版本 4-6 在同一时间段（只保留 6）
+    created = {1: base - timedelta(hours=3), 2: base - timedelta(hours=2), 3: base - timedelta(hours=1)}
+    created.update({version: base + timedelta(minutes=version) for version in (4, 5, 6)})
+    rows = db.query(NoteRevision).filter(NoteRevision.note_id == note_id).all()
+    for row in rows:
+        if row.version in created:
+            row.created_at = created[row.version]
+    db.commit()
+    prefix_ids = {row.version: row.id for row in rows if row.version <= 3}
+
+    assert revisions.compact_revisions(db) == 2
+
+    db.expire_all()
+    remaining = {row.version: row for row in db.query(NoteRevision).filter(NoteRevision.note_id == note_id)}
+    assert sorted(remaining) == [1, 2, 3] + list(range(6, 12))
+    assert {version: remaining[version].id for version in (1, 2, 3)} == prefix_ids
+    assert remaining[6].created_at == created[6]
+    for version in remaining:
+        assert revisions.get_revision_content(db, note_id, version) == {**expected[version], "mindmap_data": None}
+
+
+def test_compacted_notes_are_not_selected_again(auth_client, monkeypatch, db):
+    note_id, _ = _write_versions(auth_client, monkeypatch, 5)
+    old = datetime.utcnow() - timedelta(days=settings.revision_retention_days + 1)
+    for row in db.query(NoteRevision).filter(NoteRevision.note_id == note_id, NoteRevision.version <= 4):
+        row.created_at = old
+    db.commit()
+    assert revisions.compact_revisions(db) == 3
+
+    calls = []
+    original = revisions.compact_note_revisions
+    monkeypatch.setattr(
+        revisions, "compact_note_revisions", lambda *args, **kwargs: calls.append(args[1]) or original(*args, **kwargs)
+    )
+    assert revisions.compact_revisions(db) == 0
+    assert calls == []
@@ -0,0 +1,76 @@
+"""SQLite FTS5 全文检索索引"""
+from sqlalchemy import bindparam, text
+
+from conftest import create_note, register_and_login
+
+
+def _search(client, q, **params):
+    response = client.get("/api/v1/notes/search", params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return response.json()["items"]
+
+
+def _plan(db, sql, **params):
+    stmt = text(f"EXPLAIN QUERY PLAN {sql}")
+    if "note_ids" in params:
+        stmt = stmt.bindparams(bindparam("note_ids", expanding=True))
+    return " ".join(row[-1] for row in db.execute(stmt, params).all())
+
+
+def test_index_writes_locate_rows_by_rowid(db):
+    # FTS5 的 idxStr “0:=” 表示按 rowid 定位，按 UNINDEXED 列过滤时为 “0:”（全表扫描）
+    assert "INDEX 0:=" in _plan(db, "DELETE FROM note_search_fts WHERE rowid = :rowid", rowid=1)
+    plan = _plan(
+        db,
+        "DELETE FROM note_search_fts WHERE rowid IN "
+        "(SELECT id FROM note_search_fts_ids WHERE note_id IN :note_ids)",
+        note_ids=["a", "b"],
+    )
+    assert "INDEX 0:=" in plan
+    assert "sqlite_autoindex_note_search_fts_ids" in plan
+
+
+def test_search_is_scoped_to_owner_inside_match(auth_client):
+    own = create_note(auth_client, "牛顿定律", note_column="<p>惯性</p>")
+
+    bob_headers = {"Authorization": f"Bearer {register_and_login(auth_client, 'bob')['access_token']}"}
+    bob_note = auth_client.post("/api/v1/notes", json={"title": "牛顿第二定律"}, headers=bob_headers).json()
+
+    assert [hit["id"] for hit in _search(auth_client, "牛顿")] == [own["id"]]
+    response = auth_client.get("/api/v1/notes/search", params={"q": "牛顿"}, headers=bob_headers)
+    assert [hit["id"] for hit in response.json()["items"]] == [bob_note["id"]]
+
+    # 检索词只匹配内容列，不会命中 owner_id
+    owner_fragment = own["owner_id"].split("-")[0]
+    assert _search(auth_client, owner_fragment) == []
+
+    listed = auth_client.get("/api/v1/notes", params={"search": "牛顿"}).json()["items"]
+    assert [note["id"] for note in listed] == [own["id"]]
+
+
+def test_title_hits_rank_above_body_hits(auth_client):
+    body_hit = create_note(auth_client, "力学", note_column="<p>惯性 的 定义</p>")
+    title_hit = create_note(auth_client, "惯性", note_column="<p>定义</p>")
+
+    hits = _search(auth_client, "惯性")
+    assert [hit["id"] for hit in hits] == [title_hit["id"], body_hit["id"]]
+    assert "<mark>" in hits[1]["snippet"]
+
+
+def test_update_and_delete_keep_index_consistent(auth_client, db):
+    note = create_note(auth_client, "牛顿定律")
+    other = create_note(auth_client, "牛顿传记")
+
+    auth_client.put(f"/api/v1/notes/{note['id']}", json={"title": "开普勒定律"})
+    assert [hit["id"] for hit in _search(auth_client, "牛顿")] == [other["id"]]
+    assert [hit["id"] for hit in _search(auth_client, "开普勒")] == [note["id"]]
+
+    rowids = dict(db.execute(text("SELECT note_id, id FROM note_search_fts_ids")).all())
+    assert set(rowids) == {note["id"], other["id"]}
+    assert db.execute(text("SELECT COUNT(*) FROM note_search_fts")).scalar() == 2
+
+    assert auth_client.delete(f"/api/v1/notes/{note['id']}").status_code == 204
+    assert _search(auth_client, "开普勒") == []
+    remaining = db.execute(text("SELECT note_id FROM note_search_fts_ids")).scalars().all()
+    assert remaining == [other["id"]]
+    assert db.execute(text("SELECT rowid FROM note_search_fts")).scalars().all() == [rowids[other["id"]]]
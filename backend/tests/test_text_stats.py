@@ -0,0 +1,72 @@
+"""笔记字数与复习时长统计"""
+import pytest
+
+from app.models import CornellNote, NoteContent
+from app.services.text_stats import (
+    REVIEW_UNITS_PER_MINUTE,
+    backfill_note_stats,
+    compute_stats,
+    count_words,
+    estimate_review_minutes,
+    update_note_stats,
+)
+from conftest import create_note
+
+
+@pytest.mark.parametrize("html, expected", [
+    (None, 0),
+    ("", 0),
+    ("牛顿第二定律", 6),
+    ("Newton's second law", 3),
+    ("F = ma 即力等于质量乘加速度", 2 + 10),
+    ("<p>hello</p><p>world</p>", 2),
+    # 行内标签分隔的仍是同一个单词，块级标签分隔的是两个单词
+    ("<b>wo</b>rd", 1),
+    ("wo<br>rd", 2),
+    ("<p>a &amp; b</p>", 2),
+    ("<script>var x = 1;</script><style>p {}</style>正文", 2),
+])
+def test_count_words(html, expected):
+    assert count_words(html) == expected
+
+
+def test_estimate_review_minutes():
+    assert estimate_review_minutes(0) == 0
+    assert estimate_review_minutes(1) == 1
+    assert estimate_review_minutes(REVIEW_UNITS_PER_MINUTE) == 1
+    assert estimate_review_minutes(REVIEW_UNITS_PER_MINUTE + 1) == 2
+
+
+def test_incremental_update_matches_full_count():
+    previous = {"cue_column": "线索", "note_column": "<p>one two</p>", "summary_row": "总结"}
+    note = CornellNote(word_count=0, estimated_review_minutes=None)
+    content = NoteContent(**previous)
+    update_note_stats(note, content)
+    assert (note.word_count, note.estimated_review_minutes) == compute_stats(previous) == (6, 1)
+
+    content.note_column = "<p>one two three</p>" + "字" * REVIEW_UNITS_PER_MINUTE
+    update_note_stats(note, content, previous)
+    current = {column: getattr(content, column) for column in previous}
+    assert (note.word_count, note.estimated_review_minutes) == compute_stats(current) == (207, 2)
+
+    update_note_stats(note, None)
+    assert (note.word_count, note.estimated_review_minutes) == (0, 0)
+
+
+def test_note_stats_follow_content_writes_and_backfill(auth_client, db):
+    note_id = create_note(auth_client, cue_column="线索", note_column="<p>hello world</p>")["id"]
+    assert auth_client.get(f"/api/v1/notes/{note_id}").json()["word_count"] == 4
+
+    content = {"cue_column": "线索", "note_column": "<p>hello world</p>", "summary_row": "总结"}
+    response = auth_client.put(f"/api/v1/notes/{note_id}", json={"content": content, "version": 1})
+    assert response.status_code == 200, response.text
+    assert response.json()["word_count"] == 6
+
+    db.query(CornellNote).filter(CornellNote.id == note_id).update(
+        {"word_count": 0, "estimated_review_minutes": None}
+    )
+    db.commit()
+    assert backfill_note_stats(db, only_missing=True) == 1
+    note = db.get(CornellNote, note_id)
+    db.refresh(note)
+    assert (note.word_count, note.estimated_review_minutes) == (6, 1)
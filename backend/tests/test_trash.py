@@ -0,0 +1,59 @@
+"""回收站过期清理"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+
+from app.core.config import settings
+from app.models import CornellNote, NoteContent, NoteRevision, Notebook
+from app.services.trash import purge_cutoff, purge_expired
+from conftest import create_note
+
+
+def _set_deleted_at(db, model, ids, deleted_at):
+    db.execute(update(model).where(model.id.in_(ids)).values(deleted_at=deleted_at))
+    db.commit()
+
+
+def test_purge_removes_only_rows_deleted_before_cutoff(auth_client, db):
+    notebook_id = auth_client.post("/api/v1/notebooks", json={"title": "旧课"}).json()["id"]
+    note_ids = [create_note(auth_client, f"n{index}", notebook_id=notebook_id)["id"] for index in range(12)]
+    kept_id = create_note(auth_client, "未删除", notebook_id=notebook_id)["id"]
+    for note_id in note_ids:
+        assert auth_client.delete(f"/api/v1/notes/{note_id}").status_code == 204
+
+    now = datetime.utcnow()
+    cutoff = purge_cutoff(now)
+    assert cutoff == now - timedelta(days=settings.trash_retention_days)
+    expired, fresh, boundary = note_ids[:8], note_ids[8:11], note_ids[11]
+    _set_deleted_at(db, CornellNote, expired, cutoff - timedelta(seconds=1))
+    _set_deleted_at(db, CornellNote, fresh, cutoff + timedelta(days=1))
+    # 截止时间本身不算过期（deleted_at < cutoff）
+    _set_deleted_at(db, CornellNote, [boundary], cutoff)
+
+    counts = purge_expired(db, batch_size=3, now=now)
+
+    assert counts == {"notes": 8, "notebooks": 0}
+    remaining = set(db.scalars(select(CornellNote.id)))
+    assert remaining == {*fresh, boundary, kept_id}
+    assert db.scalar(select(func.count()).select_from(NoteContent).where(NoteContent.note_id.in_(expired))) == 0
+    assert db.scalar(select(func.count()).select_from(NoteRevision).where(NoteRevision.note_id.in_(expired))) == 0
+    # 未过期的笔记仍可恢复
+    assert auth_client.post(f"/api/v1/notes/{fresh[0]}/restore").status_code == 200
+
+
+def test_purge_keeps_expired_notebook_until_its_notes_are_gone(auth_client, db):
+    notebook_id = auth_client.post("/api/v1/notebooks", json={"title": "旧课"}).json()["id"]
+    note_id = create_note(auth_client, notebook_id=notebook_id)["id"]
+    auth_client.delete(f"/api/v1/notes/{note_id}")
+    assert auth_client.delete(f"/api/v1/notebooks/{notebook_id}").status_code == 204
+
+    now = datetime.utcnow()
+    cutoff = purge_cutoff(now)
+    _set_deleted_at(db, Notebook, [notebook_id], cutoff - timedelta(days=1))
+    _set_deleted_at(db, CornellNote, [note_id], cutoff + timedelta(days=1))
+
+    assert purge_expired(db, now=now) == {"notes": 0, "notebooks": 0}
+
+    _set_deleted_at(db, CornellNote, [note_id], cutoff - timedelta(days=1))
+    assert purge_expired(db, now=now) == {"notes": 1, "notebooks": 1}
+    assert db.get(Notebook, notebook_id) is None
@@ -0,0 +1,49 @@
+"""浏览次数写回缓冲"""
+from app import main
+from app.core.database import engine
+from app.models import CornellNote
+from app.services.autosave import autosave_buffer
+from app.services.view_counter import view_counter
+from conftest import create_note
+
+
+def _view_count(db, note_id):
+    db.expire_all()
+    return db.get(CornellNote, note_id).view_count
+
+
+def test_views_are_buffered_and_flushed_without_touching_updated_at(auth_client, db):
+    note = create_note(auth_client)
+    for _ in range(3):
+        assert auth_client.get(f"/api/v1/notes/{note['id']}").status_code == 200
+
+    # 未写回时详情按缓冲中的次数叠加
+    assert _view_count(db, note["id"]) == 0
+    assert auth_client.get(f"/api/v1/notes/{note['id']}").json()["view_count"] == 4
+
+    assert view_counter.flush(engine) == 1
+    assert _view_count(db, note["id"]) == 4
+    assert db.get(CornellNote, note["id"]).updated_at.isoformat() == note["updated_at"]
+
+
+class _NoopAsyncEngine:
+    async def dispose(self):
+        pass
+
+
+async def test_shutdown_flushes_views_when_autosave_flush_fails(auth_client, db, monkeypatch):
+    note = create_note(auth_client)
+    view_counter.record(note["id"], 2)
+
+    def broken_flush(*args, **kwargs):
+        raise RuntimeError("数据库不可用")
+
+    monkeypatch.setattr(autosave_buffer, "flush", broken_flush)
+    # 共享的密码哈希线程池和异步引擎仍供其他测试使用
+    monkeypatch.setattr(main.password_hasher, "shutdown", lambda: None)
+    monkeypatch.setattr(main, "async_engine", _NoopAsyncEngine())
+
+    async with main.lifespan(main.app):
+        pass
+
+    assert _view_count(db, note["id"]) == 2
@@ -82,10 +82,15 @@ export default function AccountSecurityPage() {
     }
 
     try {
-      await authApi.changePassword({
+      const response = await authApi.changePassword({
         old_password: passwordForm.old_password,
         new_password: passwordForm.new_password
       })
+      // 修改密码后旧令牌失效，使用服务端返回的新令牌
+      if (response.data?.access_token) {
+        localStorage.setItem('access_token', response.data.access_token)
+        localStorage.setItem('refresh_token', response.data.refresh_token)
+      }
       showToast('密码修改成功', 'success')
       setShowPasswordDialog(false)
       setPasswordForm({ old_password: '', new_password: '', confirm_password: '' })
@@ -40,9 +40,9 @@ export default function Login() {
 
     try {
       const response = await authApi.login(formData)
-      const { access_token, user } = response.data
+      const { access_token, refresh_token, user } = response.data
 
-      login(user, access_token)
+      login(user, access_token, refresh_token)
 
       // 延迟导航，确保状态更新
       setTimeout(() => {
@@ -79,7 +79,13 @@ export default function ProfilePage() {
   }
 
   const confirmLogout = () => {
+    // 撤销服务端会话，失败不影响本地退出
+    const refreshToken = localStorage.getItem('refresh_token')
+    if (refreshToken) {
+      authApi.logout(refreshToken).catch(() => {})
+    }
     localStorage.removeItem('access_token')
+    localStorage.removeItem('refresh_token')
     setShowLogoutConfirm(false)
     showToast('退出登录成功', 'success')
     // 延迟跳转，让用户看到 Toast
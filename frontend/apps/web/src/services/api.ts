@@ -49,20 +49,56 @@ api.interceptors.request.use(
   }
 )
 
+// 清除本地登录状态并跳转到登录页
+const redirectToLogin = () => {
+  localStorage.removeItem('access_token')
+  localStorage.removeItem('refresh_token')
+  localStorage.removeItem('user')
+  window.location.href = '/login'
+}
+
+// 正在进行的刷新请求：多个请求同时收到 401 时只刷新一次（刷新令牌每次使用后都会轮换）
+let refreshPromise: Promise<string> | null = null
+
+const refreshAccessToken = (): Promise<string> => {
+  if (!refreshPromise) {
+    const refreshToken = localStorage.getItem('refresh_token')
+    refreshPromise = (refreshToken
+      ? axios.post(`${API_BASE_URL}/auth/refresh`, { refresh_token: refreshToken }).then((response) => {
+          localStorage.setItem('access_token', response.data.access_token)
+          localStorage.setItem('refresh_token', response.data.refresh_token)
+          return response.data.access_token as string
+        })
+      : Promise.reject(new Error('no refresh token'))
+    ).finally(() => {
+      refreshPromise = null
+    })
+  }
+  return refreshPromise
+}
+
 // 响应拦截器：处理错误
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
     if (error.response?.status === 401) {
       // 如果是登录或注册请求的401错误，不跳转，让错误正常返回
       const isAuthRequest = error.config?.url?.includes('/auth/login') ||
                            error.config?.url?.includes('/auth/register')
 
       if (!isAuthRequest) {
-        // 令牌过期或无效，清除本地存储并跳转到登录页
-        localStorage.removeItem('access_token')
-        localStorage.removeItem('user')
-        window.location.href = '/login'
+        // 访问令牌过期：用刷新令牌换取新令牌后重试一次，刷新失败再跳转到登录页
+        if (!error.config._retried) {
+          try {
+            const token = await refreshAccessToken()
+            error.config._retried = true
+            error.config.headers.Authorization = `Bearer ${token}`
+            return api.request(error.config)
+          } catch {
+            // 刷新令牌无效或已过期
+          }
+        }
+        redirectToLogin()
       }
     }
     return Promise.reject(error)
@@ -83,6 +119,10 @@ export const authApi = {
   login: (data: { username: string; password: string }) =>
     api.post('/auth/login', data),
 
+  // 退出登录（撤销刷新令牌）
+  logout: (refresh_token: string) =>
+    api.post('/auth/logout', { refresh_token }),
+
   // 获取当前用户信息
   getMe: () => api.get('/auth/me'),
 
@@ -240,21 +280,29 @@ export const aiApi = {
         buffer += decoder.decode(value, { stream: true })
 
         // 处理完整的 SSE 消息（以 \n\n 分隔）
-        const lines = buffer.split('\n\n')
-        buffer = lines.pop() || '' // 保留不完整的部分
-
-        for (const line of lines) {
-          if (line.startsWith('data: ')) {
-            const data = line.slice(6) // 移除 "data: " 前缀
+        const events = buffer.split('\n\n')
+        buffer = events.pop() || '' // 保留不完整的部分
+
+        for (const event of events) {
+          // 内容中的换行被拆成多条 data: 行，按换行拼接还原；以 : 开头的心跳注释忽略
+          const dataLines = event
+            .split('\n')
+            .filter((line) => line.startsWith('data:'))
+            .map((line) => line.slice(line.startsWith('data: ') ? 6 : 5)) // 移除 "data: " 前缀
+
+          if (dataLines.length === 0) {
+            continue
+          }
 
-            if (data === '[DONE]') {
-              onComplete()
-              return
-            }
+          const data = dataLines.join('\n')
 
-            // 调用回调处理数据块
-            onChunk(data)
+          if (data === '[DONE]') {
+            onComplete()
+            return
           }
+
+          // 调用回调处理数据块
+          onChunk(data)
         }
       }
     } catch (error: any) {
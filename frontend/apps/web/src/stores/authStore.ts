@@ -3,6 +3,7 @@
  */
 import { create } from 'zustand'
 import { persist } from 'zustand/middleware'
+import { authApi } from '../services/api'
 
 interface User {
   id: string
@@ -17,7 +18,7 @@ interface AuthState {
   user: User | null
   token: string | null
   isAuthenticated: boolean
-  login: (user: User, token: string) => void
+  login: (user: User, token: string, refreshToken: string) => void
   logout: () => void
   updateUser: (user: Partial<User>) => void
 }
@@ -29,14 +30,21 @@ export const useAuthStore = create<AuthState>()(
       token: null,
       isAuthenticated: false,
 
-      login: (user, token) => {
+      login: (user, token, refreshToken) => {
         localStorage.setItem('access_token', token)
+        localStorage.setItem('refresh_token', refreshToken)
         localStorage.setItem('user', JSON.stringify(user))
         set({ user, token, isAuthenticated: true })
       },
 
       logout: () => {
+        // 撤销服务端会话，失败不影响本地退出
+        const refreshToken = localStorage.getItem('refresh_token')
+        if (refreshToken) {
+          authApi.logout(refreshToken).catch(() => {})
+        }
         localStorage.removeItem('access_token')
+        localStorage.removeItem('refresh_token')
         localStorage.removeItem('user')
         set({ user: null, token: null, isAuthenticated: false })
       },